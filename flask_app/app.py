@@ -1,66 +1,55 @@
-from flask import Flask, render_template, request
+from flask import Flask, Response, render_template, request, jsonify, g, stream_with_context
 import mlflow
 import pickle
+import json
 import os
-import pandas as pd
-from prometheus_client import Counter, Histogram, generate_latest, CollectorRegistry, CONTENT_TYPE_LATEST
+import sys
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CollectorRegistry, CONTENT_TYPE_LATEST, multiprocess
 import time
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import stopwords
-import string
-import re
 import numpy as np
+import tempfile
 import warnings
+import zlib
+import hmac
+import hashlib
+import threading
+
+# Measured from here to when the model can serve requests
+APP_START_TIME = time.time()
+
+# Make sibling serving modules importable both from flask_app/ and the repo root, and the
+# preprocessing shared with training (src/features, copied next to the app in the image) from both
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from inference import SparseLinearScorer, build_predictor
+from src.features.text_normalizer import TextNormalizer
+from src.features.surface_index import SurfaceIndexVectorizer
+from src.model.linear_artifact import load_linear_model
+from prediction_cache import PredictionCache
+from model_store import ModelArtifactCache
+from model_reloader import ModelReloader, ServingBundle, read_local_registry
+from stage_timing import StageTimer
+from bulk_scoring import UnsupportedFormat, iter_records, stream_scores
+from profiling import SamplingProfiler
 
 warnings.simplefilter("ignore", UserWarning)
 warnings.filterwarnings("ignore")
 
-# Text Preprocessing Functions
-def lemmatization(text):
-    """Lemmatize the text."""
-    lemmatizer = WordNetLemmatizer()
-    text = text.split()
-    text = [lemmatizer.lemmatize(word) for word in text]
-    return " ".join(text)
-
-def remove_stop_words(text):
-    """Remove stop words from the text."""
-    stop_words = set(stopwords.words("english"))
-    text = [word for word in str(text).split() if word not in stop_words]
-    return " ".join(text)
-
-def removing_numbers(text):
-    """Remove numbers from the text."""
-    text = ''.join([char for char in text if not char.isdigit()])
-    return text
-
-def lower_case(text):
-    """Convert text to lower case."""
-    text = text.split()
-    text = [word.lower() for word in text]
-    return " ".join(text)
-
-def removing_punctuations(text):
-    """Remove punctuations from the text."""
-    text = re.sub('[%s]' % re.escape(string.punctuation), ' ', text)
-    text = text.replace('؛', "")
-    text = re.sub('\s+', ' ', text).strip()
-    return text
-
-def removing_urls(text):
-    """Remove URLs from the text."""
-    url_pattern = re.compile(r'https?://\S+|www\.\S+')
-    return url_pattern.sub(r'', text)
+# Text preprocessing: built once, single tokenizing pass per request
+# Inputs longer than MAX_TEXT_LENGTH characters are truncated before normalization
+MAX_TEXT_LENGTH = int(os.getenv("MAX_TEXT_LENGTH", "20000"))
+normalizer = TextNormalizer(max_length=MAX_TEXT_LENGTH)
 
 def normalize_text(text):
     """Apply text normalization pipeline."""
-    text = lower_case(text)
-    text = remove_stop_words(text)
-    text = removing_numbers(text)
-    text = removing_punctuations(text)
-    text = removing_urls(text)
-    text = lemmatization(text)
-    return text
+    return normalizer.normalize(text)
+
+def cache_key(text):
+    """
+    Prediction cache key for text: a digest of its lowercase surface tokens. Texts differing only in case
+    or whitespace share an entry, and a hit never reaches the NLTK lemmatizer.
+    """
+    return hashlib.blake2b(" ".join(normalizer.surface_tokens(text)).encode("utf-8"), digest_size=16).digest()
 
 # MLflow setup
 dagshub_token = os.getenv("MLOPS_PROJECT")
@@ -79,11 +68,38 @@ else:
 # Initialize Flask app
 app = Flask(__name__)
 
+# With PROMETHEUS_MULTIPROC_DIR set, every metric below writes to a file there, so the directory must exist
+# before the first one is created; gunicorn.conf.py also clears it, but python app.py and uvicorn do not
+PROMETHEUS_MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if PROMETHEUS_MULTIPROC_DIR:
+    os.makedirs(PROMETHEUS_MULTIPROC_DIR, exist_ok=True)
+
 # Create a custom registry for Prometheus
 registry = CollectorRegistry()
 REQUEST_COUNT = Counter("app_request_count", "Total number of requests", ["method", "endpoint"], registry=registry)
 REQUEST_LATENCY = Histogram("app_request_latency_seconds", "Latency of requests", ["endpoint"], registry=registry)
 PREDICTION_COUNT = Counter("model_prediction_count", "Count of predictions", ["prediction"], registry=registry)
+BATCH_SIZE = Histogram("app_batch_size", "Number of texts per batch request", registry=registry,
+                       buckets=(1, 8, 16, 32, 64, 128, 256, 512, 1024))
+BULK_CHUNK_ROWS = Histogram("app_bulk_chunk_size", "Number of texts per /api/v1/predict_bulk model call", registry=registry,
+                            buckets=(1, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096))
+BATCH_ITEM_LATENCY = Histogram("app_batch_item_latency_seconds", "Batch request latency divided by batch size", registry=registry)
+TIME_TO_READY = Gauge("app_time_to_ready_seconds", "Seconds from process start until the model was ready", ["source"],
+                      registry=registry, multiprocess_mode="max")
+STAGE_LATENCY = Histogram("app_stage_latency_seconds", "Latency of each request stage", ["endpoint", "stage"], registry=registry,
+                          buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+
+# With PROMETHEUS_MULTIPROC_DIR set (see gunicorn.conf.py), /metrics aggregates every worker's values
+if PROMETHEUS_MULTIPROC_DIR:
+    exposition_registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(exposition_registry)
+else:
+    exposition_registry = registry
+
+# Largest number of texts accepted by a single /api/v1/predict_batch call
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "256"))
+# Rows scored per vectorizer/model call on the streaming bulk endpoint
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
 
 # Model and vectorizer setup
 def get_latest_model_version(model_name):
@@ -98,54 +114,258 @@ def get_latest_model_version(model_name):
         print(f"Error fetching model version: {e}")
         return None
 
+def download_model_artifacts(model_uri, target_dir):
+    """Download the registered model's artifacts from MLflow into target_dir."""
+    mlflow.artifacts.download_artifacts(artifact_uri=model_uri, dst_path=target_dir)
+
+# Downloaded registry models are kept here, keyed by name, version and content hash.
+# Point MODEL_CACHE_DIR at a shared volume so pods cold-start from disk; MODEL_VERSION pins a version.
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mlops_model_cache"))
+artifact_cache = ModelArtifactCache(MODEL_CACHE_DIR)
+
+def get_production_version(model_name):
+    """Fetch the current Production version from MLflow, or None."""
+    try:
+        client = mlflow.MlflowClient()
+        production_versions = client.get_latest_versions(model_name, stages=["Production"])
+        return production_versions[0].version if production_versions else None
+    except Exception as e:
+        print(f"Error fetching production model version: {e}")
+        return None
+
+def bundled_path(file_name):
+    """Prefer the Docker image copy under /app/models over the working directory's models/."""
+    docker_path = os.path.join("/app/models", file_name)
+    return docker_path if os.path.exists(docker_path) else os.path.join("models", file_name)
+
+def load_pickle(file_path):
+    with open(file_path, "rb") as f:
+        return pickle.load(f)
+
+# "sparse" hands CSR features straight to the unwrapped sklearn model, "dataframe" keeps the pyfunc path
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "sparse")
+print(f"Inference mode: {INFERENCE_MODE}")
+
+def build_bundle(version, model, vectorizer, surface_index_path):
+    """Wrap a model/vectorizer pair with its predictor and, when it matches, its surface-form index."""
+    surface_vectorizer = None
+    if surface_index_path and os.path.exists(surface_index_path):
+        try:
+            surface_vectorizer = SurfaceIndexVectorizer.load(surface_index_path, normalizer, vectorizer)
+            print(f"Loaded surface index from: {surface_index_path}")
+        except Exception as e:
+            print(f"Surface index not used, falling back to NLTK normalization: {e}")
+    return ServingBundle(version, model, vectorizer, build_predictor(model, INFERENCE_MODE), normalizer, surface_vectorizer)
+
+# Compact, checksummed, mmap-able export of the linear model and vocabulary; preferred over the pickles
+LINEAR_MODEL_FILE = "linear_model.bin"
+
+def load_linear_bundle(version, artifact_path, surface_index_path):
+    """Bundle an exported linear model without unpickling anything or importing sklearn."""
+    artifact = load_linear_model(artifact_path, preprocessing=normalizer.settings())
+    model = SparseLinearScorer(artifact.weights, artifact.intercept, artifact.classes)
+    print(f"Loaded linear model ({artifact.metadata['model']['weight_dtype']} weights) from: {artifact_path}")
+    return build_bundle(version, model, artifact.vectorizer, surface_index_path)
+
+def load_model_dir_bundle(version, model_dir):
+    """Bundle a model directory (linear_model.bin, MLflow model or model.pkl) with the vectorizer logged next to it."""
+    surface_index_path = os.path.join(model_dir, "surface_index.json")
+    if not os.path.exists(surface_index_path):
+        surface_index_path = bundled_path("surface_index.json")
+
+    linear_model_path = os.path.join(model_dir, LINEAR_MODEL_FILE)
+    if os.path.exists(linear_model_path):
+        return load_linear_bundle(version, linear_model_path, surface_index_path)
+
+    if os.path.exists(os.path.join(model_dir, "MLmodel")):
+        model = mlflow.pyfunc.load_model(model_dir)
+    else:
+        model = load_pickle(os.path.join(model_dir, "model.pkl"))
+
+    paired_vectorizer_path = os.path.join(model_dir, "vectorizer.pkl")
+    if os.path.exists(paired_vectorizer_path):
+        vectorizer = load_pickle(paired_vectorizer_path)
+    else:
+        print(f"No vectorizer stored with model version {version}, using the bundled one")
+        vectorizer = load_pickle(bundled_path("vectorizer.pkl"))
+    return build_bundle(version, model, vectorizer, surface_index_path)
+
+def load_registry_bundle(version):
+    """Load a registry version through the artifact cache; returns (bundle, source)."""
+    model_uri = f"models:/{model_name}/{version}"
+    model_dir, cache_hit = artifact_cache.get_or_download(
+        model_name, version, lambda target_dir: download_model_artifacts(model_uri, target_dir))
+    model_source = "cache" if cache_hit else "registry"
+    print(f"Loading {model_uri} from {model_source}: {model_dir}")
+    return load_model_dir_bundle(version, model_dir), model_source
+
+# Optional local stand-in for the registry, e.g. {"version": "4", "path": "/shared/models/4"}
+MODEL_REGISTRY_FILE = os.getenv("MODEL_REGISTRY_FILE")
+
+def load_local_registry_bundle(version):
+    registry_version, model_dir = read_local_registry(MODEL_REGISTRY_FILE)
+    if registry_version != str(version):
+        raise ValueError(f"Local registry moved to version {registry_version} while loading {version}")
+    return load_model_dir_bundle(version, model_dir)
+
 # Load model with fallback options
+model_name = "MLOPS-1"
 try:
-    model_name = "MLOPS-1"
-    model_version = get_latest_model_version(model_name)
-    
-    if model_version:
-        model_uri = f"models:/{model_name}/{model_version}"
-        print(f"Fetching model from MLflow: {model_uri}")
-        model = mlflow.pyfunc.load_model(model_uri)
+    if MODEL_REGISTRY_FILE:
+        model_version, _ = read_local_registry(MODEL_REGISTRY_FILE)
+        if not model_version:
+            raise ValueError(f"No model version found in {MODEL_REGISTRY_FILE}")
+        serving = load_local_registry_bundle(model_version)
+        model_source = "local_registry"
     else:
-        raise ValueError("No model version found")
+        # A pinned version that is already cached never touches the registry
+        model_version = os.getenv("MODEL_VERSION") or get_latest_model_version(model_name)
+        if not model_version:
+            model_version = artifact_cache.latest_version(model_name)
+            if model_version:
+                print(f"Registry unavailable, using newest cached version {model_version}")
+        if not model_version:
+            raise ValueError("No model version found")
+        serving, model_source = load_registry_bundle(model_version)
 except Exception as e:
     print(f"MLflow model loading failed: {e}")
+    model_source = "local_pickle"
     try:
-        # Try Docker container path first
-        if os.path.exists("/app/models/model.pkl"):
-            model_path = "/app/models/model.pkl"
+        linear_model_path = bundled_path(LINEAR_MODEL_FILE)
+        if os.path.exists(linear_model_path):
+            print(f"WARNING: serving the bundled model from local file: {linear_model_path}")
+            model_source = "local_artifact"
+            serving = load_linear_bundle("local", linear_model_path, bundled_path("surface_index.json"))
         else:
-            model_path = "models/model.pkl"
-        
-        print(f"Loading model from local file: {model_path}")
-        with open(model_path, "rb") as f:
-            model = pickle.load(f)
+            model_path = bundled_path("model.pkl")
+            print(f"WARNING: serving the bundled model from local file: {model_path}")
+            model = load_pickle(model_path)
+
+            vectorizer_path = bundled_path("vectorizer.pkl")
+            print(f"Loading vectorizer from: {vectorizer_path}")
+            vectorizer = load_pickle(vectorizer_path)
+            serving = build_bundle("local", model, vectorizer, bundled_path("surface_index.json"))
     except Exception as e2:
         print(f"Local model loading failed: {e2}")
         raise RuntimeError(f"Failed to load model: {e2}")
 
-# Load vectorizer
-try:
-    # Try Docker container path first
-    if os.path.exists("/app/models/vectorizer.pkl"):
-        vectorizer_path = "/app/models/vectorizer.pkl"
-    else:
-        vectorizer_path = "models/vectorizer.pkl"
-    
-    print(f"Loading vectorizer from: {vectorizer_path}")
-    with open(vectorizer_path, "rb") as f:
-        vectorizer = pickle.load(f)
-except Exception as e:
-    print(f"Error loading vectorizer: {e}")
-    raise RuntimeError(f"Failed to load vectorizer: {e}")
+# Cache of (label, probability) keyed on model version and a digest of the surface tokens; PREDICTION_CACHE_BYTES=0 disables it
+PREDICTION_CACHE_BYTES = int(os.getenv("PREDICTION_CACHE_BYTES", str(16 * 1024 * 1024)))
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "3600"))
+prediction_cache = None
+if PREDICTION_CACHE_BYTES > 0:
+    prediction_cache = PredictionCache(PREDICTION_CACHE_BYTES, ttl_seconds=PREDICTION_CACHE_TTL, registry=registry)
+    prediction_cache.set_model_version(serving.version)
+
+# Touch WordNet now so it is loaded once before gunicorn forks instead of once per worker
+normalizer.normalize("warming up reviews")
+serving.warm_up()
+
+TIME_TO_READY.labels(source=model_source).set(time.time() - APP_START_TIME)
+
+def swap_bundle(bundle):
+    """Make bundle the one serving traffic; in-flight requests keep the bundle they started with."""
+    global serving
+    serving = bundle
+    if prediction_cache is not None:
+        prediction_cache.set_model_version(bundle.version)
+
+# Hot reload: poll for a new Production version every MODEL_WATCH_INTERVAL seconds (0 disables)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "0"))
+if MODEL_REGISTRY_FILE:
+    model_reloader = ModelReloader(lambda: read_local_registry(MODEL_REGISTRY_FILE)[0], load_local_registry_bundle,
+                                   swap_bundle, serving.version, MODEL_WATCH_INTERVAL, registry=registry)
+else:
+    model_reloader = ModelReloader(lambda: get_production_version(model_name), lambda version: load_registry_bundle(version)[0],
+                                   swap_bundle, serving.version, MODEL_WATCH_INTERVAL, registry=registry)
+
+def start_background_tasks():
+    """Start per-process threads; gunicorn.conf.py calls this after fork since threads don't survive it."""
+    if MODEL_WATCH_INTERVAL > 0 and not os.getenv("MODEL_VERSION"):
+        model_reloader.start()
+
+# Under gunicorn --preload the master imports this module, so threads are started in post_fork instead
+if not os.getenv("DEFER_BACKGROUND_TASKS"):
+    start_background_tasks()
+
+def score(texts, timer=None):
+    """Return (labels, positive-class probabilities) for raw texts, serving repeats from the cache."""
+    timer = timer if timer is not None else StageTimer()
+    # One consistent model/vectorizer pair for the whole request, even if a reload swaps it meanwhile
+    bundle = serving
+    if prediction_cache is None:
+        if bundle.surface_vectorizer is not None:
+            with timer.stage("vectorize"):
+                features = bundle.surface_vectorizer.transform(texts)
+        else:
+            with timer.stage("normalize"):
+                normalized_texts = [normalize_text(text) for text in texts]
+            with timer.stage("vectorize"):
+                features = bundle.vectorizer.transform(normalized_texts)
+        with timer.stage("predict"):
+            return bundle.predictor(features)
+
+    with timer.stage("cache_key"):
+        cache_keys = [(bundle.version, cache_key(text)) for text in texts]
+    with timer.stage("cache"):
+        results = [prediction_cache.get(key) for key in cache_keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        with timer.stage("vectorize"):
+            features = bundle.vectorize([texts[i] for i in missing])
+        with timer.stage("predict"):
+            labels, probabilities = bundle.predictor(features)
+        for position, i in enumerate(missing):
+            probability = None if probabilities is None else float(probabilities[position])
+            results[i] = (int(labels[position]), probability)
+            prediction_cache.put(cache_keys[i], results[i])
+
+    labels = [label for label, _ in results]
+    if any(probability is None for _, probability in results):
+        return labels, None
+    return labels, [probability for _, probability in results]
+
+# On-demand sampling profiler, off unless PROFILE_TOKEN (enables /debug/profile) or PROFILE_SAMPLE_RATE is set
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_MAX_WINDOW_SECONDS = 300
+profiler = None
+if PROFILE_TOKEN or PROFILE_SAMPLE_RATE > 0:
+    profiler = SamplingProfiler(os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "mlops_profiles")),
+                                interval=float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000,
+                                sample_rate=PROFILE_SAMPLE_RATE)
+
+@app.before_request
+def start_profiling():
+    if profiler is not None and request.endpoint != "start_profile_window" and profiler.should_profile():
+        g.profiled = True
+        profiler.begin(threading.get_ident())
+
+@app.teardown_request
+def stop_profiling(exc):
+    if g.get("profiled"):
+        profiler.end(threading.get_ident())
+
+@app.before_request
+def start_stage_timer():
+    g.stage_timer = StageTimer()
+
+@app.after_request
+def record_stage_timings(response):
+    """Export per-stage latency to Prometheus and to the Server-Timing response header."""
+    timer = g.get("stage_timer")
+    if timer is not None and timer.durations and request.url_rule is not None:
+        timer.observe(STAGE_LATENCY, request.url_rule.rule)
+        response.headers["Server-Timing"] = timer.server_timing_header()
+    return response
 
 # Routes
 @app.route("/")
 def home():
     REQUEST_COUNT.labels(method="GET", endpoint="/").inc()
     start_time = time.time()
-    response = render_template("index.html", result=None)
+    with g.stage_timer.stage("render"):
+        response = render_template("index.html", result=None)
     REQUEST_LATENCY.labels(endpoint="/").observe(time.time() - start_time)
     return response
 
@@ -155,26 +375,119 @@ def predict():
     start_time = time.time()
 
     text = request.form["text"]
-    cleaned_text = normalize_text(text)
-
-    # Convert to features
-    features = vectorizer.transform([cleaned_text])
-    features_df = pd.DataFrame(features.toarray(), columns=[str(i) for i in range(features.shape[1])])
 
     # Predict
     try:
-        prediction = model.predict(features_df)[0]
+        labels, _ = score([text], timer=g.stage_timer)
+        prediction = labels[0]
         PREDICTION_COUNT.labels(prediction=str(prediction)).inc()
     except Exception as e:
         return render_template("index.html", result=f"Prediction Error: {str(e)}")
 
+    with g.stage_timer.stage("render"):
+        response = render_template("index.html", result=prediction)
     REQUEST_LATENCY.labels(endpoint="/predict").observe(time.time() - start_time)
-    return render_template("index.html", result=prediction)
+    return response
+
+@app.route("/api/v1/predict_batch", methods=["POST"])
+def predict_batch():
+    """Score a JSON list of texts with one vectorizer and one model call."""
+    REQUEST_COUNT.labels(method="POST", endpoint="/api/v1/predict_batch").inc()
+    start_time = time.time()
+
+    payload = request.get_json(silent=True) or {}
+    texts = payload.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({"error": "'texts' must be a list of strings"}), 400
+    if len(texts) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"Batch size {len(texts)} exceeds the maximum of {MAX_BATCH_SIZE}"}), 413
+    if not texts:
+        return jsonify({"labels": [], "probabilities": []})
+
+    # Vectorize and predict the whole batch at once
+    try:
+        predictions, probabilities = score(texts, timer=g.stage_timer)
+    except Exception as e:
+        return jsonify({"error": f"Prediction Error: {str(e)}"}), 500
+
+    labels = [int(prediction) for prediction in predictions]
+    if probabilities is not None:
+        probabilities = [float(probability) for probability in probabilities]
+    for label in labels:
+        PREDICTION_COUNT.labels(prediction=str(label)).inc()
+
+    elapsed = time.time() - start_time
+    BATCH_SIZE.observe(len(texts))
+    BATCH_ITEM_LATENCY.observe(elapsed / len(texts))
+    REQUEST_LATENCY.labels(endpoint="/api/v1/predict_batch").observe(elapsed)
+    return jsonify({"labels": labels, "probabilities": probabilities})
+
+@app.route("/api/v1/predict_bulk", methods=["POST"])
+def predict_bulk():
+    """
+    Score an NDJSON or CSV body (optionally Content-Encoding: gzip) BULK_CHUNK_SIZE rows at a time,
+    streaming NDJSON results back. Bypasses the prediction cache so a dump doesn't evict hot entries.
+    """
+    REQUEST_COUNT.labels(method="POST", endpoint="/api/v1/predict_bulk").inc()
+    start_time = time.time()
+
+    gzipped = request.headers.get("Content-Encoding", "").lower() == "gzip"
+    # Rows far beyond MAX_TEXT_LENGTH (which normalization truncates to anyway) are rejected unread
+    try:
+        records = iter_records(request.stream, request.content_type, gzipped=gzipped,
+                               text_column=request.args.get("text_column", "text"),
+                               max_line_chars=MAX_TEXT_LENGTH * 4 + 1024)
+    except UnsupportedFormat as e:
+        return jsonify({"error": str(e)}), 415
+    except (OSError, EOFError, zlib.error) as e:
+        return jsonify({"error": f"Could not read request body: {e}"}), 400
+
+    # One model/vectorizer pair for the whole upload, even if a reload swaps it meanwhile
+    bundle = serving
+
+    def score_chunk(texts):
+        return bundle.predictor(bundle.vectorize(texts))
+
+    def count_predictions(labels):
+        BULK_CHUNK_ROWS.observe(len(labels))
+        for label in labels:
+            PREDICTION_COUNT.labels(prediction=str(int(label))).inc()
+
+    def generate():
+        # Headers are already sent, so failures are reported in-band as a final error line
+        try:
+            yield from stream_scores(records, score_chunk, BULK_CHUNK_SIZE, on_chunk=count_predictions)
+        except (OSError, EOFError, zlib.error) as e:
+            yield json.dumps({"error": f"Could not read request body: {e}"}) + "\n"
+        except Exception as e:
+            print(f"Bulk prediction failed: {e}")
+            yield json.dumps({"error": f"Prediction Error: {str(e)}"}) + "\n"
+        finally:
+            # Also runs when the client disconnects and the generator is closed mid-stream
+            REQUEST_LATENCY.labels(endpoint="/api/v1/predict_bulk").observe(time.time() - start_time)
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route("/debug/profile", methods=["POST"])
+def start_profile_window():
+    """Profile every request this worker handles for ?seconds=N (default 30); needs the X-Profile-Token header."""
+    if not PROFILE_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Profile-Token", ""), PROFILE_TOKEN):
+        return jsonify({"error": "Invalid profiling token"}), 403
+    try:
+        seconds = float(request.args.get("seconds", "30"))
+    except ValueError:
+        return jsonify({"error": "'seconds' must be a number"}), 400
+    if not 0 < seconds <= PROFILE_MAX_WINDOW_SECONDS:
+        return jsonify({"error": f"'seconds' must be between 0 and {PROFILE_MAX_WINDOW_SECONDS}"}), 400
+    output_path = profiler.start_window(seconds)
+    return jsonify({"pid": os.getpid(), "seconds": seconds, "output": output_path}), 202
 
 @app.route("/metrics", methods=["GET"])
 def metrics():
     """Expose Prometheus metrics."""
-    return generate_latest(registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+    return generate_latest(exposition_registry), 200, {"Content-Type": CONTENT_TYPE_LATEST}
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
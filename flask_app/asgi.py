@@ -0,0 +1,28 @@
+# ASGI entry point with asyncio micro-batching
+#
+# Run with:
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000
+#   gunicorn -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:5000 asgi:app
+
+import os
+import sys
+
+# Prefer the sibling Flask module over the repo-root pipeline app.py
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import app as flask_service
+from micro_batching import MicroBatcher, create_asgi_app
+
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+# Largest request body read into memory: room for a full batch of texts at the truncation length, JSON-escaped
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(
+    flask_service.MAX_BATCH_SIZE * (flask_service.MAX_TEXT_LENGTH * 4 + 1024))))
+
+batcher = MicroBatcher(
+    flask_service.score,
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    max_wait_seconds=MICRO_BATCH_MAX_WAIT_MS / 1000,
+    registry=flask_service.registry,
+)
+app = create_asgi_app(batcher, flask_service.exposition_registry, flask_service.MAX_BATCH_SIZE,
+                      request_latency=flask_service.REQUEST_LATENCY, max_body_bytes=MAX_REQUEST_BYTES)
@@ -0,0 +1,192 @@
+import csv
+import gzip
+import io
+import json
+
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq", "application/ndjson")
+CSV_TYPES = ("text/csv", "application/csv")
+
+
+class UnsupportedFormat(ValueError):
+    pass
+
+
+class _ReadOnlyStream(io.RawIOBase):
+    """Adapts any object with read(n), e.g. a server's chunked request body, to the io interface."""
+
+    def __init__(self, source):
+        self.source = source
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def open_text_stream(raw_stream, gzipped=False):
+    """Wrap a binary request body as a text stream, decompressing gzip on the fly."""
+    raw_stream = io.BufferedReader(_ReadOnlyStream(raw_stream), buffer_size=64 * 1024)
+    if gzipped:
+        raw_stream = gzip.GzipFile(fileobj=raw_stream, mode="rb")
+    return io.TextIOWrapper(raw_stream, encoding="utf-8", errors="replace", newline="")
+
+
+def iter_ndjson(text_stream, max_line_chars):
+    """
+    Yield (id, text, error) per line. A line is either a JSON string or an object with "text"
+    and an optional "id"; rows without an id are numbered from 0. Lines longer than
+    max_line_chars are skipped without ever being held in memory whole.
+    """
+    row = 0
+    while True:
+        line = text_stream.readline(max_line_chars)
+        if not line:
+            return
+        if len(line) >= max_line_chars and not line.endswith("\n"):
+            # Drain the rest of the oversized line in bounded pieces
+            while line and not line.endswith("\n"):
+                line = text_stream.readline(max_line_chars)
+            yield row, None, f"Line longer than {max_line_chars} characters"
+            row += 1
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            row += 1
+            continue
+        if isinstance(record, str):
+            yield row, record, None
+        elif isinstance(record, dict) and isinstance(record.get("text"), str):
+            yield record.get("id", row), record["text"], None
+        else:
+            record_id = record.get("id", row) if isinstance(record, dict) else row
+            yield record_id, None, "Expected a string or an object with a 'text' string"
+        row += 1
+
+
+class _RowTooLong(ValueError):
+    pass
+
+
+class _BoundedLines:
+    """
+    Line iterator for csv.reader over text_stream that never holds more than max_chars of one row.
+    A row that grows past max_chars is skipped in bounded pieces, up to the newline that ends it
+    outside quotes, and raises _RowTooLong; csv.reader starts afresh on the following line.
+    """
+
+    def __init__(self, text_stream, max_chars):
+        self.text_stream = text_stream
+        self.max_chars = max_chars
+        self.start_row()
+
+    def start_row(self):
+        self.row_chars = 0
+        self.row_quotes = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.text_stream.readline(self.max_chars)
+        if not line:
+            raise StopIteration
+        self.row_chars += len(line)
+        self.row_quotes += line.count('"')
+        if self.row_chars > self.max_chars or (len(line) >= self.max_chars and not line.endswith("\n")):
+            # Escaped quotes come in pairs, so an odd count means the row is still inside a quoted field
+            while line and (not line.endswith("\n") or self.row_quotes % 2):
+                line = self.text_stream.readline(self.max_chars)
+                self.row_quotes += line.count('"')
+            self.start_row()
+            raise _RowTooLong(f"Row longer than {self.max_chars} characters")
+        return line
+
+
+def iter_csv(text_stream, text_column="text", id_column="id", max_line_chars=1024 * 1024):
+    """
+    Yield (id, text, error) per CSV row. The header is read straight away so a missing
+    text_column raises UnsupportedFormat before any response is sent. Rows longer than
+    max_line_chars become errors without ever being held in memory whole.
+    """
+    lines = _BoundedLines(text_stream, max_line_chars)
+    reader = csv.DictReader(lines)
+    try:
+        fieldnames = reader.fieldnames
+    except _RowTooLong as e:
+        raise UnsupportedFormat(f"CSV header: {e}")
+    if fieldnames is None or text_column not in fieldnames:
+        raise UnsupportedFormat(f"CSV header must contain a '{text_column}' column")
+    has_id = id_column in fieldnames
+
+    def rows():
+        row = 0
+        while True:
+            lines.start_row()
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except (csv.Error, _RowTooLong) as e:
+                # The reader resumes at the next line
+                yield row, None, f"Invalid CSV row: {e}"
+                row += 1
+                continue
+            record_id = record[id_column] if has_id else row
+            row += 1
+            text = record.get(text_column)
+            if text is None:
+                yield record_id, None, "Missing text"
+            else:
+                yield record_id, text, None
+    return rows()
+
+
+def iter_records(raw_stream, content_type, gzipped=False, text_column="text", max_line_chars=1024 * 1024):
+    """Pick the row parser for a request content type."""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in NDJSON_TYPES:
+        return iter_ndjson(open_text_stream(raw_stream, gzipped), max_line_chars)
+    if media_type in CSV_TYPES:
+        return iter_csv(open_text_stream(raw_stream, gzipped), text_column=text_column, max_line_chars=max_line_chars)
+    raise UnsupportedFormat(f"Unsupported content type '{media_type}', send NDJSON or CSV")
+
+
+def stream_scores(records, score_fn, chunk_size, on_chunk=None):
+    """
+    Score (id, text, error) records chunk_size at a time with score_fn(texts) -> (labels, probabilities)
+    and yield one NDJSON result line per record, in input order. Only one chunk is held at a time.
+    on_chunk(labels) is called after each scored chunk, e.g. to update metrics.
+    """
+    chunk = []
+
+    def flush():
+        texts = [text for _, text, error in chunk if error is None]
+        labels, probabilities = score_fn(texts) if texts else ([], None)
+        if on_chunk is not None and texts:
+            on_chunk(labels)
+        position = 0
+        lines = []
+        for record_id, _, error in chunk:
+            if error is not None:
+                lines.append(json.dumps({"id": record_id, "error": error}) + "\n")
+                continue
+            probability = None if probabilities is None else float(probabilities[position])
+            lines.append(json.dumps({"id": record_id, "label": int(labels[position]), "probability": probability}) + "\n")
+            position += 1
+        return "".join(lines)
+
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield flush()
+            chunk = []
+    if chunk:
+        yield flush()
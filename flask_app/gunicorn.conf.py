@@ -0,0 +1,44 @@
+# gunicorn settings for the Flask app
+#
+#   gunicorn --config gunicorn.conf.py app:app
+#
+# The app is imported once in the master (preload) so the model, vectorizer, surface index,
+# WordNet and library code are loaded before fork and shared copy-on-write by every worker.
+
+import gc
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+timeout = 120
+preload_app = True
+
+# Background threads (the model watcher) are started per worker in post_fork
+os.environ.setdefault("DEFER_BACKGROUND_TASKS", "1")
+
+
+# Per-process metric files for /metrics; cleared here, before the preloaded app creates any,
+# since files left by a previous run would be summed into this one
+multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if multiproc_dir:
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def pre_fork(server, worker):
+    # Move everything loaded so far out of the collector's reach; otherwise the first
+    # collection in each worker writes to every object header and un-shares the pages.
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import app as flask_service
+    flask_service.start_background_tasks()
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
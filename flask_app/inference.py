@@ -0,0 +1,121 @@
+import mmap
+
+import numpy as np
+import pandas as pd
+
+# Serving modes for turning vectorizer output into predictions
+DATAFRAME_MODE = "dataframe"
+SPARSE_MODE = "sparse"
+
+
+def unwrap_sklearn_model(loaded_model):
+    """Return the sklearn estimator behind a loaded model, or None if it can't be reached."""
+    if hasattr(loaded_model, "predict_proba"):
+        return loaded_model
+
+    # MLflow pyfunc models expose the flavor's native model
+    get_raw_model = getattr(loaded_model, "get_raw_model", None)
+    if get_raw_model is not None:
+        try:
+            raw_model = get_raw_model()
+            if hasattr(raw_model, "predict_proba"):
+                return raw_model
+        except Exception:
+            pass
+
+    # Older MLflow releases keep the sklearn flavor wrapper on _model_impl
+    model_impl = getattr(loaded_model, "_model_impl", None)
+    raw_model = getattr(model_impl, "sklearn_model", None)
+    if raw_model is not None and hasattr(raw_model, "predict_proba"):
+        return raw_model
+    return None
+
+
+def shared_readonly_array(array):
+    """
+    Copy array into an anonymous shared memory mapping and return a read-only view. Forked
+    gunicorn workers then keep sharing these pages instead of copying them on first write.
+    Arrays that are already read-only, such as views of a memory-mapped file, are returned as is.
+    """
+    array = np.ascontiguousarray(array)
+    if array.nbytes == 0 or not array.flags.writeable:
+        return array
+    buffer = mmap.mmap(-1, array.nbytes)
+    shared = np.frombuffer(buffer, dtype=array.dtype).reshape(array.shape)
+    shared[...] = array
+    shared.flags.writeable = False
+    return shared
+
+
+class SparseLinearScorer:
+    """Binary linear classifier scored as a sparse dot product over CSR features."""
+
+    def __init__(self, coef, intercept, classes):
+        coef = np.asarray(coef).ravel()
+        if coef.dtype not in (np.float32, np.float64):
+            coef = coef.astype(np.float64)
+        self.coef = shared_readonly_array(coef)
+        self.intercept = float(intercept)
+        self.classes = np.asarray(classes)
+
+    @classmethod
+    def from_estimator(cls, estimator):
+        """Build a scorer from a fitted binary linear estimator such as LogisticRegression."""
+        coef = getattr(estimator, "coef_", None)
+        classes = getattr(estimator, "classes_", None)
+        if coef is None or classes is None or coef.shape[0] != 1 or len(classes) != 2:
+            raise ValueError("SparseLinearScorer needs a fitted binary linear estimator")
+        return cls(coef[0], estimator.intercept_[0], classes)
+
+    def decision_function(self, features):
+        return features @ self.coef + self.intercept
+
+    def predict_proba(self, features):
+        """Return the probability of the positive class for each row."""
+        return 1.0 / (1.0 + np.exp(-self.decision_function(features)))
+
+    def predict(self, features):
+        return self.classes[(self.decision_function(features) > 0).astype(np.intp)]
+
+
+def dataframe_predict(model, features):
+    """Legacy path: densify the features into a DataFrame before calling the model."""
+    features_df = pd.DataFrame(features.toarray(), columns=[str(i) for i in range(features.shape[1])])
+    labels = model.predict(features_df)
+    probabilities = model.predict_proba(features_df)[:, 1] if hasattr(model, "predict_proba") else None
+    return labels, probabilities
+
+
+def build_predictor(model, mode=SPARSE_MODE):
+    """
+    Return a function mapping CSR features to (labels, positive-class probabilities).
+    Sparse mode skips the dense DataFrame and falls back to it when the model can't be unwrapped.
+    """
+    if isinstance(model, SparseLinearScorer):
+        # Loaded from an exported linear model, which has no DataFrame path
+        def predict_scorer(features):
+            return model.predict(features), model.predict_proba(features)
+        return predict_scorer
+
+    if mode == SPARSE_MODE:
+        estimator = unwrap_sklearn_model(model)
+        if estimator is not None:
+            try:
+                scorer = SparseLinearScorer.from_estimator(estimator)
+            except ValueError:
+                scorer = None
+
+            if scorer is not None:
+                def predict_sparse(features):
+                    return scorer.predict(features), scorer.predict_proba(features)
+                return predict_sparse
+
+            def predict_estimator(features):
+                return estimator.predict(features), estimator.predict_proba(features)[:, 1]
+            return predict_estimator
+    elif mode != DATAFRAME_MODE:
+        raise ValueError(f"Unknown inference mode: {mode}")
+
+    def predict_dataframe(features):
+        return dataframe_predict(model, features)
+    return predict_dataframe
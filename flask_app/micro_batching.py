@@ -0,0 +1,196 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prometheus_client import Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+
+class MicroBatcher:
+    """
+    Collects texts from concurrent requests into one queue and scores them in batches of at
+    most max_batch_size, waiting at most max_wait_seconds after the first text of a batch.
+    score_fn(texts) -> (labels, probabilities) runs on a single background thread.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_seconds=0.005, registry=None):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.queue = None
+        self._task = None
+        self._executor = None
+
+        self.queue_depth = Gauge("micro_batch_queue_depth", "Texts waiting to be scored", registry=registry,
+                                 multiprocess_mode="livesum")
+        self.fill_ratio = Histogram("micro_batch_fill_ratio", "Batch size divided by the maximum batch size",
+                                    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0), registry=registry)
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="micro-batcher")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def submit(self, text):
+        """Queue one text and wait for its (label, probability)."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((text, future))
+        self.queue_depth.set(self.queue.qsize())
+        return await future
+
+    async def submit_many(self, texts):
+        return await asyncio.gather(*(self.submit(text) for text in texts))
+
+    async def _collect_batch(self, batch):
+        """Fill batch in place, so the caller can still fail every collected future if this raises."""
+        batch.append(await self.queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                await self._collect_batch(batch)
+                self.queue_depth.set(self.queue.qsize())
+                self.fill_ratio.observe(len(batch) / self.max_batch_size)
+
+                texts = [text for text, _ in batch]
+                labels, probabilities = await loop.run_in_executor(self._executor, self.score_fn, texts)
+                for i, (_, future) in enumerate(batch):
+                    if not future.done():
+                        probability = None if probabilities is None else float(probabilities[i])
+                        future.set_result((int(labels[i]), probability))
+            except Exception as e:
+                # Any failure (scoring, a malformed result, metrics) fails this batch only; the loop keeps serving
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+async def _read_body(receive, max_bytes):
+    """Return the request body, raising RequestTooLarge as soon as it passes max_bytes."""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > max_bytes:
+            raise RequestTooLarge(f"Request body exceeds the maximum of {max_bytes} bytes")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+async def _send_response(send, status, body, content_type="application/json"):
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", content_type.encode("latin-1"))]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status, payload):
+    await _send_response(send, status, json.dumps(payload).encode("utf-8"))
+
+
+def create_asgi_app(batcher, registry, max_batch_size, request_latency=None, max_body_bytes=16 * 1024 * 1024):
+    """
+    Minimal ASGI app exposing /api/v1/predict, /api/v1/predict_batch and /metrics on top of a MicroBatcher.
+    request_latency, if given, is a Histogram with an "endpoint" label. Bodies over max_body_bytes get a 413.
+    """
+
+    async def handle_lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await batcher.start()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await batcher.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def handle_predict(payload, send):
+        text = payload.get("text")
+        if not isinstance(text, str):
+            return await _send_json(send, 400, {"error": "'text' must be a string"})
+        label, probability = await batcher.submit(text)
+        await _send_json(send, 200, {"label": label, "probability": probability})
+
+    async def handle_predict_batch(payload, send):
+        texts = payload.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return await _send_json(send, 400, {"error": "'texts' must be a list of strings"})
+        if len(texts) > max_batch_size:
+            return await _send_json(send, 413, {"error": f"Batch size {len(texts)} exceeds the maximum of {max_batch_size}"})
+        results = await batcher.submit_many(texts)
+        labels = [label for label, _ in results]
+        probabilities = None if any(p is None for _, p in results) else [p for _, p in results]
+        await _send_json(send, 200, {"labels": labels, "probabilities": probabilities})
+
+    routes = {"/api/v1/predict": handle_predict, "/api/v1/predict_batch": handle_predict_batch}
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await handle_lifespan(receive, send)
+        if scope["type"] != "http":
+            return
+
+        path, method = scope["path"], scope["method"]
+        if path == "/metrics" and method == "GET":
+            return await _send_response(send, 200, generate_latest(registry), CONTENT_TYPE_LATEST)
+        if path not in routes:
+            return await _send_json(send, 404, {"error": "Not found"})
+        if method != "POST":
+            return await _send_json(send, 405, {"error": "Method not allowed"})
+
+        start_time = time.time()
+        if batcher.queue is None:
+            # Servers without lifespan support never send the startup event
+            await batcher.start()
+        try:
+            payload = json.loads(await _read_body(receive, max_body_bytes) or b"{}")
+        except RequestTooLarge as e:
+            return await _send_json(send, 413, {"error": str(e)})
+        except ValueError:
+            return await _send_json(send, 400, {"error": "Request body must be JSON"})
+        if not isinstance(payload, dict):
+            return await _send_json(send, 400, {"error": "Request body must be a JSON object"})
+        try:
+            await routes[path](payload, send)
+        except Exception as e:
+            return await _send_json(send, 500, {"error": f"Prediction Error: {str(e)}"})
+        if request_latency is not None:
+            request_latency.labels(endpoint=path).observe(time.time() - start_time)
+
+    return app
@@ -0,0 +1,109 @@
+import json
+import threading
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+class ServingBundle:
+    """A model, the vectorizer it was trained with and their derived helpers, swapped as one unit."""
+
+    def __init__(self, version, model, vectorizer, predictor, normalizer, surface_vectorizer=None):
+        self.version = str(version)
+        self.model = model
+        self.vectorizer = vectorizer
+        self.predictor = predictor
+        self.normalizer = normalizer
+        self.surface_vectorizer = surface_vectorizer
+
+    def vectorize(self, texts):
+        """Turn raw texts into this bundle's feature space."""
+        if self.surface_vectorizer is not None:
+            return self.surface_vectorizer.transform(texts)
+        return self.vectorizer.transform([self.normalizer.normalize(text) for text in texts])
+
+    def warm_up(self):
+        """Run one prediction so lazy initialisation happens before the bundle takes traffic."""
+        self.predictor(self.vectorize(["warm up"]))
+
+
+def read_local_registry(file_path):
+    """
+    Local stand-in for the model registry: a JSON file such as
+    {"version": "4", "path": "/shared/models/4"} naming the current Production version.
+    """
+    try:
+        with open(file_path) as f:
+            entry = json.load(f)
+        return str(entry["version"]), entry.get("path")
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading local model registry {file_path}: {e}")
+        return None, None
+
+
+class ModelReloader:
+    """
+    Polls for a new Production version every interval seconds on a daemon thread, loads and
+    warms it off the request path, then hands it to on_swap, which replaces the active bundle.
+    get_version() -> version or None; load_bundle(version) -> ServingBundle.
+    """
+
+    def __init__(self, get_version, load_bundle, on_swap, current_version, interval, registry=None):
+        self.get_version = get_version
+        self.load_bundle = load_bundle
+        self.on_swap = on_swap
+        self.current_version = str(current_version)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.reloads = Counter("model_reloads", "Model reload attempts", ["status"], registry=registry)
+        self.load_duration = Histogram("model_load_duration_seconds", "Time to load and warm a new model", registry=registry)
+        self.active_version = Gauge("model_active_version", "Registry version of the model serving traffic",
+                                    registry=registry, multiprocess_mode="max")
+        self.set_active_version(self.current_version)
+
+    def set_active_version(self, version):
+        self.active_version.set(float(version) if str(version).isdigit() else 0)
+
+    def check_once(self):
+        """Load and swap in the newest version if it differs from the active one; True if swapped."""
+        version = self.get_version()
+        if not version or str(version) == self.current_version:
+            return False
+
+        start_time = time.time()
+        try:
+            bundle = self.load_bundle(version)
+            bundle.warm_up()
+        except Exception as e:
+            self.reloads.labels(status="failure").inc()
+            print(f"Failed to load model version {version}, keeping {self.current_version}: {e}")
+            return False
+        self.load_duration.observe(time.time() - start_time)
+
+        self.on_swap(bundle)
+        self.current_version = bundle.version
+        self.set_active_version(bundle.version)
+        self.reloads.labels(status="success").inc()
+        print(f"Hot-swapped model to version {bundle.version}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_once()
+            except Exception as e:
+                print(f"Model watcher error: {e}")
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="model-reloader", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tree_hashes(root):
+    """Return ({relative path: sha256}, content hash of the whole tree)."""
+    files = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            full_path = os.path.join(dir_path, file_name)
+            files[os.path.relpath(full_path, root).replace(os.sep, "/")] = file_sha256(full_path)
+    digest = hashlib.sha256()
+    for relative_path, file_hash in sorted(files.items()):
+        digest.update(f"{relative_path}\t{file_hash}\n".encode("utf-8"))
+    return files, digest.hexdigest()
+
+
+class ModelArtifactCache:
+    """
+    On-disk cache of downloaded model artifacts laid out as
+    <cache_dir>/<model name>/<version>/<content hash>/ with a manifest of per-file checksums.
+    Safe to share between pods: entries are written to a temp dir and renamed into place.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _version_dir(self, model_name, version):
+        return os.path.join(self.cache_dir, model_name, str(version))
+
+    def _read_manifest(self, model_name, version):
+        manifest_path = os.path.join(self._version_dir(model_name, version), MANIFEST_NAME)
+        try:
+            with open(manifest_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, model_name, version):
+        """Return the verified artifact directory for a cached version, or None if missing or corrupt."""
+        manifest = self._read_manifest(model_name, version)
+        if manifest is None:
+            return None
+        artifact_dir = os.path.join(self._version_dir(model_name, version), manifest["content_hash"])
+        if not os.path.isdir(artifact_dir):
+            return None
+        files, content_hash = tree_hashes(artifact_dir)
+        if files != manifest["files"] or content_hash != manifest["content_hash"]:
+            print(f"Cached model {model_name} v{version} failed integrity check, discarding it")
+            shutil.rmtree(self._version_dir(model_name, version), ignore_errors=True)
+            return None
+        return artifact_dir
+
+    def put(self, model_name, version, download_fn):
+        """Download a version with download_fn(target_dir) and add it to the cache; returns its directory."""
+        version_dir = self._version_dir(model_name, version)
+        os.makedirs(version_dir, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix=".staging-", dir=version_dir)
+        # mkdtemp/mkstemp create 0700/0600 entries; the cache may be shared with workers running as other users
+        os.chmod(staging_dir, 0o755)
+        try:
+            download_fn(staging_dir)
+            files, content_hash = tree_hashes(staging_dir)
+            artifact_dir = os.path.join(version_dir, content_hash)
+            try:
+                os.rename(staging_dir, artifact_dir)
+            except OSError:
+                # Another process already stored identical content
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        manifest = {"name": model_name, "version": str(version), "content_hash": content_hash, "files": files}
+        fd, manifest_tmp = tempfile.mkstemp(prefix=".manifest-", dir=version_dir)
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            json.dump(manifest, f, indent=4)
+        os.replace(manifest_tmp, os.path.join(version_dir, MANIFEST_NAME))
+        return artifact_dir
+
+    def get_or_download(self, model_name, version, download_fn):
+        """Return (artifact directory, True if it was served from the cache)."""
+        artifact_dir = self.get(model_name, version)
+        if artifact_dir is not None:
+            return artifact_dir, True
+        return self.put(model_name, version, download_fn), False
+
+    def latest_version(self, model_name):
+        """Highest cached version of a model with a manifest, or None."""
+        model_dir = os.path.join(self.cache_dir, model_name)
+        if not os.path.isdir(model_dir):
+            return None
+        versions = [name for name in os.listdir(model_dir)
+                    if name.isdigit() and os.path.exists(os.path.join(model_dir, name, MANIFEST_NAME))]
+        return max(versions, key=int) if versions else None
@@ -0,0 +1,88 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from prometheus_client import Counter, Gauge
+
+# Rough per-entry bookkeeping cost on top of the key itself (OrderedDict node, tuples, floats)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of (label, probability) keyed on (model version, text digest), with a TTL,
+    a byte budget and automatic invalidation when the serving model version changes.
+    """
+
+    def __init__(self, max_bytes, ttl_seconds=None, registry=None, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self.model_version = None
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = Counter("prediction_cache_hits", "Prediction cache hits", registry=registry)
+        self.misses = Counter("prediction_cache_misses", "Prediction cache misses", registry=registry)
+        self.evictions = Counter("prediction_cache_evictions", "Prediction cache evictions", ["reason"], registry=registry)
+        self.size_bytes = Gauge("prediction_cache_bytes", "Estimated prediction cache size in bytes",
+                                registry=registry, multiprocess_mode="livesum")
+
+    @staticmethod
+    def entry_size(key):
+        parts = key if isinstance(key, tuple) else (key,)
+        return sum(sys.getsizeof(part) for part in parts) + ENTRY_OVERHEAD_BYTES
+
+    def set_model_version(self, model_version):
+        """Record the serving model version, dropping every entry if it changed."""
+        with self._lock:
+            if model_version != self.model_version:
+                if self._entries:
+                    self.evictions.labels(reason="model_change").inc(len(self._entries))
+                self._entries.clear()
+                self.current_bytes = 0
+                self.size_bytes.set(0)
+                self.model_version = model_version
+
+    def get(self, key):
+        """Return the cached result for key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses.inc()
+                return None
+            result, expires_at, size = entry
+            if expires_at is not None and self.clock() >= expires_at:
+                self._remove(key, size, reason="expired")
+                self.misses.inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits.inc()
+            return result
+
+    def put(self, key, result):
+        size = self.entry_size(key)
+        if size > self.max_bytes:
+            return
+        expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self.current_bytes -= old_entry[2]
+            self._entries[key] = (result, expires_at, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                oldest_key, (_, _, oldest_size) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_size, reason="capacity")
+            self.size_bytes.set(self.current_bytes)
+
+    def _remove(self, key, size, reason):
+        del self._entries[key]
+        self.current_bytes -= size
+        self.evictions.labels(reason=reason).inc()
+        self.size_bytes.set(self.current_bytes)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,136 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+
+def frame_label(frame):
+    """'package/module.py:function' for a frame, short enough to read in a flame graph."""
+    code = frame.f_code
+    directory, file_name = os.path.split(code.co_filename)
+    label = f"{os.path.basename(directory)}/{file_name}:{code.co_name}"
+    # Spaces and semicolons are separators in the collapsed format
+    return label.replace(" ", "_").replace(";", "_")
+
+
+def collapse_stack(frame):
+    """Root-first 'a;b;c' stack for a frame, the collapsed format flamegraph.pl and speedscope read."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for request threads. A daemon thread wakes every interval seconds and
+    records the stacks of the threads that registered with begin(); nothing is sampled while no
+    request is being profiled. Requests are picked at sample_rate, or all of them during a window
+    started with start_window(). Stacks are written to output_dir in collapsed format.
+    """
+
+    def __init__(self, output_dir, interval=0.005, sample_rate=0.0, flush_interval=60.0, rng=random.random):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self.rng = rng
+        self.stacks = Counter()
+        self.window_stacks = Counter()
+        self.window_end = None
+        self.window_path = None
+        self._active = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._last_flush = time.monotonic()
+
+    def should_profile(self):
+        return self.window_end is not None or (self.sample_rate > 0 and self.rng() < self.sample_rate)
+
+    def begin(self, thread_id):
+        self._ensure_thread()
+        with self._lock:
+            self._active.add(thread_id)
+        self._wake.set()
+
+    def end(self, thread_id):
+        with self._lock:
+            self._active.discard(thread_id)
+
+    def start_window(self, seconds):
+        """Profile every request for the next seconds; returns the file the stacks will be written to."""
+        self._ensure_thread()
+        os.makedirs(self.output_dir, exist_ok=True)
+        with self._lock:
+            self.window_stacks = Counter()
+            self.window_path = os.path.join(self.output_dir, f"window-{os.getpid()}-{int(time.time())}.folded")
+            self.window_end = time.monotonic() + seconds
+        self._wake.set()
+        return self.window_path
+
+    def sample_once(self):
+        """Record one sample of every registered thread."""
+        with self._lock:
+            active = list(self._active)
+        if not active:
+            return
+        frames = sys._current_frames()
+        with self._lock:
+            for thread_id in active:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = collapse_stack(frame)
+                if self.window_end is not None:
+                    self.window_stacks[stack] += 1
+                else:
+                    self.stacks[stack] += 1
+
+    def write_stacks(self, stacks, file_path):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".profile-", dir=os.path.dirname(file_path))
+        with os.fdopen(fd, "w") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(tmp_path, file_path)
+
+    def flush(self):
+        """Write the cumulative sampled-request stacks to <output_dir>/sampled-<pid>.folded."""
+        with self._lock:
+            stacks = Counter(self.stacks)
+        if stacks:
+            self.write_stacks(stacks, os.path.join(self.output_dir, f"sampled-{os.getpid()}.folded"))
+        self._last_flush = time.monotonic()
+
+    def _finish_window(self):
+        with self._lock:
+            stacks, path = self.window_stacks, self.window_path
+            self.window_end = self.window_path = None
+            self.window_stacks = Counter()
+        self.write_stacks(stacks, path)
+        print(f"Profiling window finished, {sum(stacks.values())} samples written to {path}")
+
+    def _run(self):
+        while True:
+            if self.window_end is None and not self._active:
+                # Idle until a request or window needs sampling, waking up to flush now and then
+                self._wake.wait(self.flush_interval)
+                self._wake.clear()
+            else:
+                time.sleep(self.interval)
+                self.sample_once()
+            if self.window_end is not None and time.monotonic() >= self.window_end:
+                self._finish_window()
+            if time.monotonic() - self._last_flush >= self.flush_interval:
+                self.flush()
+
+    def _ensure_thread(self):
+        # Started lazily so each forked gunicorn worker gets its own sampler thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
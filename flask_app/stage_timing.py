@@ -0,0 +1,26 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """Accumulates wall-clock time per named request stage (normalize, vectorize, predict, render)."""
+
+    def __init__(self):
+        self.durations = {}
+
+    @contextmanager
+    def stage(self, name):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[name] = self.durations.get(name, 0.0) + time.perf_counter() - start_time
+
+    def observe(self, histogram, endpoint):
+        """Record every stage in a Histogram labelled by endpoint and stage."""
+        for name, duration in self.durations.items():
+            histogram.labels(endpoint=endpoint, stage=name).observe(duration)
+
+    def server_timing_header(self):
+        """Format the stages as a Server-Timing header value, durations in milliseconds."""
+        return ", ".join(f"{name};dur={duration * 1000:.3f}" for name, duration in self.durations.items())
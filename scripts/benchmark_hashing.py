@@ -0,0 +1,95 @@
+# compare the BoW (CountVectorizer) and hashing feature modes: accuracy and vectorizing throughput
+
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.features.feature_engineering import hashing_vectorizer, parallel_transform
+
+
+def make_sentiment_corpus(n_docs, vocab_size, words_per_doc, seed=42):
+    """
+    Synthetic reviews over a Zipf-like vocabulary in which 5% of the terms carry sentiment;
+    each label is drawn from the logistic of the review's summed term weights.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    frequencies = 1.0 / np.arange(1, vocab_size + 1) ** 0.9
+    frequencies /= frequencies.sum()
+    term_weights = np.zeros(vocab_size)
+    sentiment_terms = rng.choice(vocab_size, size=vocab_size // 20, replace=False)
+    term_weights[sentiment_terms] = rng.normal(0, 1.5, size=sentiment_terms.size)
+
+    docs, labels = [], []
+    for _ in range(n_docs):
+        term_ids = rng.choice(vocab_size, size=words_per_doc, p=frequencies)
+        probability = 1.0 / (1.0 + np.exp(-term_weights[term_ids].sum()))
+        docs.append(" ".join(vocab[term_ids]))
+        labels.append(int(rng.random() < probability))
+    return docs, np.array(labels)
+
+
+def evaluate(name, vectorizer, fit, train_docs, y_train, test_docs, y_test, n_jobs=1):
+    start = time.perf_counter()
+    if fit:
+        x_train = vectorizer.fit_transform(train_docs)
+    else:
+        x_train = parallel_transform(vectorizer, train_docs, n_jobs)
+    train_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    x_test = vectorizer.transform(test_docs) if fit else parallel_transform(vectorizer, test_docs, n_jobs)
+    test_seconds = time.perf_counter() - start
+
+    model = LogisticRegression(C=2, solver="liblinear", penalty="l1").fit(x_train, y_train)
+    return {
+        "name": name,
+        "features": x_train.shape[1],
+        "accuracy": float(accuracy_score(y_test, model.predict(x_test))),
+        "train_docs_per_s": len(train_docs) / train_seconds,
+        "test_docs_per_s": len(test_docs) / test_seconds,
+        "vectorizer_pickle_kib": len(pickle.dumps(vectorizer)) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy and throughput of BoW vs hashing features")
+    parser.add_argument("--docs", type=int, default=40000)
+    parser.add_argument("--vocab-size", type=int, default=50000)
+    parser.add_argument("--words-per-doc", type=int, default=120)
+    parser.add_argument("--max-features", type=int, nargs="+", default=[20, 1000, 20000])
+    parser.add_argument("--hash-features", type=int, nargs="+", default=[1024, 2 ** 14, 2 ** 18])
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, -1])
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    docs, labels = make_sentiment_corpus(args.docs, args.vocab_size, args.words_per_doc)
+    split = int(len(docs) * 0.7)
+    data = (docs[:split], labels[:split], docs[split:], labels[split:])
+
+    results = []
+    for max_features in args.max_features:
+        results.append(evaluate(f"bow max_features={max_features}", CountVectorizer(max_features=max_features), True, *data))
+    for hash_features in args.hash_features:
+        for n_jobs in args.n_jobs:
+            results.append(evaluate(f"hashing n_features={hash_features} n_jobs={n_jobs}",
+                                    hashing_vectorizer(hash_features), False, *data, n_jobs=n_jobs))
+
+    for result in results:
+        print(f"{result['name']:<40} accuracy={result['accuracy']:.4f}  train={result['train_docs_per_s']:9.0f} docs/s  "
+              f"test={result['test_docs_per_s']:9.0f} docs/s  vectorizer={result['vectorizer_pickle_kib']:8.1f} KiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# benchmark the hyperparameter search in src/model/hyperparameter_search.py: warm-started C paths
+# against cold fits of every candidate, on one worker and on the whole pool, checking the winner agrees
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmark_streaming_training import make_features
+from src.model.hyperparameter_search import search_hyperparameters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-started vs cold hyperparameter search")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--features", type=int, default=1000)
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    x_train, y_train = make_features(args.rows, args.features, 60, seed=1)
+    search_params = {"C": [0.1, 0.25, 0.5, 1, 2, 4], "penalty": ["l1", "l2"], "cv_folds": 3, "scoring": "roc_auc",
+                     "max_iter": 1000, "seed": 42}
+    results = []
+    for n_jobs in args.n_jobs:
+        for warm_start in (False, True):
+            start = time.perf_counter()
+            model, candidates = search_hyperparameters(x_train, y_train, {**search_params, "n_jobs": n_jobs}, warm_start)
+            seconds = time.perf_counter() - start
+            best = max(candidates, key=lambda candidate: candidate["score"])
+            result = {"n_jobs": n_jobs, "warm_start": warm_start, "seconds": seconds,
+                      "fit_seconds": sum(candidate["fit_seconds"] for candidate in candidates),
+                      "saga_epochs": sum(candidate["n_iter"] for candidate in candidates),
+                      "best": [best["penalty"], best["C"]], "best_score": best["score"]}
+            results.append(result)
+            print(f"n_jobs={n_jobs:>2} warm_start={str(warm_start):<5} {seconds:7.2f} s  fits {result['fit_seconds']:7.2f} s  "
+                  f"saga epochs={result['saga_epochs']:>5}  best={best['penalty']} C={best['C']} "
+                  f"roc_auc={best['score']:.4f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "features": args.features, "cpu_count": os.cpu_count(),
+                       "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
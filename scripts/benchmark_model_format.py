@@ -0,0 +1,108 @@
+# benchmark pickled model + vectorizer vs the compact linear model artifact: file size,
+# cold load time in a fresh interpreter, resident memory and prediction agreement per weight dtype
+
+import argparse
+import json
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(PROJECT_ROOT, 'flask_app'))
+sys.path.append(PROJECT_ROOT)
+from benchmark_sparse_inference import make_corpus
+from inference import SparseLinearScorer
+from src.model.linear_artifact import export_linear_model, load_linear_model
+
+# Run in a fresh interpreter so imports (sklearn for the pickles) are part of the cost
+LOAD_PICKLES = """
+import pickle, sys, time
+start = time.perf_counter()
+with open(sys.argv[1], "rb") as f: model = pickle.load(f)
+with open(sys.argv[2], "rb") as f: vectorizer = pickle.load(f)
+"""
+LOAD_ARTIFACT = """
+import sys, time
+sys.path.insert(0, sys.argv[3])
+start = time.perf_counter()
+from src.model.linear_artifact import load_linear_model
+artifact = load_linear_model(sys.argv[1])
+"""
+REPORT = """
+elapsed = time.perf_counter() - start
+rss = [int(line.split()[1]) / 1024 for line in open("/proc/self/status") if line.startswith("VmRSS")][0]
+print(elapsed, rss, "sklearn" in sys.modules)
+"""
+
+
+def cold_load(script, *args):
+    output = subprocess.check_output([sys.executable, "-c", script + REPORT, *args], text=True).split()
+    return {"load_ms": float(output[0]) * 1000, "rss_mib": float(output[1]), "imports_sklearn": output[2] == "True"}
+
+
+def benchmark(max_features, n_docs, tmp_dir):
+    docs, labels = make_corpus(n_docs, max_features, words_per_doc=50)
+    vectorizer = CountVectorizer(max_features=max_features)
+    features = vectorizer.fit_transform(docs)
+    model = LogisticRegression(C=2, solver="liblinear").fit(features, labels)
+    expected_labels = model.predict(features)
+    expected_probabilities = model.predict_proba(features)[:, 1]
+
+    model_path = os.path.join(tmp_dir, "model.pkl")
+    vectorizer_path = os.path.join(tmp_dir, "vectorizer.pkl")
+    with open(model_path, "wb") as f:
+        pickle.dump(model, f)
+    with open(vectorizer_path, "wb") as f:
+        pickle.dump(vectorizer, f)
+    results = {"max_features": max_features, "pickle": {
+        "size_kib": (os.path.getsize(model_path) + os.path.getsize(vectorizer_path)) / 1024,
+        **cold_load(LOAD_PICKLES, model_path, vectorizer_path)}}
+
+    for weight_dtype in ("float64", "float32", "float16", "int8"):
+        artifact_path = os.path.join(tmp_dir, f"linear_model_{weight_dtype}.bin")
+        export_linear_model(model, vectorizer, artifact_path, weight_dtype=weight_dtype)
+        artifact = load_linear_model(artifact_path)
+        scorer = SparseLinearScorer(artifact.weights, artifact.intercept, artifact.classes)
+        artifact_features = artifact.vectorizer.transform(docs)
+        results[weight_dtype] = {
+            "size_kib": os.path.getsize(artifact_path) / 1024,
+            **cold_load(LOAD_ARTIFACT, artifact_path, "", PROJECT_ROOT),
+            "label_agreement": float(np.mean(scorer.predict(artifact_features) == expected_labels)),
+            "max_probability_error": float(np.abs(scorer.predict_proba(artifact_features) - expected_probabilities).max()),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pickles vs the compact linear model artifact")
+    parser.add_argument("--max-features", type=int, nargs="+", default=[20, 20000, 200000])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    all_results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for max_features in args.max_features:
+            results = benchmark(max_features, args.docs, tmp_dir)
+            all_results.append(results)
+            for name, stats in results.items():
+                if name == "max_features":
+                    continue
+                agreement = f"  agreement={stats['label_agreement']:.4f}  max|dp|={stats['max_probability_error']:.2e}" \
+                    if "label_agreement" in stats else ""
+                print(f"max_features={max_features:>7} {name:<8} size={stats['size_kib']:9.1f} KiB  "
+                      f"load={stats['load_ms']:8.1f} ms  rss={stats['rss_mib']:6.1f} MiB  "
+                      f"sklearn={str(stats['imports_sklearn']):<5}{agreement}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(all_results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
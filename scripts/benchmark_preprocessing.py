@@ -0,0 +1,75 @@
+# benchmark the training text preprocessing in src/data/data_preprocessing.py: the row-by-row
+# apply against the process-pool engine and the unique-token mode at several corpus sizes,
+# checking every variant gives the same output
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.data.data_preprocessing import preprocess_dataframes
+
+WORDS = ("the a and of to it this was is in for but with movie film story actors acting plot ending scene "
+         "characters loved loving hated hating watched watching better best worst terrible wonderful boring "
+         "amazing brilliant running ran leaves leaf geese mice children wolves batteries stars hours days "
+         "would not never again really very much too I my we they he she").split()
+EXTRAS = ["!!!", "...", "10/10", "2", "(spoilers)", "don't", "it's", "—", ";", "?", "https://example.com/r", "www.example.com/x?"]
+
+
+def make_reviews(n_rows, seed=42, distinct=200000):
+    """Synthetic English-like reviews with stop words, digits, punctuation and URLs; rows repeat after distinct."""
+    rng = np.random.default_rng(seed)
+    pool = []
+    for _ in range(min(n_rows, distinct)):
+        words = list(rng.choice(WORDS, size=int(rng.integers(15, 60))))
+        for _ in range(int(rng.integers(0, 4))):
+            words.insert(int(rng.integers(0, len(words) + 1)), EXTRAS[int(rng.integers(0, len(EXTRAS)))])
+        words[0] = words[0].capitalize()
+        pool.append(" ".join(words))
+    return [pool[i % len(pool)] for i in range(n_rows)]
+
+
+def run(texts, n_jobs, chunk_size, mode="row"):
+    df = pd.DataFrame({"review": texts, "sentiment": np.zeros(len(texts), dtype=np.int8)})
+    start = time.perf_counter()
+    (result,) = preprocess_dataframes([df], "review", n_jobs=n_jobs, chunk_size=chunk_size, mode=mode)
+    return time.perf_counter() - start, result["review"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Row-by-row vs process-pool training text preprocessing")
+    parser.add_argument("--rows", type=int, nargs="+", default=[50000, 500000, 5000000])
+    parser.add_argument("--n-jobs", type=int, nargs="+", default=[2, 4, -1])
+    parser.add_argument("--modes", nargs="+", default=["row", "unique_tokens"])
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.rows:
+        texts = make_reviews(n_rows)
+        serial_seconds, expected = run(texts, 1, args.chunk_size)
+        print(f"rows={n_rows:>8}  mode=row            n_jobs= 1  {serial_seconds:8.2f} s  {n_rows / serial_seconds:9.0f} rows/s")
+        results.append({"rows": n_rows, "mode": "row", "n_jobs": 1, "seconds": serial_seconds, "speedup": 1.0})
+        for mode in args.modes:
+            for n_jobs in ([1] if mode != "row" else []) + args.n_jobs:
+                seconds, output = run(texts, n_jobs, args.chunk_size, mode)
+                if not output.equals(expected):
+                    raise AssertionError(f"mode={mode} n_jobs={n_jobs} output differs from the row-by-row path")
+                results.append({"rows": n_rows, "mode": mode, "n_jobs": n_jobs, "seconds": seconds,
+                                "speedup": serial_seconds / seconds})
+                print(f"rows={n_rows:>8}  mode={mode:<14} n_jobs={n_jobs:>2}  {seconds:8.2f} s  "
+                      f"{n_rows / seconds:9.0f} rows/s  speedup={serial_seconds / seconds:5.2f}x")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"cpu_count": os.cpu_count(), "python": platform.python_version(), "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# benchmark S3 reads against a local moto server: the old read-everything-into-StringIO path vs
+# streaming the body into pandas, with and without parallel ranged GETs, for CSV, gzip and Parquet.
+# Each read runs in a fresh interpreter so peak RSS belongs to that read alone. Needs moto[server].
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+
+import boto3
+import numpy as np
+import pandas as pd
+from moto.server import ThreadedMotoServer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BUCKET = "benchmark"
+
+# ru_maxrss already peaks while pandas and boto3 import, so a thread samples VmRSS during the read instead
+READER = """
+import sys, threading, time
+sys.path.insert(0, sys.argv[1])
+import pandas as pd
+from io import StringIO
+from src.connections import s3_connection
+def rss_mib():
+    return [int(line.split()[1]) / 1024 for line in open("/proc/self/status") if line.startswith("VmRSS")][0]
+peak, done = [rss_mib()], threading.Event()
+def sample():
+    while not done.wait(0.005):
+        peak.append(max(peak[-1], rss_mib()))
+s3 = s3_connection.s3_operations("benchmark", "testing", "testing", endpoint_url=sys.argv[2])
+method, key = sys.argv[3], sys.argv[4]
+baseline = rss_mib()
+threading.Thread(target=sample, daemon=True).start()
+start = time.perf_counter()
+if method == "legacy":
+    obj = s3.s3_client.get_object(Bucket="benchmark", Key=key)
+    df = pd.read_csv(StringIO(obj['Body'].read().decode('utf-8')))
+elif method == "stream":
+    df = s3.read_dataframe(key, max_workers=1)
+else:
+    s3_connection.RANGED_READ_THRESHOLD = 0
+    df = s3.read_dataframe(key, max_workers=int(method.split("-")[1]))
+elapsed = time.perf_counter() - start
+done.set()
+print(elapsed, max(peak[-1], rss_mib()) - baseline, len(df))
+"""
+
+
+def make_frame(n_rows, seed):
+    rng = np.random.default_rng(seed)
+    words = np.array(["great", "movie", "terrible", "plot", "acting", "loved", "boring", "ending", "would", "again"])
+    reviews = [" ".join(rng.choice(words, size=int(rng.integers(20, 80)))) for _ in range(n_rows)]
+    return pd.DataFrame({"review": reviews, "sentiment": rng.choice(["positive", "negative"], size=n_rows)})
+
+
+def run_reader(endpoint, method, key):
+    output = subprocess.check_output([sys.executable, "-c", READER, PROJECT_ROOT, endpoint, method, key],
+                                     text=True, env=dict(os.environ, AWS_ACCESS_KEY_ID="testing",
+                                                         AWS_SECRET_ACCESS_KEY="testing"))
+    output = output.strip().splitlines()[-1].split()  # src.logger also writes to stdout
+    return {"seconds": float(output[0]), "peak_rss_delta_mib": float(output[1]), "rows": int(output[2])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory and wall time of S3 reads against moto")
+    parser.add_argument("--rows", type=int, default=400000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=args.port, verbose=False)
+    server.start()
+    endpoint = f"http://127.0.0.1:{args.port}"
+    try:
+        client = boto3.client("s3", region_name="us-east-1", endpoint_url=endpoint,
+                              aws_access_key_id="testing", aws_secret_access_key="testing")
+        client.create_bucket(Bucket=BUCKET)
+        frame = make_frame(args.rows, args.seed)
+        csv_bytes = frame.to_csv(index=False).encode("utf-8")
+        parquet = io.BytesIO()
+        frame.to_parquet(parquet, index=False)
+        objects = {"data.csv": csv_bytes, "data.csv.gz": gzip.compress(csv_bytes, compresslevel=6),
+                   "data.parquet": parquet.getvalue()}
+        for key, body in objects.items():
+            client.put_object(Bucket=BUCKET, Key=key, Body=body)
+            print(f"{key:<13} {len(body) / 2**20:8.1f} MiB")
+
+        results = []
+        for key in objects:
+            methods = (["legacy"] if key == "data.csv" else []) + ["stream"] + [f"ranged-{n}" for n in args.workers]
+            if key == "data.parquet":
+                methods.remove("stream")  # Parquet always needs seekable ranged reads
+            for method in methods:
+                result = {"key": key, "method": method, **run_reader(endpoint, method, key)}
+                results.append(result)
+                print(f"{key:<13} {method:<10} {result['seconds']:7.2f} s  peak RSS +{result['peak_rss_delta_mib']:7.1f} MiB")
+    finally:
+        server.stop()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# compare the data/processed feature formats at several vocabulary sizes: the dense feature table
+# (one CSV column per term) against CSR in .npz. Each path writes the features, loads them the way
+# model_building does and fits the model, in a forked child so peak RSS belongs to that path alone.
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sklearn.feature_extraction.text import CountVectorizer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmark_hashing import make_sentiment_corpus
+from src.data.storage import load_feature_split, save_features, save_frame
+from src.features.feature_engineering import features_frame
+from src.model.model_building import train_model
+
+STORAGE = {"format": "csv", "compression": None}
+
+
+def rss_mib():
+    with open("/proc/self/status") as f:
+        return [int(line.split()[1]) / 1024 for line in f if line.startswith("VmRSS")][0]
+
+
+def run_path(feature_format, features, labels, stem, queue):
+    baseline = rss_mib()
+    peak, done = [baseline], threading.Event()
+
+    def sample():
+        while not done.wait(0.005):
+            peak.append(max(peak[-1], rss_mib()))
+    threading.Thread(target=sample, daemon=True).start()
+
+    start = time.perf_counter()
+    if feature_format == "sparse":
+        path = save_features(features, labels, stem)
+    else:
+        path = save_frame(features_frame(features, labels), stem, STORAGE)
+    write_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    x_train, y_train = load_feature_split(stem, feature_format, STORAGE)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    train_model(x_train, y_train)
+    fit_seconds = time.perf_counter() - start
+    done.set()
+    queue.put({"write_s": write_seconds, "load_s": load_seconds, "fit_s": fit_seconds,
+               "size_mib": os.path.getsize(path) / 2**20, "peak_rss_delta_mib": max(peak[-1], rss_mib()) - baseline})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dense CSV vs sparse .npz training features")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--max-features", type=int, nargs="+", default=[20, 5000, 100000])
+    parser.add_argument("--vocab-size", type=int, default=150000)
+    parser.add_argument("--words-per-doc", type=int, default=120)
+    parser.add_argument("--dense-limit-gib", type=float, default=2.0,
+                        help="Skip the dense path when its float64 table alone would exceed this")
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    docs, labels = make_sentiment_corpus(args.rows, args.vocab_size, args.words_per_doc)
+    context = multiprocessing.get_context("fork")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for max_features in args.max_features:
+            features = CountVectorizer(max_features=max_features).fit_transform(docs)
+            for feature_format in ("dense", "sparse"):
+                dense_gib = features.shape[0] * features.shape[1] * 8 / 2**30
+                if feature_format == "dense" and dense_gib > args.dense_limit_gib:
+                    print(f"max_features={max_features:>6} dense   skipped: the table alone needs {dense_gib:.1f} GiB")
+                    results.append({"max_features": max_features, "format": feature_format, "skipped": True,
+                                    "dense_table_gib": dense_gib})
+                    continue
+                queue = context.Queue()
+                child = context.Process(target=run_path, args=(feature_format, features, labels,
+                                                               os.path.join(tmp_dir, f"{feature_format}-{max_features}"), queue))
+                child.start()
+                result = {"max_features": max_features, "format": feature_format, **queue.get()}
+                child.join()
+                results.append(result)
+                print(f"max_features={max_features:>6} {feature_format:<7} write={result['write_s']:7.2f} s  "
+                      f"load={result['load_s']:7.2f} s  fit={result['fit_s']:7.2f} s  size={result['size_mib']:8.1f} MiB  "
+                      f"peak RSS +{result['peak_rss_delta_mib']:7.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "vocab_size": args.vocab_size, "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
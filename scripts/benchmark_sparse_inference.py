@@ -0,0 +1,96 @@
+# benchmark sparse vs dataframe inference
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'flask_app')))
+from inference import build_predictor
+
+
+def make_corpus(n_docs, vocab_size, words_per_doc, seed=42):
+    """Synthetic reviews drawn from a Zipf-like vocabulary so every vocab size can be filled."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"w{i}" for i in range(vocab_size)])
+    weights = 1.0 / np.arange(1, vocab_size + 1)
+    weights /= weights.sum()
+    docs = [" ".join(rng.choice(vocab, size=words_per_doc, p=weights)) for _ in range(n_docs)]
+    # Make sure each term shows up at least once so max_features is actually reached
+    docs.extend(" ".join(chunk) for chunk in np.array_split(vocab, max(1, vocab_size // 1000)))
+    labels = rng.integers(0, 2, size=len(docs))
+    return docs, labels
+
+
+def time_predictor(predict, features, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(features)
+        latencies.append(time.perf_counter() - start)
+    return {"p50_ms": float(np.percentile(latencies, 50) * 1000), "p95_ms": float(np.percentile(latencies, 95) * 1000)}
+
+
+def load_pyfunc(model, tmp_dir):
+    """Round-trip the estimator through MLflow so the pyfunc schema checks are included, if available."""
+    try:
+        import mlflow.pyfunc
+        import mlflow.sklearn
+    except ImportError:
+        return None
+    path = os.path.join(tmp_dir, "model")
+    mlflow.sklearn.save_model(model, path)
+    return mlflow.pyfunc.load_model(path)
+
+
+def benchmark(max_features, n_docs, repeats):
+    docs, labels = make_corpus(n_docs, max_features, words_per_doc=50)
+    vectorizer = CountVectorizer(max_features=max_features)
+    x_train = vectorizer.fit_transform(docs)
+    model = LogisticRegression(C=2, solver="liblinear", max_iter=50).fit(x_train, labels)
+    request_features = vectorizer.transform([docs[0]])
+
+    results = {"max_features": max_features}
+    results["dataframe"] = time_predictor(build_predictor(model, "dataframe"), request_features, repeats)
+    results["sparse_estimator"] = time_predictor(
+        lambda features: model.predict_proba(features), request_features, repeats)
+    results["sparse_scorer"] = time_predictor(build_predictor(model, "sparse"), request_features, repeats)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pyfunc_model = load_pyfunc(model, tmp_dir)
+        if pyfunc_model is not None:
+            results["pyfunc_dataframe"] = time_predictor(
+                build_predictor(pyfunc_model, "dataframe"), request_features, repeats)
+            results["pyfunc_sparse"] = time_predictor(
+                build_predictor(pyfunc_model, "sparse"), request_features, repeats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-request latency of the dataframe vs sparse inference paths")
+    parser.add_argument("--max-features", type=int, nargs="+", default=[20, 20000, 200000])
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    all_results = []
+    for max_features in args.max_features:
+        results = benchmark(max_features, args.docs, args.repeats)
+        all_results.append(results)
+        for path, stats in results.items():
+            if path != "max_features":
+                print(f"max_features={max_features:>7} {path:<18} p50={stats['p50_ms']:8.3f} ms  p95={stats['p95_ms']:8.3f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(all_results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# compare CSV and Parquet for the pipeline intermediates (data/raw, data/interim, data/processed):
+# write time, read time of the columns the next stage uses, and bytes on disk
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmark_preprocessing import make_reviews
+from src.data.data_preprocessing import preprocess_texts_unique
+from src.data.storage import load_frame, save_frame
+
+FORMATS = {"csv": {"format": "csv", "compression": None},
+           "parquet": {"format": "parquet", "compression": "zstd"},
+           "parquet-snappy": {"format": "parquet", "compression": "snappy"}}
+
+
+def make_stages(n_rows, max_features):
+    texts = make_reviews(n_rows)
+    labels = np.arange(n_rows) % 2
+    raw = pd.DataFrame({"review": texts, "sentiment": labels})
+    interim = pd.DataFrame({"review": preprocess_texts_unique(texts), "sentiment": labels})
+    features = pd.DataFrame(CountVectorizer(max_features=max_features).fit_transform(interim["review"]).toarray())
+    features["label"] = labels
+    # name -> (frame, columns the consuming stage reads)
+    return {"raw": (raw, ["review", "sentiment"]), "interim": (interim, ["review", "sentiment"]),
+            "processed": (features, None)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV vs Parquet pipeline intermediates")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--max-features", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N reads/writes")
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    stages = make_stages(args.rows, args.max_features)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for stage, (df, columns) in stages.items():
+            for name, storage in FORMATS.items():
+                stem = os.path.join(tmp_dir, f"{stage}-{name}")
+                write_seconds, read_seconds = [], []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    path = save_frame(df, stem, storage)
+                    write_seconds.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    load_frame(stem, storage, columns=columns)
+                    read_seconds.append(time.perf_counter() - start)
+                result = {"stage": stage, "format": name, "write_s": min(write_seconds), "read_s": min(read_seconds),
+                          "size_mib": os.path.getsize(path) / 2**20}
+                results.append(result)
+                print(f"{stage:<10} {name:<15} write={result['write_s']:7.3f} s  read={result['read_s']:7.3f} s  "
+                      f"size={result['size_mib']:8.2f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"rows": args.rows, "max_features": args.max_features, "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# compare batch (liblinear on the whole matrix) and streaming (SGD partial_fit over chunks) training
+# in src/model/model_building.py at growing training sizes: fit time, holdout accuracy and peak RSS,
+# each in a forked child so peak RSS belongs to that fit alone
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.metrics import accuracy_score
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from src.data.storage import load_feature_split, save_features
+from src.model.model_building import train_model, train_streaming
+
+
+def make_features(n_rows, n_features, terms_per_row, seed):
+    """Zipf-distributed term counts in which 5% of the terms carry sentiment, as sparse CSR plus labels."""
+    term_rng, rng = np.random.default_rng(0), np.random.default_rng(seed)  # same sentiment terms for every split
+    frequencies = 1.0 / np.arange(1, n_features + 1) ** 0.9
+    weights = np.zeros(n_features)
+    sentiment_terms = term_rng.choice(n_features, size=n_features // 20, replace=False)
+    weights[sentiment_terms] = term_rng.normal(0, 1.5, size=sentiment_terms.size)
+    columns = rng.choice(n_features, size=n_rows * terms_per_row, p=frequencies / frequencies.sum())
+    rows = np.repeat(np.arange(n_rows), terms_per_row)
+    features = sparse.csr_matrix((np.ones(len(columns), dtype=np.float32), (rows, columns)), shape=(n_rows, n_features))
+    features.sum_duplicates()
+    probability = 1.0 / (1.0 + np.exp(-(features @ weights) / np.sqrt(terms_per_row) * 4))
+    return features, (rng.random(n_rows) < probability).astype(np.int8)
+
+
+def rss_mib():
+    with open("/proc/self/status") as f:
+        return [int(line.split()[1]) / 1024 for line in f if line.startswith("VmRSS")][0]
+
+
+def run_fit(mode, stem, training_params, x_test, y_test, queue):
+    baseline = rss_mib()
+    peak, done = [baseline], threading.Event()
+
+    def sample():
+        while not done.wait(0.005):
+            peak.append(max(peak[-1], rss_mib()))
+    threading.Thread(target=sample, daemon=True).start()
+
+    start = time.perf_counter()
+    if mode == "streaming":
+        model = train_streaming(stem, "sparse", {}, training_params)
+    else:
+        model = train_model(*load_feature_split(stem, "sparse", {}))
+    seconds = time.perf_counter() - start
+    done.set()
+    queue.put({"fit_s": seconds, "accuracy": float(accuracy_score(y_test, model.predict(x_test))),
+               "peak_rss_delta_mib": max(peak[-1], rss_mib()) - baseline})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch vs streaming training: time, accuracy and peak memory")
+    parser.add_argument("--rows", type=int, nargs="+", default=[50000, 200000, 800000])
+    parser.add_argument("--features", type=int, default=5000)
+    parser.add_argument("--terms-per-row", type=int, default=60)
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.000001)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    training_params = {"chunk_rows": args.chunk_rows, "epochs": args.epochs, "alpha": args.alpha, "seed": 42}
+    context = multiprocessing.get_context("fork")
+    x_test, y_test = make_features(20000, args.features, args.terms_per_row, seed=7)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in args.rows:
+            stem = os.path.join(tmp_dir, f"train-{n_rows}")
+            save_features(*make_features(n_rows, args.features, args.terms_per_row, seed=n_rows), stem)
+            for mode in ("batch", "streaming"):
+                queue = context.Queue()
+                child = context.Process(target=run_fit, args=(mode, stem, training_params, x_test, y_test, queue))
+                child.start()
+                result = {"rows": n_rows, "mode": mode, "file_mib": os.path.getsize(f"{stem}.npz") / 2**20, **queue.get()}
+                child.join()
+                results.append(result)
+                print(f"rows={n_rows:>8} {mode:<9} fit={result['fit_s']:7.2f} s  accuracy={result['accuracy']:.4f}  "
+                      f"peak RSS +{result['peak_rss_delta_mib']:7.1f} MiB  (file {result['file_mib']:.0f} MiB)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"features": args.features, "training": training_params, "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
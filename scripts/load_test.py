@@ -0,0 +1,232 @@
+# offline load test of the Flask app: trains a stand-in model on synthetic reviews, serves it
+# through gunicorn or the Flask dev server and reports p50/p95/p99 latency and requests per second
+
+import argparse
+import http.client
+import json
+import os
+import pickle
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FLASK_APP_DIR = os.path.join(PROJECT_ROOT, "flask_app")
+sys.path.append(FLASK_APP_DIR)
+sys.path.append(PROJECT_ROOT)
+from src.features.text_normalizer import TextNormalizer
+from src.features.surface_index import SurfaceIndexVectorizer, surface_form_candidates
+
+POSITIVE_WORDS = ["love", "great", "excellent", "wonderful", "amazing", "perfect", "happy", "recommend",
+                  "fantastic", "beautiful", "enjoyed", "best", "brilliant", "pleased", "favorite"]
+NEGATIVE_WORDS = ["hate", "terrible", "awful", "broken", "worst", "disappointed", "poor", "refund",
+                  "boring", "waste", "useless", "horrible", "annoying", "cheap", "regret"]
+NEUTRAL_WORDS = ["movie", "product", "delivery", "price", "story", "actors", "battery", "screen", "service",
+                 "package", "quality", "ending", "sound", "size", "color", "weeks", "friends", "shipping",
+                 "phone", "book", "characters", "staff", "order", "design", "plot", "music", "instructions"]
+
+
+def make_reviews(n_reviews, seed):
+    """Synthetic labelled reviews: neutral filler plus a few words that carry the sentiment."""
+    rng = np.random.default_rng(seed)
+    texts, labels = [], []
+    for _ in range(n_reviews):
+        label = int(rng.integers(0, 2))
+        sentiment = POSITIVE_WORDS if label else NEGATIVE_WORDS
+        words = list(rng.choice(NEUTRAL_WORDS, size=int(rng.integers(8, 40))))
+        words += list(rng.choice(sentiment, size=int(rng.integers(1, 4))))
+        rng.shuffle(words)
+        texts.append(f"The {' '.join(words)}, {int(rng.integers(1, 10))} stars!")
+        labels.append(label)
+    return texts, labels
+
+
+def build_standin_model(model_dir, n_reviews, seed):
+    """Train and pickle a model, vectorizer and surface index the way the pipeline lays them out."""
+    normalizer = TextNormalizer()
+    texts, labels = make_reviews(n_reviews, seed)
+    vectorizer = CountVectorizer()
+    features = vectorizer.fit_transform([normalizer.normalize(text) for text in texts])
+    model = LogisticRegression(C=2, solver="liblinear").fit(features, labels)
+
+    os.makedirs(model_dir, exist_ok=True)
+    with open(os.path.join(model_dir, "model.pkl"), "wb") as f:
+        pickle.dump(model, f)
+    with open(os.path.join(model_dir, "vectorizer.pkl"), "wb") as f:
+        pickle.dump(vectorizer, f)
+    # Same candidates as feature_engineering's export, so requests take the production index path
+    surface_vectorizer = SurfaceIndexVectorizer(normalizer, vectorizer)
+    surface_vectorizer.build_index(surface_form_candidates(vectorizer.vocabulary_))
+    surface_vectorizer.save(os.path.join(model_dir, "surface_index.json"))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(server, workers, port, env):
+    if server == "gunicorn":
+        env = dict(env, WEB_CONCURRENCY=str(workers), PORT=str(port))
+        command = [sys.executable, "-m", "gunicorn", "--pythonpath", FLASK_APP_DIR, "--bind", f"127.0.0.1:{port}",
+                   "--config", os.path.join(FLASK_APP_DIR, "gunicorn.conf.py"), "app:app"]
+    else:
+        command = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port), "--with-threads"]
+    return subprocess.Popen(command, cwd=FLASK_APP_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"Server did not become ready within {timeout}s")
+
+
+def request_body(endpoint, text):
+    if endpoint == "/predict":
+        return urllib.parse.urlencode({"text": text}), {"Content-Type": "application/x-www-form-urlencoded"}
+    return json.dumps({"texts": [text]}), {"Content-Type": "application/json"}
+
+
+def run_level(port, endpoint, concurrency, duration, texts):
+    """Drive the server from concurrency threads for duration seconds; returns latency stats."""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    stop_at = time.perf_counter() + duration
+
+    def client(index):
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        position = index
+        while time.perf_counter() < stop_at:
+            body, headers = request_body(endpoint, texts[position % len(texts)])
+            position += concurrency
+            start = time.perf_counter()
+            try:
+                connection.request("POST", endpoint, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors[index] += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                errors[index] += 1
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                continue
+            latencies[index].append(time.perf_counter() - start)
+        connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = np.array([latency for thread_latencies in latencies for latency in thread_latencies]) * 1000
+    result = {"concurrency": concurrency, "requests": int(all_latencies.size), "errors": sum(errors),
+              "duration_s": elapsed, "rps": all_latencies.size / elapsed}
+    if all_latencies.size:
+        result.update({"p50_ms": float(np.percentile(all_latencies, 50)), "p95_ms": float(np.percentile(all_latencies, 95)),
+                       "p99_ms": float(np.percentile(all_latencies, 99)), "mean_ms": float(all_latencies.mean()),
+                       "max_ms": float(all_latencies.max())})
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["results"]}
+    for level in results:
+        previous = baseline.get(level["concurrency"])
+        if previous is None or "p50_ms" not in level or "p50_ms" not in previous:
+            continue
+        changes = "  ".join(f"{key}={(level[key] - previous[key]) / previous[key] * 100:+6.1f}%"
+                            for key in ("rps", "p50_ms", "p95_ms", "p99_ms") if previous[key])
+        print(f"vs baseline concurrency={level['concurrency']:>3}  {changes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Flask app against a local stand-in model")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per concurrency level")
+    parser.add_argument("--endpoint", default="/predict", choices=["/predict", "/api/v1/predict_batch"])
+    parser.add_argument("--server", default="gunicorn", choices=["gunicorn", "flask"])
+    parser.add_argument("--workers", type=int, default=4, help="gunicorn workers")
+    parser.add_argument("--cache-bytes", type=int, default=0,
+                        help="PREDICTION_CACHE_BYTES for the server; 0 measures the model rather than the cache")
+    parser.add_argument("--train-reviews", type=int, default=5000)
+    parser.add_argument("--distinct-texts", type=int, default=2000, help="Size of the request text pool")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--timeout", type=float, default=120, help="Seconds to wait for the server to start")
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    parser.add_argument("--compare", help="Earlier --output file to print relative changes against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_dir = os.path.join(tmp_dir, "model", "1")
+        build_standin_model(model_dir, args.train_reviews, args.seed)
+        registry_file = os.path.join(tmp_dir, "registry.json")
+        with open(registry_file, "w") as f:
+            json.dump({"version": "1", "path": model_dir}, f)
+
+        env = {key: value for key, value in os.environ.items()
+               if key not in ("MLOPS_PROJECT", "PROMETHEUS_MULTIPROC_DIR", "MODEL_WATCH_INTERVAL")}
+        env.update({"MODEL_REGISTRY_FILE": registry_file, "PREDICTION_CACHE_BYTES": str(args.cache_bytes),
+                    "MODEL_CACHE_DIR": os.path.join(tmp_dir, "model_cache")})
+        texts, _ = make_reviews(args.distinct_texts, args.seed + 1)
+
+        port = free_port()
+        server = start_server(args.server, args.workers, port, env)
+        try:
+            wait_until_ready(port, args.timeout)
+            run_level(port, args.endpoint, max(args.concurrency), 2, texts)  # warm every worker
+            results = []
+            for concurrency in args.concurrency:
+                result = run_level(port, args.endpoint, concurrency, args.duration, texts)
+                results.append(result)
+                print(f"concurrency={concurrency:>3}  rps={result['rps']:8.1f}  p50={result.get('p50_ms', 0):7.2f} ms  "
+                      f"p95={result.get('p95_ms', 0):7.2f} ms  p99={result.get('p99_ms', 0):7.2f} ms  errors={result['errors']}")
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpu_count": os.cpu_count(), "git_commit": git_commit()},
+        "results": results,
+    }
+    if args.compare:
+        print_comparison(results, args.compare)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# measure per-worker memory of the Flask app under gunicorn, with and without preload (Linux only)
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+FLASK_APP_DIR = os.path.join(PROJECT_ROOT, "flask_app")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def smaps_rollup(pid):
+    """Memory counters in MiB from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mib": values.get("Rss", 0.0),
+        "pss_mib": values.get("Pss", 0.0),
+        "shared_mib": values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0),
+        "private_mib": values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0),
+    }
+
+
+def child_pids(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def wait_until_ready(port, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1)
+            return
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.5)
+    raise TimeoutError(f"gunicorn did not become ready within {timeout}s")
+
+
+def exercise(port, requests_count):
+    data = urllib.parse.urlencode({"text": "I loved this movie, the acting was wonderful"}).encode()
+    for _ in range(requests_count):
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/predict", data=data, timeout=30).read()
+
+
+def measure(workers, preload, timeout):
+    port = free_port()
+    env = dict(os.environ)
+    command = [sys.executable, "-m", "gunicorn", "--pythonpath", FLASK_APP_DIR]
+    if preload:
+        env["WEB_CONCURRENCY"] = str(workers)
+        env["PORT"] = str(port)
+        command += ["--config", os.path.join(FLASK_APP_DIR, "gunicorn.conf.py")]
+    else:
+        command += ["--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--timeout", "120"]
+    command.append("app:app")
+
+    master = subprocess.Popen(command, cwd=PROJECT_ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_ready(port, timeout)
+        # Wait for every worker to finish importing before exercising them
+        while len(child_pids(master.pid)) < workers:
+            time.sleep(0.2)
+        wait_until_ready(port, timeout)
+        exercise(port, workers * 10)
+        time.sleep(1)
+
+        worker_stats = [smaps_rollup(pid) for pid in child_pids(master.pid)]
+        master_stats = smaps_rollup(master.pid)
+        average = {key: sum(stats[key] for stats in worker_stats) / len(worker_stats) for key in worker_stats[0]}
+        total_pss = master_stats["pss_mib"] + sum(stats["pss_mib"] for stats in worker_stats)
+        return {"workers": workers, "preload": preload, "per_worker": average,
+                "master": master_stats, "total_pss_mib": total_pss}
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS/PSS per gunicorn worker with and without preload")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--output", help="Optional path to write the results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for workers in args.workers:
+        for preload in (False, True):
+            result = measure(workers, preload, args.timeout)
+            results.append(result)
+            per_worker = result["per_worker"]
+            print(f"workers={workers:>2} preload={str(preload):<5} "
+                  f"rss/worker={per_worker['rss_mib']:7.1f} MiB  pss/worker={per_worker['pss_mib']:7.1f} MiB  "
+                  f"private/worker={per_worker['private_mib']:7.1f} MiB  total_pss={result['total_pss_mib']:8.1f} MiB")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=4)
+
+if __name__ == "__main__":
+    main()
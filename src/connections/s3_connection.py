@@ -1,24 +1,133 @@
+import gzip
+import io
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import pandas as pd
 import logging
 from src.logger import logging
-from io import StringIO
 
-# # Configure logging
-# logging.basicConfig(level=logging.INFO)
-# logger = logging.getLogger(__name__)
+PART_SIZE = 8 * 1024 * 1024
+RANGED_READ_THRESHOLD = 64 * 1024 * 1024
+MAX_WORKERS = 8
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+class S3ObjectReader(io.RawIOBase):
+    """
+    Seekable, read-only file over an S3 object made of ranged GETs of part_size bytes. While the
+    object is read front to back, the next max_workers parts are fetched in parallel, so memory
+    stays around (max_workers + 1) * part_size however large the object is. Seeks (e.g. pyarrow
+    jumping to a Parquet footer) only fetch the parts that are actually read.
+    """
+
+    def __init__(self, s3_client, bucket_name, file_key, size, part_size=PART_SIZE, max_workers=4):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.file_key = file_key
+        self.size = size
+        self.part_size = part_size
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers) if max_workers > 1 else None
+        self._parts = OrderedDict()
+        self._part_index = None
+        self._part = memoryview(b"")
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def _fetch(self, index):
+        start = index * self.part_size
+        end = min(start + self.part_size, self.size) - 1
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.file_key, Range=f"bytes={start}-{end}")
+        return response["Body"].read()
+
+    def _load_part(self, index):
+        if self._executor is None:
+            return self._fetch(index)
+        # Keep the next max_workers parts in flight, dropping any a seek skipped past
+        last_index = (self.size - 1) // self.part_size
+        wanted = range(index, min(index + self.max_workers, last_index + 1))
+        for stale in [i for i in self._parts if i not in wanted]:
+            self._parts.pop(stale).cancel()
+        for i in wanted:
+            if i not in self._parts:
+                self._parts[i] = self._executor.submit(self._fetch, i)
+        return self._parts.pop(index).result()
+
+    def readinto(self, buffer):
+        if self._position >= self.size:
+            return 0
+        index, offset = divmod(self._position, self.part_size)
+        if index != self._part_index:
+            self._part = memoryview(self._load_part(index))
+            self._part_index = index
+        count = min(len(buffer), len(self._part) - offset)
+        buffer[:count] = self._part[offset:offset + count]
+        self._position += count
+        return count
+
+    def close(self):
+        if self._executor is not None:
+            for future in self._parts.values():
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._parts.clear()
+        self._part = memoryview(b"")
+        super().close()
+
+
+def _iter_chunks(reader, *files):
+    """Yield the chunks of a pandas chunked reader, closing files when they run out, fail or the caller stops."""
+    try:
+        with reader:
+            yield from reader
+    finally:
+        for f in files:
+            f.close()
+
 
 class s3_operations:
-    def __init__(self, bucket_name, aws_access_key, aws_secret_key, region_name="us-east-1"):
+    def __init__(self, bucket_name, aws_access_key, aws_secret_key, region_name="us-east-1", endpoint_url=None,
+                 max_workers=MAX_WORKERS):
         """
         Initialize the s3_operations class with AWS credentials and S3 bucket details.
+        endpoint_url points the client at an S3-compatible store (MinIO, a moto server) instead of AWS.
+        max_workers bounds the thread pools of the *_many methods; the one client they share keeps
+        enough pooled connections for all of them and retries throttling and 5xx errors with backoff.
         """
         self.bucket_name = bucket_name
+        self.max_workers = max_workers
         self.s3_client = boto3.client(
             's3',
             aws_access_key_id=aws_access_key,
             aws_secret_access_key=aws_secret_key,
-            region_name=region_name
+            region_name=region_name,
+            endpoint_url=endpoint_url,
+            config=Config(max_pool_connections=max(10, 2 * max_workers),
+                          retries={"max_attempts": 5, "mode": "adaptive"})
         )
         logging.info("Data Ingestion from S3 bucket initialized")
 
@@ -30,24 +139,147 @@ class s3_operations:
         """
         try:
             logging.info(f"Fetching file '{file_key}' from S3 bucket '{self.bucket_name}'...")
-            obj = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)
-            df = pd.read_csv(StringIO(obj['Body'].read().decode('utf-8')))
+            df = self.read_dataframe(file_key)
             logging.info(f"Successfully fetched and loaded '{file_key}' from S3 that has {len(df)} records.")
             return df
         except Exception as e:
             logging.exception(f"❌ Failed to fetch '{file_key}' from S3: {e}")
             return None
 
-# Example usage
-# if __name__ == "__main__":
-#     # Replace these with your actual AWS credentials and S3 details
-#     BUCKET_NAME = "bucket-name"
-#     AWS_ACCESS_KEY = "AWS_ACCESS_KEY"
-#     AWS_SECRET_KEY = "AWS_SECRET_KEY"
-#     FILE_KEY = "data.csv"  # Path inside S3 bucket
+    def open_object(self, file_key, seekable=False, part_size=PART_SIZE, max_workers=4):
+        """
+        Opens an S3 object as a binary file without loading it into memory.
+        Objects of RANGED_READ_THRESHOLD bytes or more, and any object opened with seekable=True,
+        are read with parallel ranged GETs; smaller ones stream the body of a single GET.
+        :param file_key: S3 file path (e.g., 'data/data.csv')
+        :return: readable binary file object
+        """
+        if not seekable and max_workers <= 1:
+            return self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)['Body']
+        size = self.s3_client.head_object(Bucket=self.bucket_name, Key=file_key)['ContentLength']
+        if not seekable and size < RANGED_READ_THRESHOLD:
+            return self.s3_client.get_object(Bucket=self.bucket_name, Key=file_key)['Body']
+        reader = S3ObjectReader(self.s3_client, self.bucket_name, file_key, size, part_size, max_workers)
+        return io.BufferedReader(reader, buffer_size=1024 * 1024)
+
+    def read_dataframe(self, file_key, chunksize=None, max_workers=4, **read_kwargs):
+        """
+        Streams a CSV, gzip-compressed CSV or Parquet object from S3 into pandas. The parser reads
+        the body as it arrives instead of from a decoded copy of the whole file.
+        :param file_key: S3 file path; '.gz' is decompressed, '.parquet'/'.pq' is read as Parquet
+        :param chunksize: for CSV, return an iterator of DataFrames with this many rows each; the body is
+            released once it is exhausted or closed
+        :return: Pandas DataFrame, or a DataFrame iterator when chunksize is set
+        """
+        if file_key.endswith(PARQUET_SUFFIXES):
+            with self.open_object(file_key, seekable=True, max_workers=max_workers) as body:
+                return pd.read_parquet(body, **read_kwargs)
+        body = self.open_object(file_key, max_workers=max_workers)
+        stream = gzip.GzipFile(fileobj=body) if file_key.endswith(".gz") else body
+        if chunksize:
+            try:
+                reader = pd.read_csv(stream, chunksize=chunksize, **read_kwargs)
+            except Exception:
+                stream.close()
+                body.close()
+                raise
+            return _iter_chunks(reader, stream, body)
+        try:
+            return pd.read_csv(stream, **read_kwargs)
+        finally:
+            stream.close()
+            body.close()
+
+    def list_keys(self, prefix="", suffixes=None):
+        """
+        Lists the object keys under a prefix, following pagination.
+        :param prefix: key prefix (e.g., 'data/partitions/')
+        :param suffixes: optional tuple of suffixes to keep (e.g., ('.csv', '.parquet'))
+        :return: sorted list of keys
+        """
+        keys = []
+        paginator = self.s3_client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            keys.extend(obj["Key"] for obj in page.get("Contents", [])
+                        if not obj["Key"].endswith("/") and (not suffixes or obj["Key"].endswith(tuple(suffixes))))
+        return sorted(keys)
+
+    def _run_many(self, function, items, max_workers, action):
+        max_workers = max_workers or self.max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(function, item) for item in items]
+            results, errors = [], []
+            for item, future in zip(items, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logging.error(f"❌ Failed to {action} '{item}': {e}")
+                    errors.append(item)
+        if errors:
+            raise RuntimeError(f"Failed to {action} {len(errors)} of {len(items)} objects: {errors[:5]}")
+        return results
+
+    def fetch_many(self, file_keys, max_workers=None, **read_kwargs):
+        """
+        Fetches several objects concurrently as DataFrames (see read_dataframe).
+        :param file_keys: S3 file paths, e.g. from list_keys()
+        :return: dict of key -> Pandas DataFrame, in the order of file_keys
+        """
+        file_keys = list(file_keys)
+        logging.info(f"Fetching {len(file_keys)} files from S3 bucket '{self.bucket_name}'...")
+        # Each read_dataframe call streams its own body; ranged reads per object would oversubscribe the pool
+        frames = self._run_many(lambda key: self.read_dataframe(key, max_workers=1, **read_kwargs),
+                                file_keys, max_workers, "fetch")
+        logging.info(f"Successfully fetched {len(file_keys)} files with {sum(len(df) for df in frames)} records.")
+        return dict(zip(file_keys, frames))
+
+    def fetch_prefix(self, prefix, suffixes=(".csv", ".csv.gz", ".parquet", ".pq"), max_workers=None, **read_kwargs):
+        """
+        Fetches a partitioned dataset (every matching object under prefix) as one DataFrame.
+        """
+        file_keys = self.list_keys(prefix, suffixes)
+        if not file_keys:
+            raise FileNotFoundError(f"No objects under s3://{self.bucket_name}/{prefix}")
+        return pd.concat(self.fetch_many(file_keys, max_workers, **read_kwargs).values(), ignore_index=True)
+
+    def upload_many(self, local_paths, prefix="", max_workers=None):
+        """
+        Uploads files and directory trees concurrently, keeping their relative layout under prefix.
+        :param local_paths: files or directories (e.g., ['data/processed', 'models'])
+        :param prefix: key prefix to upload under
+        :return: list of uploaded keys
+        """
+        # Keys mirror the path relative to each argument's parent, so 'models' uploads as '<prefix>models/...'
+        pairs = []
+        for local_path in local_paths:
+            root = os.path.dirname(os.path.normpath(local_path)) or "."
+            files = [local_path] if not os.path.isdir(local_path) else \
+                [os.path.join(walk_root, name) for walk_root, _, names in os.walk(local_path) for name in sorted(names)]
+            for file_path in files:
+                key = prefix + os.path.relpath(file_path, root).replace(os.sep, "/")
+                pairs.append((file_path, key))
+
+        # The pool already runs one upload per worker; s3transfer's own threads would multiply that
+        transfer_config = TransferConfig(use_threads=False)
+
+        def upload(pair):
+            file_path, key = pair
+            self.s3_client.upload_file(file_path, self.bucket_name, key, Config=transfer_config)
+            return key
+
+        logging.info(f"Uploading {len(pairs)} files to S3 bucket '{self.bucket_name}' under '{prefix}'...")
+        keys = self._run_many(upload, pairs, max_workers, "upload")
+        logging.info(f"Successfully uploaded {len(keys)} files.")
+        return keys
 
-#     data_ingestion = s3_operations(BUCKET_NAME, AWS_ACCESS_KEY, AWS_SECRET_KEY)
-#     df = data_ingestion.fetch_file_from_s3(FILE_KEY)
+def main():
+    """Push pipeline outputs: python -m src.connections.s3_connection <prefix> <path> [<path> ...]"""
+    if len(sys.argv) < 3:
+        raise SystemExit("usage: python -m src.connections.s3_connection <key prefix> <local path> [<local path> ...]")
+    from dotenv import load_dotenv
+    load_dotenv()
+    s3 = s3_operations(os.getenv("S3_BUCKET_NAME"), os.getenv("AWS_ACCESS_KEY"), os.getenv("AWS_SECRET_KEY"))
+    s3.upload_many(sys.argv[2:], prefix=sys.argv[1])
 
-#     if df is not None:
-#         print(f"Data fetched with {len(df)} records..")  # Display first few rows of the fetched DataFrame
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,8 @@ from sklearn.model_selection import train_test_split
 import yaml
 from src.logger import logging
 from src.connections import s3_connection
+from src.data.download_cache import DownloadCache
+from src.data.storage import load_storage_params, save_frame
 
 
 def load_params(params_path:str)->dict:
@@ -33,8 +35,14 @@ def load_params(params_path:str)->dict:
         logging.error(f"Error loading params: {e}")
         raise e
 
-def read_data(data_path_url:str)->pd.DataFrame:
+def read_data(data_path_url:str, cache_dir:str=None, expected_sha256:str=None)->pd.DataFrame:
     try:
+        if cache_dir and data_path_url.startswith(("http://", "https://")):
+            # Only fetch the file again when the server says it changed
+            local_path = DownloadCache(cache_dir).fetch(data_path_url, expected_sha256=expected_sha256)
+            df = pd.read_csv(local_path)
+            logging.info(f"data loaded from: {data_path_url} (cached at {local_path})")
+            return df
         df = pd.read_csv(data_path_url)
         logging.info(f"data loaded from: {data_path_url}")
         return df
@@ -68,13 +76,14 @@ def preprocess_data(df:pd.DataFrame)->pd.DataFrame:
         logging.error(f"Error preprocessing data: {e}")
         raise e
 
-def save_data(train_data:pd.DataFrame,test_data:pd.DataFrame,data_path:str)->None:
+def save_data(train_data:pd.DataFrame,test_data:pd.DataFrame,data_path:str,storage:dict=None)->None:
     try:
         logging.info(f"data saving started")
+        storage = storage or load_storage_params()
         data_path = os.path.join(data_path, "raw")
         os.makedirs(data_path, exist_ok=True)
-        train_data.to_csv(os.path.join(data_path, "train.csv"), index=False)
-        test_data.to_csv(os.path.join(data_path, "test.csv"), index=False)
+        save_frame(train_data, os.path.join(data_path, "train"), storage)
+        save_frame(test_data, os.path.join(data_path, "test"), storage)
         logging.info(f"data saved to: {data_path}")
     except Exception as e:
         logging.error(f"Error saving data: {e}")
@@ -90,12 +99,19 @@ def main():
         params = load_params("params.yaml")
         test_size = params['data_ingestion']['test_size']
 
-        df = read_data(data_path_url=params['data_ingestion']['data_path_url'])
-        
         aws_access_key = os.getenv("AWS_ACCESS_KEY")
         aws_secret_key = os.getenv("AWS_SECRET_KEY")
         s3_bucket_name = os.getenv("S3_BUCKET_NAME")
         data_name = os.getenv("S3_DATA_NAME")
+        data_prefix = os.getenv("S3_DATA_PREFIX")
+        if data_prefix:
+            # Partitioned dataset: every CSV/Parquet part under the prefix, fetched concurrently
+            s3 = s3_connection.s3_operations(s3_bucket_name, aws_access_key, aws_secret_key)
+            df = s3.fetch_prefix(data_prefix)
+        else:
+            df = read_data(data_path_url=params['data_ingestion']['data_path_url'],
+                           cache_dir=params['data_ingestion'].get('cache_dir'),
+                           expected_sha256=params['data_ingestion'].get('data_sha256'))
         # s3 = s3_connection.s3_operations(s3_bucket_name, aws_access_key, aws_secret_key)
         # df = s3.fetch_file_from_s3(data_name)
         df = preprocess_data(df)
@@ -2,34 +2,166 @@
 import numpy as np
 import pandas as pd
 import os
+import sys
 import re
 import nltk
 import string
+import yaml
+from joblib import Parallel, delayed
 from nltk.corpus import stopwords as nltk_stopwords 
 from nltk.stem import WordNetLemmatizer
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
 from src.logger import logging
-nltk.download('wordnet')
-nltk.download('stopwords')
+from src.data.preprocessing_cache import PreprocessingCache
+from src.data.storage import load_storage_params, load_frame, save_frame
 
-def preprocess_dataframe(df,col="tet"):
+def ensure_nltk_data():
+    """Download the corpora only when missing, so pool workers importing this module skip the network."""
+    for resource in ("wordnet", "stopwords"):
+        try:
+            nltk.data.find(f"corpora/{resource}")
+        except LookupError:
+            nltk.download(resource)
+
+ensure_nltk_data()
+
+_lemmatizer = None
+_stopwords = None
+
+def load_params(params_path:str)->dict:
+    try:
+        with open(params_path) as yaml_file:
+            params = yaml.safe_load(yaml_file)
+            logging.info(f"params loaded from: {params_path}")
+        return params
+    except Exception as e:
+        logging.error(f"Error loading params: {e}")
+        raise e
+
+PREPROCESSING_MODES = ("row", "unique_tokens")
+# Part of every preprocessing cache key: bump it whenever preprocess_text's output changes
+PREPROCESSING_VERSION = "1"
+
+def _resources():
+    global _lemmatizer, _stopwords
+    if _lemmatizer is None:
+        _lemmatizer = WordNetLemmatizer()
+        _stopwords = set(nltk_stopwords.words('english'))
+    return _lemmatizer, _stopwords
+
+def clean_text(text):
     """
-    Preprocesses a DataFrame by removing special characters, stop words, and converting to lowercase
+    Removes URLs, digits and punctuation, lowercases and collapses whitespace
     """
-    lemmatizer = WordNetLemmatizer()
-    stopwords = set(nltk_stopwords.words('english'))
-    def preprocess_text(text):
+    text = re.sub(r'https?://\S+|www\.\S+[^a-zA-Z0-9\s]', '', text)
+    text = "".join([char for char in text if not char.isdigit()])
+    text = text.lower()
 
-        text = re.sub(r'https?://\S+|www\.\S+[^a-zA-Z0-9\s]', '', text)
-        text = "".join([char for char in text if not char.isdigit()])
-        text = text.lower()
+    text = re.sub('[%s]' % re.escape(string.punctuation), ' ', text)
+    text = text.replace('؛', "")
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
 
-        text = re.sub('[%s]' % re.escape(string.punctuation), ' ', text)
-        text = text.replace('؛', "")
-        text = re.sub('\s+', ' ', text).strip()
-        text = " ".join([word for word in text.split() if word not in stopwords])
-        text = " ".join([lemmatizer.lemmatize(word) for word in text.split()])
-        return text
+def preprocess_text(text):
+    """
+    Removes URLs, digits, punctuation and stop words, lowercases and lemmatizes one review
+    """
+    lemmatizer, stopwords = _resources()
+    text = clean_text(text)
+    text = " ".join([word for word in text.split() if word not in stopwords])
+    text = " ".join([lemmatizer.lemmatize(word) for word in text.split()])
+    return text
 
+def preprocess_texts_unique(texts):
+    """
+    Same output as preprocess_text for every text, but each distinct token is stop-word checked and
+    lemmatized once: the tokens of all texts are factorized into one table and mapped back with
+    numpy indexing before the rows are joined again.
+    """
+    lemmatizer, stopwords = _resources()
+    token_lists = [clean_text(text).split() for text in texts]
+    lengths = np.fromiter((len(tokens) for tokens in token_lists), dtype=np.int64, count=len(token_lists))
+    flat = np.empty(int(lengths.sum()), dtype=object)
+    flat[:] = [token for tokens in token_lists for token in tokens]
+    codes, unique_tokens = pd.factorize(flat)
+    keep = np.array([token not in stopwords for token in unique_tokens], dtype=bool)
+    lemmas = np.array([lemmatizer.lemmatize(token) if kept else "" for token, kept in zip(unique_tokens, keep)],
+                      dtype=object)
+    mapped, kept = lemmas[codes], keep[codes]
+    logging.info(f"Lemmatized {len(unique_tokens)} unique tokens for {len(flat)} token occurrences")
+    processed, ends = [], np.cumsum(lengths)
+    for start, end in zip(ends - lengths, ends):
+        processed.append(" ".join(mapped[start:end][kept[start:end]]))
+    return processed
+
+def preprocess_texts(texts,mode="row"):
+    if mode == "unique_tokens":
+        return preprocess_texts_unique(texts)
+    return [preprocess_text(text) for text in texts]
+
+def run_preprocessing(texts,n_jobs=1,chunk_size=20000,mode="row"):
+    """
+    Preprocesses a list of texts in-process, or with n_jobs != 1 in chunk_size pieces on one joblib
+    process pool, merged back in order. mode "unique_tokens" lemmatizes each distinct token once
+    per call (per chunk with a pool) instead of once per occurrence; the output is the same as "row".
+    """
+    if mode not in PREPROCESSING_MODES:
+        raise ValueError(f"Unknown preprocessing mode {mode}, expected one of {PREPROCESSING_MODES}")
+    if n_jobs == 1:
+        processed = preprocess_texts(texts, mode)
+        logging.info(f"Preprocessed {len(texts)} rows with mode={mode}")
+        return processed
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    processed = [text for chunk in Parallel(n_jobs=n_jobs)(delayed(preprocess_texts)(chunk, mode) for chunk in chunks)
+                 for text in chunk]
+    logging.info(f"Preprocessed {len(texts)} rows in {len(chunks)} chunks with n_jobs={n_jobs}, mode={mode}")
+    return processed
+
+def cached_preprocessing(texts,cache,**engine_options):
+    """Serve texts already in the cache, preprocess each distinct new text once and store it."""
+    keys = cache.keys(texts)
+    found = cache.get_many(keys)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in found:
+            missing.setdefault(key, text)
+    new_values = run_preprocessing(list(missing.values()), **engine_options) if missing else []
+    cache.put_many(zip(missing.keys(), new_values))
+    found.update(zip(missing.keys(), new_values))
+    cache.log_stats()
+    return [found[key] for key in keys]
+
+def preprocess_dataframes(dfs,col="tet",n_jobs=1,chunk_size=20000,mode="row",cache=None):
+    """
+    Preprocesses the text column of several DataFrames together (see run_preprocessing), reading
+    rows whose text was seen before from cache, a PreprocessingCache, when one is given.
+    """
+    if mode not in PREPROCESSING_MODES:
+        raise ValueError(f"Unknown preprocessing mode {mode}, expected one of {PREPROCESSING_MODES}")
+    if n_jobs == 1 and mode == "row" and cache is None:
+        return [preprocess_dataframe(df,col) for df in dfs]
+    columns = [df[col].tolist() for df in dfs]
+    texts = [text for column in columns for text in column]
+    engine_options = {"n_jobs": n_jobs, "chunk_size": chunk_size, "mode": mode}
+    if cache is None:
+        processed = run_preprocessing(texts, **engine_options)
+    else:
+        processed = cached_preprocessing(texts, cache, **engine_options)
+    results, start = [], 0
+    for df, column in zip(dfs, columns):
+        df[col] = processed[start:start + len(column)]
+        start += len(column)
+        results.append(df.dropna(subset=[col]))
+    logging.info(f"Data preprocessed successfully")
+    return results
+
+def preprocess_dataframe(df,col="tet"):
+    """
+    Preprocesses a DataFrame by removing special characters, stop words, and converting to lowercase
+    """
     df[col] = df[col].apply(preprocess_text)
     df = df.dropna(subset=[col])
     logging.info(f"Data preprocessed successfully")
@@ -37,15 +169,28 @@ def preprocess_dataframe(df,col="tet"):
 
 def main():
     try:
-        train_data = pd.read_csv("./data/raw/train.csv")
-        test_data = pd.read_csv("./data/raw/test.csv")
+        params = load_params("params.yaml").get('data_preprocessing', {})
+        storage = load_storage_params("params.yaml")
+        train_data = load_frame("./data/raw/train", storage, columns=["review", "sentiment"])
+        test_data = load_frame("./data/raw/test", storage, columns=["review", "sentiment"])
         logging.info("Data loaded successfully; processing started")
-        train_data = preprocess_dataframe(train_data,"review")
-        test_data = preprocess_dataframe(test_data,"review")
+        cache = None
+        if params.get('cache_path'):
+            cache = PreprocessingCache(params['cache_path'], PREPROCESSING_VERSION,
+                                       max_bytes=int(params.get('cache_max_mb', 512) * 1024 * 1024))
+        try:
+            train_data, test_data = preprocess_dataframes([train_data, test_data], "review",
+                                                          n_jobs=params.get('n_jobs', 1),
+                                                          chunk_size=params.get('chunk_size', 20000),
+                                                          mode=params.get('mode', 'row'),
+                                                          cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
         data_path = os.path.join("./data","interim")
         os.makedirs(data_path,exist_ok=True)
-        train_data.to_csv(os.path.join(data_path,"train_processed.csv"),index = False)
-        test_data.to_csv(os.path.join(data_path,"test_processed.csv"),index = False)
+        save_frame(train_data, os.path.join(data_path,"train_processed"), storage)
+        save_frame(test_data, os.path.join(data_path,"test_processed"), storage)
         logging.info("Data processed and saved successfully")
     except Exception as e:
         logging.error(f"Error preprocessing data: {e}")
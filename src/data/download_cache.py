@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import tempfile
+import urllib.error
+import urllib.request
+from src.logger import logging
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def url_key(url:str)->str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def file_sha256(file_path:str)->str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadCache:
+    """
+    Local cache of HTTP downloads keyed by URL, laid out as <cache_dir>/<url hash>/{data, meta.json}.
+    Cached copies are revalidated with If-None-Match / If-Modified-Since, interrupted downloads
+    resume from data.part with a Range request guarded by If-Range, and every completed file is
+    checked against its recorded sha256 (and an expected one, when given).
+    """
+
+    def __init__(self, cache_dir:str, timeout:float=60):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+
+    def _paths(self, url:str)->tuple:
+        entry_dir = os.path.join(self.cache_dir, url_key(url))
+        return entry_dir, os.path.join(entry_dir, "data"), os.path.join(entry_dir, "data.part"), os.path.join(entry_dir, "meta.json")
+
+    @staticmethod
+    def _read_meta(meta_path:str)->dict:
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_meta(meta_path:str, meta:dict)->None:
+        fd, tmp_path = tempfile.mkstemp(prefix=".meta-", dir=os.path.dirname(meta_path))
+        with os.fdopen(fd, "w") as f:
+            json.dump(meta, f, indent=4)
+        os.replace(tmp_path, meta_path)
+
+    def fetch(self, url:str, expected_sha256:str=None)->str:
+        """Return the path of an up-to-date local copy of url, downloading only what is needed."""
+        entry_dir, data_path, part_path, meta_path = self._paths(url)
+        os.makedirs(entry_dir, exist_ok=True)
+        meta = self._read_meta(meta_path)
+
+        cached = os.path.exists(data_path) and meta.get("complete")
+        if cached and file_sha256(data_path) != meta.get("sha256"):
+            logging.warning(f"Cached download of {url} failed its checksum, downloading it again")
+            os.remove(data_path)
+            cached = False
+
+        headers = {}
+        if cached:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        resume_from = os.path.getsize(part_path) if not cached and os.path.exists(part_path) else 0
+        if resume_from:
+            headers["Range"] = f"bytes={resume_from}-"
+            validator = meta.get("etag") or meta.get("last_modified")
+            if validator:
+                headers["If-Range"] = validator
+
+        try:
+            response = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:
+                logging.info(f"Download cache hit for {url} (not modified), using {data_path}")
+                return self._verified(data_path, meta, expected_sha256)
+            if e.code == 416 and resume_from:
+                logging.info(f"Server rejected the resume range for {url}, restarting the download")
+                os.remove(part_path)
+                return self.fetch(url, expected_sha256)
+            raise
+        except (urllib.error.URLError, OSError) as e:
+            if cached:
+                logging.warning(f"Could not revalidate {url} ({e}), using the cached copy {data_path}")
+                return self._verified(data_path, meta, expected_sha256)
+            raise
+
+        with response:
+            if response.status == 206:
+                logging.info(f"Resuming download of {url} from byte {resume_from}")
+                mode = "ab"
+            else:
+                if resume_from:
+                    logging.info(f"{url} changed since the interrupted download, starting over")
+                logging.info(f"Download cache miss for {url}, downloading")
+                mode = "wb"
+            meta = {"url": url, "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"), "complete": False}
+            self._write_meta(meta_path, meta)
+            content_length = response.headers.get("Content-Length")
+            with open(part_path, mode) as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b""):
+                    f.write(chunk)
+                received = f.tell() - (resume_from if mode == "ab" else 0)
+
+        if content_length is not None and received < int(content_length):
+            # Keep data.part so the next run picks up where this one stopped
+            raise urllib.error.ContentTooShortError(
+                f"Download of {url} stopped after {received} of {content_length} bytes", None)
+
+        meta.update({"sha256": file_sha256(part_path), "size": os.path.getsize(part_path), "complete": True})
+        if expected_sha256 and meta["sha256"] != expected_sha256:
+            os.remove(part_path)
+            self._write_meta(meta_path, {})
+            raise ValueError(f"Checksum mismatch for {url}: expected {expected_sha256}, got {meta['sha256']}")
+        os.replace(part_path, data_path)
+        self._write_meta(meta_path, meta)
+        logging.info(f"Downloaded {url} ({meta['size']} bytes) to {data_path}")
+        return data_path
+
+    @staticmethod
+    def _verified(data_path:str, meta:dict, expected_sha256:str)->str:
+        if expected_sha256 and meta.get("sha256") != expected_sha256:
+            raise ValueError(f"Cached copy {data_path} does not match the expected checksum {expected_sha256}")
+        return data_path
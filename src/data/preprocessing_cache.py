@@ -0,0 +1,91 @@
+import hashlib
+import os
+import sqlite3
+import time
+from src.logger import logging
+
+# SQLite caps the number of bound parameters per statement
+QUERY_BATCH = 500
+
+
+def text_key(text:str, version:str)->bytes:
+    return hashlib.blake2b(f"{version}\0{text}".encode("utf-8"), digest_size=16).digest()
+
+
+class PreprocessingCache:
+    """
+    Persistent map of hash(preprocessing version + raw text) -> preprocessed text, stored in SQLite.
+    Changing the version makes every old entry unreachable; those then age out through the
+    least-recently-used eviction that keeps the stored texts under max_bytes.
+    """
+
+    def __init__(self, path:str, version:str, max_bytes:int=512 * 1024 * 1024):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key BLOB PRIMARY KEY, value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    def keys(self, texts)->list:
+        return [text_key(text, self.version) for text in texts]
+
+    def get_many(self, keys)->dict:
+        """Return {key: value} for the cached keys and refresh their last-used time."""
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(unique_keys), QUERY_BATCH):
+            batch = unique_keys[i:i + QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(self.connection.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({placeholders})", batch))
+        now = time.time()
+        with self.connection:
+            self.connection.executemany("UPDATE entries SET last_used = ? WHERE key = ?", ((now, key) for key in found))
+        hits = sum(1 for key in keys if key in found)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items)->None:
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO entries (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                ((key, value, len(key) + len(value.encode("utf-8")), now) for key, value in items))
+        self.evict()
+
+    def size_bytes(self)->int:
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def evict(self)->None:
+        """Drop least recently used entries until the cache is back under 90% of max_bytes."""
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return
+        target = excess + self.max_bytes // 10
+        freed, stale = 0, []
+        for key, size in self.connection.execute("SELECT key, size FROM entries ORDER BY last_used, rowid"):
+            stale.append(key)
+            freed += size
+            if freed >= target:
+                break
+        with self.connection:
+            self.connection.executemany("DELETE FROM entries WHERE key = ?", ((key,) for key in stale))
+        self.evictions += len(stale)
+
+    def log_stats(self)->None:
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        logging.info(f"Preprocessing cache {self.path}: {self.hits} hits, {self.misses} misses "
+                     f"({hit_rate:.1%} hit rate), {self.evictions} evicted, {self.size_bytes() / 2**20:.1f} MiB stored")
+
+    def close(self)->None:
+        self.connection.close()
@@ -0,0 +1,175 @@
+import os
+import struct
+import zipfile
+import numpy as np
+import pandas as pd
+import yaml
+from scipy import sparse
+from src.logger import logging
+
+STORAGE_FORMATS = ("csv", "parquet")
+LABEL_COLUMNS = ("sentiment", "label")
+DEFAULT_STORAGE = {"format": "csv", "compression": "zstd"}
+FEATURE_DTYPES = {"float32": np.float32, "float64": np.float64, "int32": np.int32}
+
+
+def load_storage_params(params_path:str="params.yaml")->dict:
+    """The storage section of params.yaml: how data/raw, data/interim and data/processed are written."""
+    try:
+        with open(params_path) as yaml_file:
+            storage = {**DEFAULT_STORAGE, **(yaml.safe_load(yaml_file).get("storage") or {})}
+    except FileNotFoundError:
+        storage = dict(DEFAULT_STORAGE)
+    if storage["format"] not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage.format {storage['format']}, expected one of {STORAGE_FORMATS}")
+    return storage
+
+
+def frame_path(path_stem:str, storage:dict)->str:
+    return f"{path_stem}.{storage['format']}"
+
+
+def compact_dtypes(df:pd.DataFrame)->pd.DataFrame:
+    """int8 labels, Arrow-backed strings and the smallest integer type for numeric feature columns."""
+    df = df.copy()
+    for column in df.columns:
+        series = df[column]
+        if column in LABEL_COLUMNS and pd.api.types.is_integer_dtype(series):
+            df[column] = series.astype("int8")
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            df[column] = series.astype("string[pyarrow]")
+        elif pd.api.types.is_integer_dtype(series):
+            df[column] = pd.to_numeric(series, downcast="integer")
+    # Parquet needs string column names; the feature frames use the vocabulary positions 0..n-1
+    df.columns = [str(column) for column in df.columns]
+    return df
+
+
+def save_frame(df:pd.DataFrame, path_stem:str, storage:dict)->str:
+    """Write df to <path_stem>.csv or <path_stem>.parquet and return the path."""
+    file_path = frame_path(path_stem, storage)
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    if storage["format"] == "parquet":
+        compression = None if storage["compression"] in (None, "none") else storage["compression"]
+        compact_dtypes(df).to_parquet(file_path, engine="pyarrow", compression=compression, index=False)
+    else:
+        df.to_csv(file_path, index=False)
+    logging.info(f"Saved {len(df)} rows to {file_path}")
+    return file_path
+
+
+def load_frame(path_stem:str, storage:dict, columns:list=None)->pd.DataFrame:
+    """Read <path_stem>.csv or .parquet, only parsing the given columns when they are named."""
+    file_path = frame_path(path_stem, storage)
+    if storage["format"] == "parquet":
+        df = pd.read_parquet(file_path, engine="pyarrow", columns=columns)
+    else:
+        df = pd.read_csv(file_path, usecols=columns)
+    logging.info(f"Loaded {len(df)} rows from {file_path}")
+    return df
+
+
+def save_features(features, labels, path_stem:str, dtype:str="float32", compressed:bool=False)->str:
+    """
+    Write a CSR feature matrix and its labels to <path_stem>.npz; rows x columns never
+    materialize, only the non-zero entries (in dtype) and int32 indices are stored.
+    """
+    if dtype not in FEATURE_DTYPES:
+        raise ValueError(f"Unknown feature dtype {dtype}, expected one of {sorted(FEATURE_DTYPES)}")
+    features = sparse.csr_matrix(features)
+    file_path = f"{path_stem}.npz"
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    save = np.savez_compressed if compressed else np.savez
+    save(file_path, data=features.data.astype(FEATURE_DTYPES[dtype], copy=False),
+         indices=features.indices.astype(np.int32, copy=False), indptr=features.indptr.astype(np.int64, copy=False),
+         shape=np.asarray(features.shape, dtype=np.int64), labels=np.asarray(labels).astype(np.int8))
+    logging.info(f"Saved {features.shape[0]} x {features.shape[1]} features ({features.nnz} non-zeros) to {file_path}")
+    return file_path
+
+
+def load_features(path_stem:str)->tuple:
+    """Return (CSR feature matrix, labels) written by save_features."""
+    file_path = f"{path_stem}.npz"
+    with np.load(file_path) as archive:
+        features = sparse.csr_matrix((archive["data"], archive["indices"], archive["indptr"]),
+                                     shape=tuple(archive["shape"]))
+        labels = archive["labels"]
+    logging.info(f"Loaded {features.shape[0]} x {features.shape[1]} features from {file_path}")
+    return features, labels
+
+
+def load_feature_split(path_stem:str, feature_format:str, storage:dict)->tuple:
+    """(features, labels) of a data/processed split: CSR from .npz, or a dense array from the feature table."""
+    if feature_format == "sparse":
+        return load_features(path_stem)
+    df = load_frame(path_stem, storage)
+    return df.iloc[:, :-1].values, df.iloc[:, -1].values
+
+
+def _npz_members(file_path:str)->dict:
+    """name -> (byte offset, dtype, shape) of each array stored uncompressed in an .npz archive."""
+    members = {}
+    with zipfile.ZipFile(file_path) as archive, open(file_path, "rb") as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{file_path} is compressed; chunked reads need save_features(compressed=False)")
+            f.seek(info.header_offset)
+            name_length, extra_length = struct.unpack("<HH", f.read(30)[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(f)
+            read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            shape, _, dtype = read_header(f)
+            members[info.filename[:-len(".npy")]] = (f.tell(), dtype, shape)
+    return members
+
+
+def _read_range(f, member:tuple, start:int, stop:int)->np.ndarray:
+    offset, dtype, _ = member
+    f.seek(offset + start * dtype.itemsize)
+    return np.fromfile(f, dtype=dtype, count=stop - start)
+
+
+def feature_split_info(path_stem:str, feature_format:str, storage:dict, chunk_rows:int=100000)->tuple:
+    """(n_rows, sorted classes) of a data/processed split, found by scanning only its labels."""
+    classes, n_rows = set(), 0
+    if feature_format == "sparse":
+        members = _npz_members(f"{path_stem}.npz")
+        n_rows = members["labels"][2][0]
+        with open(f"{path_stem}.npz", "rb") as f:
+            for start in range(0, n_rows, chunk_rows):
+                classes.update(np.unique(_read_range(f, members["labels"], start, min(start + chunk_rows, n_rows))).tolist())
+    else:
+        labels = load_frame(path_stem, storage, columns=["label"])["label"].values
+        n_rows, classes = len(labels), set(np.unique(labels).tolist())
+    return n_rows, np.array(sorted(classes))
+
+
+def iter_feature_chunks(path_stem:str, feature_format:str, storage:dict, chunk_rows:int, rng=None):
+    """
+    Yield (features, labels) blocks of at most chunk_rows rows without loading the whole split:
+    row ranges are read straight out of the uncompressed .npz, dense tables are read in batches.
+    With an rng, the blocks of a sparse split come in shuffled order.
+    """
+    if feature_format == "sparse":
+        file_path = f"{path_stem}.npz"
+        members = _npz_members(file_path)
+        with open(file_path, "rb") as f:
+            n_rows, n_columns = (int(value) for value in _read_range(f, members["shape"], 0, 2))
+            starts = np.arange(0, n_rows, chunk_rows)
+            if rng is not None:
+                rng.shuffle(starts)
+            for start in starts:
+                stop = min(start + chunk_rows, n_rows)
+                indptr = _read_range(f, members["indptr"], start, stop + 1)
+                data = _read_range(f, members["data"], indptr[0], indptr[-1])
+                indices = _read_range(f, members["indices"], indptr[0], indptr[-1])
+                features = sparse.csr_matrix((data, indices, indptr - indptr[0]), shape=(stop - start, n_columns))
+                yield features, _read_range(f, members["labels"], start, stop)
+    elif storage["format"] == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(frame_path(path_stem, storage)).iter_batches(batch_size=chunk_rows):
+            values = batch.to_pandas().values
+            yield values[:, :-1], values[:, -1]
+    else:
+        for df in pd.read_csv(frame_path(path_stem, storage), chunksize=chunk_rows):
+            yield df.iloc[:, :-1].values, df.iloc[:, -1].values
@@ -1,10 +1,15 @@
 import numpy as np
 import pandas as pd
 import os
-from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from joblib import Parallel, delayed
+from scipy import sparse
 import yaml
 from src.logger import logging
+from src.data.storage import load_storage_params, load_frame, save_frame, save_features
 import pickle
+from src.features.text_normalizer import TextNormalizer
+from src.features.surface_index import SurfaceIndexVectorizer, surface_form_candidates
 
 def load_params(params_path:str)->dict:
     try:
@@ -16,9 +21,10 @@ def load_params(params_path:str)->dict:
         logging.exception(f"Error loading params from {params_path}: {e}")
         raise e
 
-def load_data(data_path:str)->pd.DataFrame:
+def load_data(data_path:str,storage:dict=None)->pd.DataFrame:
+    """data_path without extension; the storage params decide between .csv and .parquet."""
     try:
-        df = pd.read_csv(data_path)
+        df = load_frame(data_path, storage or load_storage_params(), columns=["review", "sentiment"])
         logging.info(f"loaded data successfully from {data_path}")
         df.fillna("",inplace=True)
         return df
@@ -27,54 +33,120 @@ def load_data(data_path:str)->pd.DataFrame:
         raise e
 
 
-def save_data(df: pd.DataFrame, output_path: str):
+def save_data(df: pd.DataFrame, output_path: str, storage: dict = None):
     try:
         os.makedirs(os.path.dirname(output_path), exist_ok=True)  # Ensure dir exists
-        df.to_csv(output_path, index=False)
+        save_frame(df, output_path, storage or load_storage_params())
         logging.info(f"Saved data successfully to {output_path}")
     except Exception as e:
         logging.exception(f"Error saving data to {output_path}: {e}")
         raise e
 
-    
+def export_surface_index(vectorizer,output_path:str)->None:
+    """Precompute surface form -> feature ids so the Flask app can vectorize without NLTK."""
+    try:
+        surface_vectorizer = SurfaceIndexVectorizer(TextNormalizer(), vectorizer)
+        surface_vectorizer.build_index(surface_form_candidates(getattr(vectorizer, "vocabulary_", None)))
+        surface_vectorizer.save(output_path)
+        logging.info(f"Exported surface index with {len(surface_vectorizer.index)} forms to {output_path}")
+    except Exception as e:
+        logging.exception(f"Error exporting surface index to {output_path}: {e}")
+        raise e
 
-def apply_bow(train_df:pd.DataFrame,test_df:pd.DataFrame,max_features:int)->tuple:
+def bow_features(train_df:pd.DataFrame,test_df:pd.DataFrame,max_features:int)->tuple:
+    """Fit the CountVectorizer, save it with its surface index and return sparse (x_train, x_test)."""
     try:
         vectorizer = CountVectorizer(max_features=max_features)
-        x_train = train_df['review'].values
-        x_test = test_df['review'].values
-        y_train = train_df['sentiment'].values
-        y_test =test_df['sentiment'].values
-
-        x_train_bow = vectorizer.fit_transform(x_train)
-        x_test_bow = vectorizer.transform(x_test)
-
+        x_train_bow = vectorizer.fit_transform(train_df['review'].values)
+        x_test_bow = vectorizer.transform(test_df['review'].values)
         logging.info("Applied BOW successfully")
-        train_df = pd.DataFrame(x_train_bow.toarray())
-        train_df['label'] = y_train
-
-        test_df = pd.DataFrame(x_test_bow.toarray())
-        test_df['label'] = y_test
 
         pickle.dump(vectorizer, open('models/vectorizer.pkl', 'wb'))
+        export_surface_index(vectorizer, 'models/surface_index.json')
         logging.info('Bag of Words applied and data transformed')
-
-        return train_df, test_df
+        return x_train_bow, x_test_bow
     except Exception as e:
         logging.exception(f"Error applying BOW: {e}")
         raise e
 
+def features_frame(features,labels)->pd.DataFrame:
+    """Dense table of the features with the label as its last column."""
+    df = pd.DataFrame(features.toarray())
+    df['label'] = labels
+    return df
+
+def apply_bow(train_df:pd.DataFrame,test_df:pd.DataFrame,max_features:int)->tuple:
+    x_train_bow, x_test_bow = bow_features(train_df,test_df,max_features)
+    return features_frame(x_train_bow,train_df['sentiment'].values), features_frame(x_test_bow,test_df['sentiment'].values)
+
+# Widest hashing output written as a dense table: every row costs a float per column, almost all of them zero
+MAX_DENSE_HASH_FEATURES = 2**16
+
+def check_dense_hashing(n_features:int)->None:
+    if n_features > MAX_DENSE_HASH_FEATURES:
+        raise ValueError(f"feature_format: dense with mode: hashing allows at most {MAX_DENSE_HASH_FEATURES} "
+                         f"hash_features, got {n_features}; use feature_format: sparse")
+
+def hashing_vectorizer(n_features:int)->HashingVectorizer:
+    # Plain term counts (no sign flipping or normalization), the same values BoW produces
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm=None)
+
+def parallel_transform(vectorizer,texts,n_jobs:int,chunk_size:int=10000)->sparse.csr_matrix:
+    """Transform texts in independent chunks; possible because a hashing vectorizer has no fitted state."""
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    if not chunks:
+        return vectorizer.transform([])
+    parts = Parallel(n_jobs=n_jobs)(delayed(vectorizer.transform)(chunk) for chunk in chunks)
+    return sparse.vstack(parts).tocsr()
+
+def hashing_features(train_df:pd.DataFrame,test_df:pd.DataFrame,n_features:int,n_jobs:int)->tuple:
+    """Hash both splits, save the vectorizer with its surface index and return sparse (x_train, x_test)."""
+    try:
+        vectorizer = hashing_vectorizer(n_features)
+        x_train_hashed = parallel_transform(vectorizer, train_df['review'].values, n_jobs)
+        x_test_hashed = parallel_transform(vectorizer, test_df['review'].values, n_jobs)
+
+        # Stateless, but saved like the BoW vectorizer so serving and evaluation load it the same way
+        pickle.dump(vectorizer, open('models/vectorizer.pkl', 'wb'))
+        export_surface_index(vectorizer, 'models/surface_index.json')
+        logging.info(f'Hashing transform applied with {n_features} features')
+        return x_train_hashed, x_test_hashed
+    except Exception as e:
+        logging.exception(f"Error applying hashing transform: {e}")
+        raise e
+
+def apply_hashing(train_df:pd.DataFrame,test_df:pd.DataFrame,n_features:int,n_jobs:int)->tuple:
+    check_dense_hashing(n_features)
+    x_train_hashed, x_test_hashed = hashing_features(train_df,test_df,n_features,n_jobs)
+    return features_frame(x_train_hashed,train_df['sentiment'].values), features_frame(x_test_hashed,test_df['sentiment'].values)
+
 def main():
     try:
         params =load_params("params.yaml")
-        
-        max_features = params["feature_engineering"]["max_features"]
-        train_df =load_data("data/interim/train_processed.csv")
-        test_df = load_data("data/interim/test_processed.csv")
-
-        train_df,test_df = apply_bow(train_df,test_df,max_features)
-        save_data(train_df,"data/processed/train_bow.csv")
-        save_data(test_df,"data/processed/test_bow.csv")
+        feature_params = params["feature_engineering"]
+        storage = load_storage_params("params.yaml")
+        train_df =load_data("data/interim/train_processed",storage)
+        test_df = load_data("data/interim/test_processed",storage)
+
+        feature_format = feature_params.get("feature_format","sparse")
+        if feature_params["mode"] == "hashing":
+            if feature_format != "sparse":
+                # Checked before hashing, so a misconfigured run fails in seconds instead of exhausting memory
+                check_dense_hashing(feature_params["hash_features"])
+            x_train,x_test = hashing_features(train_df,test_df,feature_params["hash_features"],feature_params["n_jobs"])
+        elif feature_params["mode"] == "bow":
+            x_train,x_test = bow_features(train_df,test_df,feature_params["max_features"])
+        else:
+            raise ValueError(f"Unknown feature_engineering.mode: {feature_params['mode']}")
+        y_train,y_test = train_df['sentiment'].values,test_df['sentiment'].values
+
+        if feature_format == "sparse":
+            feature_dtype = feature_params.get("feature_dtype","float32")
+            save_features(x_train,y_train,"data/processed/train_bow",feature_dtype)
+            save_features(x_test,y_test,"data/processed/test_bow",feature_dtype)
+        else:
+            save_data(features_frame(x_train,y_train),"data/processed/train_bow",storage)
+            save_data(features_frame(x_test,y_test),"data/processed/test_bow",storage)
     except Exception as e:
         logging.exception(f"Error in main function: {e}")
         raise e
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+
+INDEX_VERSION = 1
+# Settings that determine a stateless hashing vectorizer's feature space
+HASHING_SETTINGS = ("n_features", "lowercase", "token_pattern", "ngram_range", "alternate_sign", "norm", "binary")
+
+
+def vocabulary_fingerprint(vocabulary):
+    """Stable hash of a term -> feature id mapping, used to pair an index with its vectorizer."""
+    digest = hashlib.sha256()
+    for term, feature_id in sorted(vocabulary.items()):
+        digest.update(f"{term}\t{feature_id}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def vectorizer_fingerprint(vectorizer):
+    """vocabulary_fingerprint for fitted vectorizers; a hash of the settings for hashing vectorizers."""
+    vocabulary = getattr(vectorizer, "vocabulary_", None)
+    if vocabulary is not None:
+        return vocabulary_fingerprint(vocabulary)
+    settings = {key: getattr(vectorizer, key, None) for key in HASHING_SETTINGS}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def surface_form_candidates(vocabulary=None):
+    """
+    Raw lowercase surface forms to try for the index: the stop words, every single-word
+    WordNet lemma, and the noun inflections that lemmatize back to a vocabulary term.
+    Hashing vectorizers have no vocabulary, so only the first two apply. build_index keeps
+    only the forms that map to a feature.
+    """
+    from nltk.corpus import stopwords, wordnet
+
+    candidates = set(stopwords.words("english"))
+    candidates.update(name for name in wordnet.all_lemma_names() if name.isalpha())
+    for term in vocabulary or ():
+        candidates.add(term)
+        for suffix, ending in wordnet.MORPHOLOGICAL_SUBSTITUTIONS[wordnet.NOUN]:
+            if term.endswith(ending):
+                candidates.add(term[:len(term) - len(ending)] + suffix)
+    return candidates
+
+
+class SurfaceIndexVectorizer:
+    """
+    Turns raw text into the same count vector as normalizer + CountVectorizer.transform,
+    using a precomputed surface form -> feature ids index so known tokens skip NLTK entirely.
+    Tokens missing from the index go through the normalizer's lemmatizer and are cached.
+    Works with fitted vocabularies and with hashing vectorizers that produce plain counts.
+    """
+
+    def __init__(self, normalizer, vectorizer, index=None, cache_size=100_000):
+        if getattr(vectorizer, "ngram_range", (1, 1)) != (1, 1) or getattr(vectorizer, "analyzer", "word") != "word":
+            raise ValueError("SurfaceIndexVectorizer only supports unigram word vectorizers")
+        self.normalizer = normalizer
+        self.vectorizer = vectorizer
+        self.vocabulary = getattr(vectorizer, "vocabulary_", None)
+        if self.vocabulary is None:
+            if getattr(vectorizer, "alternate_sign", True) or getattr(vectorizer, "norm", "l2") is not None \
+                    or getattr(vectorizer, "binary", False):
+                raise ValueError("Hashing vectorizers need alternate_sign=False, norm=None and binary=False")
+            self.num_features = vectorizer.n_features
+        else:
+            self.num_features = len(self.vocabulary)
+        self.analyzer = vectorizer.build_analyzer()
+        self.index = index if index is not None else {}
+        self.cached_token_features = lru_cache(maxsize=cache_size)(self.token_features)
+
+    @staticmethod
+    def row_features(features, row):
+        """Feature ids of one CSR row, each repeated by its count."""
+        start, end = features.indptr[row], features.indptr[row + 1]
+        return tuple(int(feature_id) for feature_id, count in zip(features.indices[start:end], features.data[start:end])
+                     for _ in range(int(count)))
+
+    def token_features(self, word):
+        """Feature ids contributed by one lowercase surface token, computed the slow way."""
+        normalized = " ".join(self.normalizer.normalize_token(word))
+        if self.vocabulary is None:
+            return self.row_features(self.vectorizer.transform([normalized]), 0)
+        return tuple(int(self.vocabulary[term]) for term in self.analyzer(normalized) if term in self.vocabulary)
+
+    def build_index(self, candidates):
+        """
+        Index the candidates that contribute at least one feature. Forms that map to nothing
+        (stop words, out-of-vocabulary lemmas) are left out and go through the cached slow path.
+        """
+        if self.vocabulary is None:
+            # Hash every candidate in one call rather than one transform per word
+            words = list(candidates)
+            features = self.vectorizer.transform([" ".join(self.normalizer.normalize_token(word)) for word in words])
+            index = {word: self.row_features(features, row) for row, word in enumerate(words)}
+        else:
+            index = {word: self.token_features(word) for word in candidates}
+        self.index = {word: feature_ids for word, feature_ids in index.items() if feature_ids}
+        return self
+
+    def transform(self, texts):
+        """Return a CSR count matrix of shape (len(texts), num_features)."""
+        index = self.index
+        cached_token_features = self.cached_token_features
+        indices = []
+        indptr = [0]
+        for text in texts:
+            for word in self.normalizer.surface_tokens(text):
+                feature_ids = index.get(word)
+                if feature_ids is None:
+                    feature_ids = cached_token_features(word)
+                indices.extend(feature_ids)
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.int64)
+        features = sparse.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), self.num_features),
+        )
+        features.sum_duplicates()
+        return features
+
+    def save(self, file_path):
+        """Write the index as compact JSON alongside the vocabulary fingerprint."""
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        payload = {
+            "version": INDEX_VERSION,
+            "num_features": self.num_features,
+            "vocabulary_fingerprint": vectorizer_fingerprint(self.vectorizer),
+            "index": {word: list(feature_ids) for word, feature_ids in sorted(self.index.items())},
+        }
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, file_path, normalizer, vectorizer, cache_size=100_000):
+        """Load an index written by save(); raises ValueError if it belongs to another vectorizer."""
+        with open(file_path, encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported surface index version: {payload.get('version')}")
+        if payload["vocabulary_fingerprint"] != vectorizer_fingerprint(vectorizer):
+            raise ValueError("Surface index was built for a different vectorizer vocabulary")
+        index = {word: tuple(feature_ids) for word, feature_ids in payload["index"].items()}
+        return cls(normalizer, vectorizer, index=index, cache_size=cache_size)
@@ -0,0 +1,66 @@
+import hashlib
+import string
+import sys
+from functools import lru_cache
+
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+
+
+def _build_translation_table():
+    """Map every digit to nothing, punctuation to a space and the Arabic semicolon to nothing."""
+    table = {codepoint: None for codepoint in range(sys.maxunicode + 1) if chr(codepoint).isdigit()}
+    table.update({ord(char): " " for char in string.punctuation})
+    table[ord("؛")] = None
+    return table
+
+
+class TextNormalizer:
+    """
+    Single-pass equivalent of the lower_case -> remove_stop_words -> removing_numbers ->
+    removing_punctuations -> removing_urls -> lemmatization chain used by the Flask app.
+
+    Stop words, the translation table and the lemmatizer are built once; lemmas are cached.
+    The URL step is not needed: once punctuation is replaced, "://" and "www." can no longer match.
+    """
+
+    def __init__(self, max_length=None, stop_words=None, lemmatizer=None, lemma_cache_size=100_000):
+        self.max_length = max_length
+        self.stop_words = frozenset(stop_words if stop_words is not None else stopwords.words("english"))
+        self.translation_table = _build_translation_table()
+        lemmatizer = lemmatizer if lemmatizer is not None else WordNetLemmatizer()
+        self.lemmatizer_name = f"{type(lemmatizer).__module__}.{type(lemmatizer).__name__}"
+        self.lemmatize = lru_cache(maxsize=lemma_cache_size)(lemmatizer.lemmatize)
+
+    def settings(self):
+        """The settings that decide the normalized output, stored with an exported model and checked when serving it."""
+        stop_words = "\n".join(sorted(self.stop_words)).encode("utf-8")
+        return {"max_length": self.max_length, "stop_words_sha256": hashlib.sha256(stop_words).hexdigest(),
+                "lemmatizer": self.lemmatizer_name}
+
+    def surface_tokens(self, text):
+        """Return the raw lowercase whitespace tokens of text, after the length cap."""
+        if self.max_length is not None and len(text) > self.max_length:
+            text = text[:self.max_length]
+        return text.lower().split()
+
+    def normalize_token(self, word):
+        """Return the normalized tokens produced by a single lowercase surface token."""
+        if word in self.stop_words:
+            return []
+        return [self.lemmatize(token) for token in word.translate(self.translation_table).split()]
+
+    def tokens(self, text):
+        """Yield the normalized tokens of text."""
+        stop_words = self.stop_words
+        translation_table = self.translation_table
+        lemmatize = self.lemmatize
+        for word in self.surface_tokens(text):
+            if word in stop_words:
+                continue
+            for token in word.translate(translation_table).split():
+                yield lemmatize(token)
+
+    def normalize(self, text):
+        """Return the normalized text as a single space-separated string."""
+        return " ".join(self.tokens(text))
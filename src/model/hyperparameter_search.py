@@ -0,0 +1,121 @@
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import joblib
+from joblib import Parallel, delayed
+import mlflow
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.logger import logging
+
+def configure_mlflow()->None:
+    """
+    Log to the DagsHub tracking server when MLOPS_PROJECT is set, else to MLFLOW_TRACKING_URI,
+    else to a local mlflow.db so a search also runs offline.
+    """
+    dagshub_token = os.getenv("MLOPS_PROJECT")
+    if dagshub_token:
+        os.environ["MLFLOW_TRACKING_USERNAME"] = dagshub_token
+        os.environ["MLFLOW_TRACKING_PASSWORD"] = dagshub_token
+        mlflow.set_tracking_uri("https://dagshub.com/RisAhamed/MLOPS-project-AWS-K8s-Dashgub.mlflow")
+    elif not os.getenv("MLFLOW_TRACKING_URI"):
+        mlflow.set_tracking_uri("sqlite:///mlflow.db")
+    logging.info(f"MLflow tracking URI: {mlflow.get_tracking_uri()}")
+
+def search_estimator(penalty:str,max_iter:int,seed:int)->LogisticRegression:
+    # saga is the solver that supports both l1 and l2 and continues from coef_ with warm_start
+    return LogisticRegression(solver="saga",penalty=penalty,max_iter=max_iter,random_state=seed,warm_start=True)
+
+def fit_path(fold_path:str,penalty:str,fold:int,C_grid:list,search_params:dict,warm_start:bool=True)->list:
+    """
+    Fit one penalty on one fold for every C in ascending order. Each fit starts from the previous
+    coefficients, so the later, weaker-regularized fits need only a few saga epochs.
+    Runs in a pool worker, which memory-maps the fold's training and validation slices read-only.
+    """
+    x_fit, y_fit, x_validation, y_validation = joblib.load(fold_path, mmap_mode="r")
+    scorer = get_scorer(search_params["scoring"])
+    model = search_estimator(penalty, search_params["max_iter"], search_params["seed"])
+    trials = []
+    for C in sorted(C_grid):
+        if not warm_start:
+            model = search_estimator(penalty, search_params["max_iter"], search_params["seed"])
+        model.set_params(C=C)
+        start = time.perf_counter()
+        model.fit(x_fit, y_fit)
+        fit_seconds = time.perf_counter() - start
+        trials.append({"penalty": penalty, "C": C, "fold": fold, "fit_seconds": fit_seconds,
+                       "n_iter": int(model.n_iter_[0]), "score": float(scorer(model, x_validation, y_validation))})
+    return trials
+
+def summarize_trials(trials:list)->list:
+    """One entry per (penalty, C): the mean validation score and the fit time summed over the folds."""
+    candidates = {}
+    for trial in trials:
+        candidate = candidates.setdefault((trial["penalty"], trial["C"]),
+                                          {"penalty": trial["penalty"], "C": trial["C"], "fold_scores": [],
+                                           "fit_seconds": 0.0, "n_iter": 0})
+        candidate["fold_scores"].append(trial["score"])
+        candidate["fit_seconds"] += trial["fit_seconds"]
+        candidate["n_iter"] += trial["n_iter"]
+    for candidate in candidates.values():
+        candidate["score"] = float(np.mean(candidate["fold_scores"]))
+    return sorted(candidates.values(), key=lambda candidate: (candidate["penalty"], candidate["C"]))
+
+def log_trials(candidates:list,scoring:str)->None:
+    for candidate in candidates:
+        with mlflow.start_run(run_name=f"{candidate['penalty']}-C{candidate['C']}", nested=True):
+            mlflow.log_params({"penalty": candidate["penalty"], "C": candidate["C"]})
+            mlflow.log_metrics({f"mean_{scoring}": candidate["score"], "fit_seconds": candidate["fit_seconds"],
+                                "saga_epochs": candidate["n_iter"]})
+            for fold, score in enumerate(candidate["fold_scores"]):
+                mlflow.log_metric(f"{scoring}", score, step=fold)
+
+def search_hyperparameters(x_train,y_train,search_params:dict,warm_start:bool=True)->tuple:
+    """
+    Cross-validate LogisticRegression over penalty x C on a process pool and refit the best
+    candidate on the whole training split. Returns (fitted winner, candidates).
+    """
+    try:
+        folds = StratifiedKFold(n_splits=search_params["cv_folds"], shuffle=True, random_state=search_params["seed"])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Each fold's slices are cut once, here, and dumped to disk; the workers running that fold (one per
+            # penalty) map the same pages instead of each indexing a private copy out of the whole matrix
+            fold_paths = []
+            for fold, (train_rows, validation_rows) in enumerate(folds.split(np.zeros(len(y_train)), y_train)):
+                fold_paths.append(os.path.join(tmp_dir, f"fold-{fold}.joblib"))
+                joblib.dump((x_train[train_rows], y_train[train_rows], x_train[validation_rows], y_train[validation_rows]),
+                            fold_paths[-1])
+            results = Parallel(n_jobs=search_params["n_jobs"])(
+                delayed(fit_path)(fold_path, penalty, fold, search_params["C"], search_params, warm_start)
+                for penalty in search_params["penalty"] for fold, fold_path in enumerate(fold_paths))
+        candidates = summarize_trials([trial for path in results for trial in path])
+        best = max(candidates, key=lambda candidate: candidate["score"])
+        logging.info(f"Best of {len(candidates)} candidates: penalty={best['penalty']} C={best['C']} "
+                     f"mean {search_params['scoring']}={best['score']:.4f}")
+
+        model = search_estimator(best["penalty"], search_params["max_iter"], search_params["seed"])
+        model.set_params(C=best["C"], warm_start=False).fit(x_train, y_train)
+        return model, candidates
+    except Exception as e:
+        logging.exception(f"Error in hyperparameter search: {e}")
+        raise e
+
+def run_search(x_train,y_train,search_params:dict)->LogisticRegression:
+    """search_hyperparameters inside an MLflow parent run with one child run per candidate."""
+    mlflow.set_experiment("hyperparameter_search")
+    with mlflow.start_run(run_name="hyperparameter_search"):
+        mlflow.log_params({"C_grid": search_params["C"], "penalties": search_params["penalty"],
+                           "cv_folds": search_params["cv_folds"], "scoring": search_params["scoring"]})
+        start = time.perf_counter()
+        model, candidates = search_hyperparameters(x_train, y_train, search_params)
+        mlflow.log_metric("search_seconds", time.perf_counter() - start)
+        log_trials(candidates, search_params["scoring"])
+        best = max(candidates, key=lambda candidate: candidate["score"])
+        mlflow.log_params({"best_penalty": best["penalty"], "best_C": best["C"]})
+        mlflow.log_metric(f"best_mean_{search_params['scoring']}", best["score"])
+    return model
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+import numpy as np
+from scipy import sparse
+
+# Binary layout, little endian:
+#   header   magic, format version, reserved, metadata length, weights offset, weights length, sha256
+#   metadata UTF-8 JSON: model, vectorizer (config plus vocabulary in feature order, or hashing width),
+#            preprocessing (the training normalizer's settings)
+#   weights  one value per feature at a 64-byte aligned offset, mmap-able as a numpy array
+# The sha256 covers everything after the header.
+FORMAT_MAGIC = b"SLMA"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIQQ32s")
+ALIGNMENT = 64
+WEIGHT_DTYPES = {"float64": np.float64, "float32": np.float32, "float16": np.float16, "int8": np.int8}
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+
+class ArtifactError(ValueError):
+    pass
+
+
+class LinearArtifact:
+    """A loaded binary linear model: per-feature weights, intercept, classes and its vectorizer."""
+
+    def __init__(self, weights, intercept, classes, vectorizer, metadata):
+        self.weights = weights
+        self.intercept = intercept
+        self.classes = classes
+        self.vectorizer = vectorizer
+        self.metadata = metadata
+
+
+class VocabularyVectorizer:
+    """
+    Count vectorizer rebuilt from a stored vocabulary; matches CountVectorizer.transform for word
+    analyzers without sklearn. Exposes vocabulary_, ngram_range, analyzer and build_analyzer() so
+    SurfaceIndexVectorizer can wrap it.
+    """
+
+    analyzer = "word"
+
+    def __init__(self, vocabulary, lowercase=True, token_pattern=DEFAULT_TOKEN_PATTERN, ngram_range=(1, 1), binary=False):
+        self.vocabulary_ = vocabulary
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.binary = binary
+        self._token_regex = re.compile(token_pattern)
+
+    def build_analyzer(self):
+        min_n, max_n = self.ngram_range
+
+        def analyze(text):
+            tokens = self._token_regex.findall(text.lower() if self.lowercase else text)
+            if max_n == 1:
+                return tokens
+            terms = tokens if min_n == 1 else []
+            for n in range(max(min_n, 2), max_n + 1):
+                terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+            return terms
+        return analyze
+
+    def transform(self, texts):
+        analyze = self.build_analyzer()
+        vocabulary = self.vocabulary_
+        indices = []
+        indptr = [0]
+        for text in texts:
+            indices.extend(vocabulary[term] for term in analyze(text) if term in vocabulary)
+            indptr.append(len(indices))
+        features = sparse.csr_matrix(
+            (np.ones(len(indices), dtype=np.int64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(texts), len(vocabulary)),
+        )
+        features.sum_duplicates()
+        if self.binary:
+            features.data[:] = 1
+        return features
+
+
+def vectorizer_config(vectorizer):
+    """Settings needed to rebuild a fitted CountVectorizer or a HashingVectorizer; raises ArtifactError for others."""
+    if getattr(vectorizer, "analyzer", "word") != "word" or getattr(vectorizer, "tokenizer", None) is not None \
+            or getattr(vectorizer, "preprocessor", None) is not None or getattr(vectorizer, "stop_words", None) is not None \
+            or getattr(vectorizer, "strip_accents", None) is not None:
+        raise ArtifactError("Only word vectorizers with the default tokenizer, no stop words and no accent "
+                            "stripping can be exported")
+    if getattr(vectorizer, "use_idf", False) or type(vectorizer).__name__ == "TfidfVectorizer":
+        raise ArtifactError("TF-IDF vectorizers can't be exported, only term counts")
+    config = {
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "binary": bool(vectorizer.binary),
+    }
+    vocabulary = getattr(vectorizer, "vocabulary_", None)
+    if vocabulary is None:
+        if not hasattr(vectorizer, "n_features"):
+            raise ArtifactError("Vectorizer has neither a fitted vocabulary nor a hashing width")
+        # Stateless: the settings alone reproduce the feature space
+        config.update({"type": "hashing", "n_features": int(vectorizer.n_features),
+                       "alternate_sign": bool(vectorizer.alternate_sign), "norm": vectorizer.norm})
+        return config
+
+    terms = [None] * len(vocabulary)
+    for term, feature_id in vocabulary.items():
+        terms[int(feature_id)] = term
+    config.update({"type": "count", "vocabulary": terms})
+    return config
+
+
+def build_vectorizer(config):
+    """Rebuild the vectorizer described by vectorizer_config()."""
+    settings = {"lowercase": config["lowercase"], "token_pattern": config["token_pattern"],
+                "ngram_range": tuple(config["ngram_range"]), "binary": config["binary"]}
+    if config.get("type") == "hashing":
+        from sklearn.feature_extraction.text import HashingVectorizer
+        return HashingVectorizer(n_features=config["n_features"], alternate_sign=config["alternate_sign"],
+                                 norm=config["norm"], **settings)
+    vocabulary = {term: feature_id for feature_id, term in enumerate(config["vocabulary"])}
+    return VocabularyVectorizer(vocabulary, **settings)
+
+
+def num_features(config):
+    return config["n_features"] if config.get("type") == "hashing" else len(config["vocabulary"])
+
+
+def quantize(coef, weight_dtype):
+    """Return (stored weights, scale); int8 uses one symmetric scale for the whole vector."""
+    if weight_dtype not in WEIGHT_DTYPES:
+        raise ArtifactError(f"Unknown weight dtype {weight_dtype}, expected one of {sorted(WEIGHT_DTYPES)}")
+    if weight_dtype != "int8":
+        return coef.astype(WEIGHT_DTYPES[weight_dtype]), 1.0
+    max_abs = float(np.abs(coef).max()) if coef.size else 0.0
+    scale = max_abs / 127 if max_abs > 0 else 1.0
+    return np.clip(np.rint(coef / scale), -127, 127).astype(np.int8), scale
+
+
+def export_linear_model(model, vectorizer, file_path, weight_dtype="float64", preprocessing=None):
+    """Write a fitted binary linear classifier such as LogisticRegression and its vectorizer to file_path."""
+    coef = getattr(model, "coef_", None)
+    classes = getattr(model, "classes_", None)
+    if coef is None or classes is None or coef.shape[0] != 1 or len(classes) != 2:
+        raise ArtifactError("Only fitted binary linear estimators can be exported")
+    weights, scale = quantize(np.asarray(coef[0], dtype=np.float64), weight_dtype)
+    metadata = {
+        "model": {
+            "type": "binary_linear",
+            "intercept": float(model.intercept_[0]),
+            "classes": np.asarray(classes).tolist(),
+            "num_features": int(weights.size),
+            "weight_dtype": weight_dtype,
+            "scale": scale,
+        },
+        "vectorizer": vectorizer_config(vectorizer),
+        "preprocessing": preprocessing or {},
+    }
+    if num_features(metadata["vectorizer"]) != weights.size:
+        raise ArtifactError("Vectorizer output width and model coefficients have different sizes")
+
+    metadata_bytes = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+    weights_offset = -(-(HEADER.size + len(metadata_bytes)) // ALIGNMENT) * ALIGNMENT
+    padding = b"\0" * (weights_offset - HEADER.size - len(metadata_bytes))
+    weights_bytes = weights.astype(weights.dtype.newbyteorder("<"), copy=False).tobytes()
+    checksum = hashlib.sha256(metadata_bytes + padding + weights_bytes).digest()
+    header = HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, 0, len(metadata_bytes), weights_offset, len(weights_bytes), checksum)
+
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".linear-model-", dir=os.path.dirname(file_path) or ".")
+    # mkstemp creates the file 0600; serving containers may run as another user than training
+    os.fchmod(fd, 0o644)
+    with os.fdopen(fd, "wb") as f:
+        f.write(header + metadata_bytes + padding + weights_bytes)
+    os.replace(tmp_path, file_path)
+
+
+def check_preprocessing(stored, settings):
+    """
+    Raise ArtifactError unless the serving normalizer's settings() match the ones the model was trained
+    with. A stored max_length of None means training never truncated, so any serving cap is accepted.
+    """
+    for key in ("stop_words_sha256", "lemmatizer"):
+        if key not in stored:
+            raise ArtifactError(f"Artifact records no preprocessing {key}; re-export it with the current pipeline")
+        if stored[key] != settings[key]:
+            raise ArtifactError(f"Model was trained with preprocessing {key}={stored[key]}, "
+                                f"but the serving normalizer has {settings[key]}")
+    if stored.get("max_length") is not None and stored["max_length"] != settings["max_length"]:
+        raise ArtifactError(f"Model was trained on texts truncated to {stored['max_length']} characters, "
+                            f"but the serving normalizer truncates to {settings['max_length']}")
+
+
+def load_linear_model(file_path, verify=True, preprocessing=None):
+    """
+    Memory-map an exported model and return a LinearArtifact. float64 and float32 weights are
+    read-only views of the page cache, shared by every worker on the host; float16 and int8
+    weights are expanded to float32 once at load. preprocessing, if given, is the serving
+    normalizer's settings(), checked against the ones stored at export.
+    """
+    with open(file_path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(buffer) < HEADER.size:
+        raise ArtifactError(f"{file_path} is too short to be a model artifact")
+    magic, version, _, metadata_length, weights_offset, weights_length, checksum = HEADER.unpack_from(buffer, 0)
+    if magic != FORMAT_MAGIC:
+        raise ArtifactError(f"{file_path} is not a linear model artifact")
+    if version != FORMAT_VERSION:
+        raise ArtifactError(f"Unsupported linear model artifact version {version}")
+    if weights_offset + weights_length != len(buffer):
+        raise ArtifactError(f"{file_path} is truncated or has trailing data")
+    if verify and hashlib.sha256(memoryview(buffer)[HEADER.size:]).digest() != checksum:
+        raise ArtifactError(f"{file_path} failed its checksum")
+
+    metadata = json.loads(bytes(buffer[HEADER.size:HEADER.size + metadata_length]).decode("utf-8"))
+    if preprocessing is not None:
+        check_preprocessing(metadata.get("preprocessing", {}), preprocessing)
+    model_info = metadata["model"]
+    dtype = np.dtype(WEIGHT_DTYPES[model_info["weight_dtype"]]).newbyteorder("<")
+    weights = np.frombuffer(buffer, dtype=dtype, count=model_info["num_features"], offset=weights_offset)
+    if model_info["weight_dtype"] in ("float16", "int8"):
+        weights = weights.astype(np.float32) * np.float32(model_info["scale"])
+
+    vectorizer = build_vectorizer(metadata["vectorizer"])
+    return LinearArtifact(weights, model_info["intercept"], model_info["classes"], vectorizer, metadata)
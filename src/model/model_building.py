@@ -1,14 +1,28 @@
 import numpy as np
 import pandas as pd
 import pickle
-from sklearn.linear_model import LogisticRegression
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 import yaml
 from src.logger import logging
+from src.data.storage import load_storage_params, load_frame, load_feature_split, feature_split_info, iter_feature_chunks
+from src.model.linear_artifact import export_linear_model
+from src.features.text_normalizer import TextNormalizer
+from src.model.hyperparameter_search import configure_mlflow, run_search
 
+def load_params(params_path:str)->dict:
+    try:
+        with open(params_path) as yaml_file:
+            params = yaml.safe_load(yaml_file)
+            logging.info(f"loaded params successfully from {params_path}")
+            return params
+    except Exception as e:
+        logging.exception(f"Error loading params from {params_path}: {e}")
+        raise e
 
-def load_data(data_path:str)->pd.DataFrame:
+def load_data(data_path:str,storage:dict=None)->pd.DataFrame:
+    """data_path without extension; the storage params decide between .csv and .parquet."""
     try:
-        df = pd.read_csv(data_path)
+        df = load_frame(data_path, storage or load_storage_params())
         logging.info(f"Data loaded successfully from {data_path}")
         return df
     except Exception as e:
@@ -25,6 +39,28 @@ def train_model(x_train:np.ndarray,y_train:np.ndarray)->LogisticRegression:
         logging.exception(f"Error training model: {e}")
         raise e
 
+def train_streaming(path_stem:str,feature_format:str,storage:dict,training_params:dict)->SGDClassifier:
+    """
+    Logistic regression fitted with SGD partial_fit over chunk_rows blocks of the training split,
+    so memory depends on the chunk size rather than on the number of rows. Every epoch visits the
+    blocks in a new order and shuffles the rows inside each block.
+    """
+    try:
+        n_rows, classes = feature_split_info(path_stem, feature_format, storage, training_params["chunk_rows"])
+        clf = SGDClassifier(loss="log_loss", penalty="l1", alpha=training_params["alpha"], average=True,
+                            random_state=training_params["seed"])
+        rng = np.random.default_rng(training_params["seed"])
+        for epoch in range(training_params["epochs"]):
+            for x_chunk, y_chunk in iter_feature_chunks(path_stem, feature_format, storage, training_params["chunk_rows"], rng):
+                order = rng.permutation(len(y_chunk))
+                clf.partial_fit(x_chunk[order], y_chunk[order], classes=classes)
+            logging.info(f"Streaming training epoch {epoch + 1}/{training_params['epochs']} over {n_rows} rows done")
+        logging.info("Model training completed successfully")
+        return clf
+    except Exception as e:
+        logging.exception(f"Error training model in streaming mode: {e}")
+        raise e
+
 def save_model(model,file_path:str)->None:
     try:
         with open(file_path,"wb") as f:
@@ -34,14 +70,40 @@ def save_model(model,file_path:str)->None:
         logging.exception(f"Error saving model at {file_path}: {e}")
         raise e
 
+def export_serving_model(model,vectorizer_path:str,file_path:str,weight_dtype:str)->None:
+    """Write the compact linear model artifact the Flask app loads instead of the pickles."""
+    try:
+        with open(vectorizer_path,"rb") as f:
+            vectorizer = pickle.load(f)
+        # Same stop words and lemmatizer as data_preprocessing, which never truncates
+        export_linear_model(model,vectorizer,file_path,weight_dtype=weight_dtype,
+                            preprocessing=TextNormalizer().settings())
+        logging.info(f"Linear model artifact ({weight_dtype} weights) saved at {file_path}")
+    except Exception as e:
+        logging.exception(f"Error exporting linear model artifact to {file_path}: {e}")
+        raise e
+
 def main():
     try:
-        train_data = load_data("data/processed/train_bow.csv")
-        x_train = train_data.iloc[:, :-1].values
-        y_train = train_data.iloc[:, -1].values
+        params = load_params("params.yaml")
+        weight_dtype = params["model_building"]["weight_dtype"]
+        feature_format = params["feature_engineering"].get("feature_format", "sparse")
+        storage = load_storage_params("params.yaml")
 
-        clf = train_model(x_train,y_train)
+        training_mode = params["model_building"].get("mode", "batch")
+        if training_mode == "streaming":
+            clf = train_streaming("data/processed/train_bow", feature_format, storage, params["model_building"])
+        elif training_mode == "search":
+            x_train, y_train = load_feature_split("data/processed/train_bow", feature_format, storage)
+            configure_mlflow()
+            clf = run_search(x_train, y_train, params["hyperparameter_search"])
+        elif training_mode == "batch":
+            x_train, y_train = load_feature_split("data/processed/train_bow", feature_format, storage)
+            clf = train_model(x_train,y_train)
+        else:
+            raise ValueError(f"Unknown model_building.mode: {training_mode}")
         save_model(clf,"models/model.pkl")
+        export_serving_model(clf,"models/vectorizer.pkl","models/linear_model.bin",weight_dtype)
         logging.info("Model training and saving completed successfully")
     except Exception as e:
         logging.exception(f"Error in main function: {e}")
@@ -8,6 +8,8 @@ import mlflow
 import mlflow.sklearn
 import os
 from src.logger import logging
+from src.data.storage import load_storage_params, load_frame, load_feature_split
+import yaml
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -39,9 +41,10 @@ def load_model(model_path:str)->pickle:
         logging.exception(f"Error loading model from {model_path}: {e}")
         raise e
 
-def load_data(data_path:str)->pd.DataFrame:
+def load_data(data_path:str,storage:dict=None)->pd.DataFrame:
+    """data_path without extension; the storage params decide between .csv and .parquet."""
     try:
-        df =pd.read_csv(data_path)
+        df =load_frame(data_path, storage or load_storage_params())
         logging.info(f"Data loaded successfully from {data_path}")
         return df
     except Exception as e:
@@ -97,15 +100,21 @@ def main():
     with mlflow.start_run():
         model_path = "models/model.pkl"  # Using forward slash for compatibility
         model = load_model(model_path)
-        test_data = load_data("data/processed/test_bow.csv")
-        x_test = test_data.iloc[:,:-1].values
-        y_test = test_data.iloc[:,-1].values
+        with open("params.yaml") as yaml_file:
+            feature_format = yaml.safe_load(yaml_file)["feature_engineering"].get("feature_format", "sparse")
+        x_test, y_test = load_feature_split("data/processed/test_bow", feature_format, load_storage_params("params.yaml"))
         metrics = evaluate_model(model,x_test,y_test)
 
         save_metrics(metrics,"reports/metrics.json")
         for metric_name,metric_value in metrics.items():
             mlflow.log_metric(metric_name,metric_value)
         mlflow.sklearn.log_model(model,"model")
+        # Ship the fitted vectorizer (and its surface index) inside the model so serving swaps them as a pair
+        mlflow.log_artifact("models/vectorizer.pkl", artifact_path="model")
+        if os.path.exists("models/surface_index.json"):
+            mlflow.log_artifact("models/surface_index.json", artifact_path="model")
+        if os.path.exists("models/linear_model.bin"):
+            mlflow.log_artifact("models/linear_model.bin", artifact_path="model")
         run_id = mlflow.active_run().info.run_id
         model_path = f"runs:/{run_id}/model"
         save_model_info(run_id, model_path, 'reports/model_info.json')
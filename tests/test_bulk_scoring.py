@@ -0,0 +1,68 @@
+import gzip
+import io
+import json
+import unittest
+
+from flask_app.bulk_scoring import UnsupportedFormat, iter_records, stream_scores
+
+
+def fake_score(texts):
+    return [1 if "good" in text else 0 for text in texts], [0.9 if "good" in text else 0.1 for text in texts]
+
+
+class BulkScoringTests(unittest.TestCase):
+
+    def test_ndjson_objects_and_strings(self):
+        body = b'{"id": "a", "text": "good"}\n"bad"\n\n{"text": "good too"}\n'
+        records = list(iter_records(io.BytesIO(body), "application/x-ndjson"))
+        self.assertEqual(records, [("a", "good", None), (1, "bad", None), (2, "good too", None)])
+
+    def test_ndjson_bad_lines_become_errors(self):
+        body = b'not json\n{"id": 7, "text": 3}\n'
+        records = list(iter_records(io.BytesIO(body), "application/x-ndjson"))
+        self.assertEqual([record[0] for record in records], [0, 7])
+        self.assertTrue(all(record[2] for record in records))
+
+    def test_oversized_ndjson_line_is_skipped(self):
+        body = json.dumps({"text": "x" * 100}).encode() + b'\n"ok"\n'
+        records = list(iter_records(io.BytesIO(body), "application/x-ndjson", max_line_chars=20))
+        self.assertIsNotNone(records[0][2])
+        self.assertEqual(records[1], (1, "ok", None))
+
+    def test_gzipped_csv(self):
+        body = gzip.compress(b'id,text\n1,good\n2,"bad, really"\n')
+        records = list(iter_records(io.BytesIO(body), "text/csv; charset=utf-8", gzipped=True))
+        self.assertEqual(records, [("1", "good", None), ("2", "bad, really", None)])
+
+    def test_oversized_csv_rows_are_skipped(self):
+        body = b'id,text\n1,' + b"x" * 100 + b'\n2,"' + b"y\n" * 50 + b'"\n3,ok\n'
+        records = list(iter_records(io.BytesIO(body), "text/csv", max_line_chars=40))
+        self.assertEqual([record[:2] for record in records], [(0, None), (1, None), ("3", "ok")])
+        self.assertTrue(all("longer than 40" in record[2] for record in records[:2]))
+
+    def test_csv_without_text_column_is_rejected(self):
+        with self.assertRaises(UnsupportedFormat):
+            iter_records(io.BytesIO(b"id,body\n1,good\n"), "text/csv")
+
+    def test_unknown_content_type_is_rejected(self):
+        with self.assertRaises(UnsupportedFormat):
+            iter_records(io.BytesIO(b"{}"), "application/json")
+
+    def test_stream_scores_chunks_in_order(self):
+        records = [(i, "good" if i % 2 else "bad", None) for i in range(5)] + [(5, None, "broken")]
+        batch_sizes = []
+
+        def score(texts):
+            batch_sizes.append(len(texts))
+            return fake_score(texts)
+
+        chunks = list(stream_scores(iter(records), score, chunk_size=2))
+        results = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(batch_sizes, [2, 2, 1])
+        self.assertEqual([result["id"] for result in results], list(range(6)))
+        self.assertEqual([result.get("label") for result in results], [0, 1, 0, 1, 0, None])
+        self.assertEqual(results[-1]["error"], "broken")
+
+if __name__ == '__main__':
+    unittest.main()
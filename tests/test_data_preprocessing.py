@@ -0,0 +1,63 @@
+import unittest
+
+import pandas as pd
+
+from src.data.data_preprocessing import preprocess_dataframe, preprocess_dataframes, preprocess_text, preprocess_texts_unique
+
+REVIEWS = ["I LOVED this movie!!! 10/10, see https://example.com/review now",
+           "Terrible... the actors were running around; worst 2 hours of my life",
+           "The batteries died after 3 days :( would not buy again",
+           "",
+           "Geese and mice were the leaves' best friends — wolves too؛",
+           "www.example.com/page? It's   fine, I guess.\n\tNothing special"]
+
+
+def frame(n_rows, offset=0):
+    return pd.DataFrame({"review": [REVIEWS[(i + offset) % len(REVIEWS)] + f" #{i}" for i in range(n_rows)],
+                         "sentiment": [i % 2 for i in range(n_rows)]})
+
+
+class ParallelPreprocessingTests(unittest.TestCase):
+
+    def test_parallel_matches_row_by_row(self):
+        expected = preprocess_dataframe(frame(250), "review")
+        (parallel,) = preprocess_dataframes([frame(250)], "review", n_jobs=2, chunk_size=7)
+        pd.testing.assert_frame_equal(parallel, expected)
+
+    def test_several_frames_share_the_pool_and_keep_their_rows(self):
+        train, test = frame(101), frame(37, offset=3)
+        expected_train = preprocess_dataframe(frame(101), "review")
+        expected_test = preprocess_dataframe(frame(37, offset=3), "review")
+        parallel_train, parallel_test = preprocess_dataframes([train, test], "review", n_jobs=2, chunk_size=10)
+        pd.testing.assert_frame_equal(parallel_train, expected_train)
+        pd.testing.assert_frame_equal(parallel_test, expected_test)
+
+    def test_serial_path_is_the_row_by_row_apply(self):
+        (serial,) = preprocess_dataframes([frame(20)], "review", n_jobs=1)
+        self.assertEqual(serial["review"].iloc[0], "loved movie see")
+
+
+class UniqueTokenPreprocessingTests(unittest.TestCase):
+
+    def test_matches_row_by_row_exactly(self):
+        texts = [review + suffix for review in REVIEWS for suffix in ("", " again and AGAIN", " ourselves, yours; it's!")]
+        texts += ["   ", "123 456", "the of and", "Ünïcödé façade naïve CAFÉ cafés", "wolves\u00a0running\tgeese"]
+        self.assertEqual(preprocess_texts_unique(texts), [preprocess_text(text) for text in texts])
+
+    def test_empty_input(self):
+        self.assertEqual(preprocess_texts_unique([]), [])
+        self.assertEqual(preprocess_texts_unique(["", "!!!"]), ["", ""])
+
+    def test_mode_works_with_and_without_the_pool(self):
+        expected = preprocess_dataframe(frame(120), "review")
+        for n_jobs in (1, 2):
+            (result,) = preprocess_dataframes([frame(120)], "review", n_jobs=n_jobs, chunk_size=25, mode="unique_tokens")
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            preprocess_dataframes([frame(3)], "review", mode="vectorized")
+
+
+if __name__ == "__main__":
+    unittest.main()
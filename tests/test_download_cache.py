@@ -0,0 +1,123 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.data.download_cache import DownloadCache
+
+CSV = b"review,sentiment\n" + b"".join(b"a fine movie number %d,positive\n" % i for i in range(2000))
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    """Serves server.body with an ETag, honours If-None-Match, Range and If-Range, and can cut a body short."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(dict(self.headers))
+        body, etag = server.body, '"%s"' % hashlib.sha256(server.body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        start = 0
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range", etag) == etag:
+            start = int(range_header.split("=")[1].rstrip("-"))
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body) - start))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        self.end_headers()
+        if server.cut_after is not None:
+            # Simulate a dropped connection part way through the body
+            self.wfile.write(body[start:start + server.cut_after])
+            server.cut_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(body[start:])
+
+
+class DownloadCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SourceHandler)
+        self.server.body, self.server.cut_after, self.server.requests = CSV, None, []
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/data.csv"
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = DownloadCache(self.tmp_dir.name, timeout=5)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def test_second_fetch_is_a_conditional_cache_hit(self):
+        first = self.cache.fetch(self.url)
+        with self.assertLogs(level="INFO") as logs:
+            second = self.cache.fetch(self.url)
+        self.assertEqual(first, second)
+        self.assertEqual(self.read(second), CSV)
+        self.assertIn("If-None-Match", self.server.requests[1])
+        self.assertTrue(any("cache hit" in line for line in logs.output))
+
+    def test_changed_source_is_downloaded_again(self):
+        self.cache.fetch(self.url)
+        self.server.body = CSV + b"a new review,negative\n"
+        path = self.cache.fetch(self.url)
+        self.assertEqual(self.read(path), self.server.body)
+
+    def test_interrupted_download_resumes_with_range(self):
+        self.server.cut_after = 1000
+        with self.assertRaises(Exception):
+            self.cache.fetch(self.url)
+        path = self.cache.fetch(self.url)
+        self.assertEqual(self.read(path), CSV)
+        self.assertEqual(self.server.requests[1]["Range"], "bytes=1000-")
+        self.assertIn("If-Range", self.server.requests[1])
+
+    def test_resume_restarts_when_source_changed(self):
+        self.server.cut_after = 1000
+        with self.assertRaises(Exception):
+            self.cache.fetch(self.url)
+        self.server.body = b"review,sentiment\nsomething else entirely,negative\n"
+        path = self.cache.fetch(self.url)
+        self.assertEqual(self.read(path), self.server.body)
+
+    def test_expected_checksum_mismatch_raises_and_keeps_nothing(self):
+        with self.assertRaises(ValueError):
+            self.cache.fetch(self.url, expected_sha256="0" * 64)
+        path = self.cache.fetch(self.url, expected_sha256=hashlib.sha256(CSV).hexdigest())
+        self.assertEqual(self.read(path), CSV)
+        self.assertNotIn("If-None-Match", self.server.requests[1])
+
+    def test_corrupted_cache_file_is_downloaded_again(self):
+        path = self.cache.fetch(self.url)
+        with open(path, "r+b") as f:
+            f.write(b"X")
+        self.cache.fetch(self.url)
+        self.assertEqual(self.read(path), CSV)
+        self.assertNotIn("If-None-Match", self.server.requests[1])
+
+    def test_cached_copy_is_used_when_source_is_unreachable(self):
+        path = self.cache.fetch(self.url)
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertEqual(self.cache.fetch(self.url), path)
+        with self.assertRaises(urllib.error.URLError):
+            DownloadCache(os.path.join(self.tmp_dir.name, "empty"), timeout=5).fetch(self.url)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from src.features.feature_engineering import (MAX_DENSE_HASH_FEATURES, check_dense_hashing, hashing_features,
+                                              hashing_vectorizer, parallel_transform)
+
+TEXTS = [f"review {i} was {'great' if i % 2 else 'awful'} and the plot {'worked' if i % 3 else 'dragged'}"
+         for i in range(50)]
+
+
+class HashingFeaturesTests(unittest.TestCase):
+
+    def test_chunked_transform_matches_one_transform(self):
+        vectorizer = hashing_vectorizer(256)
+        chunked = parallel_transform(vectorizer, TEXTS, n_jobs=2, chunk_size=7)
+        self.assertEqual(chunked.shape, (len(TEXTS), 256))
+        self.assertEqual((chunked != vectorizer.transform(TEXTS)).nnz, 0)
+
+    def test_dense_hashing_width_is_capped(self):
+        check_dense_hashing(MAX_DENSE_HASH_FEATURES)
+        with self.assertRaises(ValueError):
+            check_dense_hashing(MAX_DENSE_HASH_FEATURES + 1)
+
+    def test_hashing_features_have_n_features_columns(self):
+        train_df = pd.DataFrame({"review": TEXTS[:40], "sentiment": [i % 2 for i in range(40)]})
+        test_df = pd.DataFrame({"review": TEXTS[40:], "sentiment": [i % 2 for i in range(10)]})
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # hashing_features saves the vectorizer under models/ relative to the working directory
+            os.makedirs(os.path.join(tmp_dir, "models"))
+            os.chdir(tmp_dir)
+            self.addCleanup(os.chdir, cwd)
+            with mock.patch("src.features.feature_engineering.export_surface_index"):
+                x_train, x_test = hashing_features(train_df, test_df, 512, n_jobs=1)
+            self.assertTrue(os.path.exists(os.path.join("models", "vectorizer.pkl")))
+            os.chdir(cwd)
+        self.assertEqual(x_train.shape, (40, 512))
+        self.assertEqual(x_test.shape, (10, 512))
+
+if __name__ == '__main__':
+    unittest.main()
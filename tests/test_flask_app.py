@@ -1,3 +1,4 @@
+import json
 import unittest
 from flask_app.app import app
 
@@ -20,5 +21,94 @@ class FlaskAppTests(unittest.TestCase):
             "Response should contain either 'Positive' or 'Negative'"
         )
 
+    def test_predict_batch(self):
+        response = self.client.post('/api/v1/predict_batch', json={"texts": ["I love this!", "I hate this."]})
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual(len(body["labels"]), 2)
+        self.assertTrue(all(label in (0, 1) for label in body["labels"]))
+        if body["probabilities"] is not None:
+            self.assertEqual(len(body["probabilities"]), 2)
+
+    def test_predict_batch_repeats_are_consistent(self):
+        texts = ["Great product!", "great   PRODUCT", "Great product!"]
+        first = self.client.post('/api/v1/predict_batch', json={"texts": texts}).get_json()
+        second = self.client.post('/api/v1/predict_batch', json={"texts": texts}).get_json()
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first["labels"])), 1)
+
+    def test_predict_batch_rejects_invalid_payload(self):
+        response = self.client.post('/api/v1/predict_batch', json={"texts": "I love this!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_predict_batch_rejects_oversized_batch(self):
+        from flask_app.app import MAX_BATCH_SIZE
+        response = self.client.post('/api/v1/predict_batch', json={"texts": ["ok"] * (MAX_BATCH_SIZE + 1)})
+        self.assertEqual(response.status_code, 413)
+
+    def test_predict_bulk_streams_ndjson(self):
+        import gzip
+        body = gzip.compress(b'{"id": "a", "text": "I love this!"}\n"I hate this."\n')
+        response = self.client.post('/api/v1/predict_bulk', data=body,
+                                    headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"})
+        self.assertEqual(response.status_code, 200)
+        results = [json.loads(line) for line in response.data.decode("utf-8").splitlines()]
+        self.assertEqual([result["id"] for result in results], ["a", 1])
+        self.assertTrue(all(result["label"] in (0, 1) for result in results))
+        metrics = self.client.get('/metrics').data.decode("utf-8")
+        self.assertIn("app_bulk_chunk_size_count", metrics)
+
+    def test_predict_bulk_reports_scoring_errors_in_band(self):
+        from unittest import mock
+        import flask_app.app as app_module
+        def observed_latencies():
+            return app_module.registry.get_sample_value("app_request_latency_seconds_count",
+                                                        {"endpoint": "/api/v1/predict_bulk"}) or 0
+
+        before = observed_latencies()
+        with mock.patch.object(app_module.serving, "predictor", side_effect=RuntimeError("model unavailable")):
+            response = self.client.post('/api/v1/predict_bulk', data=b'"I love this!"\n',
+                                        content_type="application/x-ndjson")
+            lines = [json.loads(line) for line in response.data.decode("utf-8").splitlines()]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lines, [{"error": "Prediction Error: model unavailable"}])
+        self.assertEqual(observed_latencies(), before + 1)
+
+    def test_predict_bulk_rejects_unknown_format(self):
+        response = self.client.post('/api/v1/predict_bulk', data="{}", content_type="application/json")
+        self.assertEqual(response.status_code, 415)
+
+    def test_profiling_endpoint_is_off_by_default(self):
+        response = self.client.post('/debug/profile?seconds=1', headers={"X-Profile-Token": ""})
+        self.assertEqual(response.status_code, 404)
+
+    def test_cache_hits_skip_nltk(self):
+        from unittest import mock
+        import flask_app.app as app_module
+        self.assertIsNotNone(app_module.prediction_cache)
+        texts = ["Cache hits never lemmatize", "cache HITS never   lemmatize"]
+        normalizer = app_module.normalizer
+        with mock.patch.object(normalizer, "normalize", wraps=normalizer.normalize) as normalize, \
+                mock.patch.object(normalizer, "lemmatize", wraps=normalizer.lemmatize) as lemmatize:
+            first = self.client.post('/api/v1/predict_batch', json={"texts": texts}).get_json()
+            if app_module.serving.surface_vectorizer is not None:
+                self.assertEqual(normalize.call_count, 0)
+            normalize.reset_mock()
+            lemmatize.reset_mock()
+            second = self.client.post('/api/v1/predict_batch', json={"texts": texts}).get_json()
+        self.assertEqual(first, second)
+        self.assertEqual(normalize.call_count, 0)
+        self.assertEqual(lemmatize.call_count, 0)
+
+    def test_server_timing_header(self):
+        response = self.client.post('/api/v1/predict_batch', json={"texts": ["Server timing check"]})
+        stages = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+        # The cache is on by default: the key is a digest of the surface tokens, not a normalization
+        self.assertIn("cache_key", stages)
+        self.assertNotIn("normalize", stages)
+        self.assertIn("predict", stages)
+        metrics = self.client.get('/metrics').data.decode("utf-8")
+        self.assertIn('app_stage_latency_seconds_count{endpoint="/api/v1/predict_batch",stage="cache_key"}', metrics)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+import mlflow
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+
+from src.model.hyperparameter_search import fit_path, run_search, search_hyperparameters, summarize_trials
+
+SEARCH = {"C": [4, 0.1, 1], "penalty": ["l1", "l2"], "cv_folds": 2, "scoring": "roc_auc", "max_iter": 100,
+          "n_jobs": 2, "seed": 42}
+
+
+def make_data(n_rows=400, n_features=30, seed=0):
+    rng = np.random.default_rng(seed)
+    features = sparse.random(n_rows, n_features, density=0.2, format="csr", random_state=seed, dtype=np.float32)
+    features.data = np.rint(features.data * 3) + 1
+    labels = (features[:, :5].sum(axis=1).A1 - features[:, 5:10].sum(axis=1).A1 + rng.normal(0, 1, n_rows) > 0)
+    return features, labels.astype(np.int8)
+
+
+class HyperparameterSearchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.x_train, self.y_train = make_data()
+
+    def test_search_refits_the_best_candidate(self):
+        model, candidates = search_hyperparameters(self.x_train, self.y_train, SEARCH)
+        self.assertEqual([(c["penalty"], c["C"]) for c in candidates],
+                         [("l1", 0.1), ("l1", 1), ("l1", 4), ("l2", 0.1), ("l2", 1), ("l2", 4)])
+        self.assertTrue(all(len(c["fold_scores"]) == 2 and c["fit_seconds"] > 0 for c in candidates))
+        best = max(candidates, key=lambda c: c["score"])
+        self.assertIsInstance(model, LogisticRegression)
+        self.assertEqual((model.penalty, model.C), (best["penalty"], best["C"]))
+        self.assertGreater(best["score"], 0.8)
+        self.assertEqual(model.coef_.shape, (1, 30))
+
+    def test_warm_started_path_matches_cold_fits(self):
+        import joblib
+        fold_path = os.path.join(self.tmp_dir.name, "fold-0.joblib")
+        joblib.dump((self.x_train[::2], self.y_train[::2], self.x_train[1::2], self.y_train[1::2]), fold_path)
+        params = {**SEARCH, "max_iter": 1000}
+        warm = fit_path(fold_path, "l2", 0, params["C"], params)
+        cold = fit_path(fold_path, "l2", 0, params["C"], params, warm_start=False)
+        self.assertEqual([trial["C"] for trial in warm], [0.1, 1, 4])
+        for warm_trial, cold_trial in zip(warm, cold):
+            self.assertAlmostEqual(warm_trial["score"], cold_trial["score"], places=3)
+        self.assertLess(sum(t["n_iter"] for t in warm[1:]), sum(t["n_iter"] for t in cold[1:]))
+
+    def test_trials_are_child_runs(self):
+        mlflow.set_tracking_uri(f"sqlite:///{os.path.join(self.tmp_dir.name, 'mlflow.db')}")
+        self.addCleanup(mlflow.set_tracking_uri, "")
+        model = run_search(self.x_train, self.y_train, {**SEARCH, "penalty": ["l2"]})
+        runs = mlflow.search_runs(experiment_names=["hyperparameter_search"])
+        children = runs[runs["tags.mlflow.parentRunId"].notna()]
+        self.assertEqual(len(runs), 4)
+        self.assertEqual(sorted(children["params.C"].astype(float)), [0.1, 1, 4])
+        self.assertTrue((children["metrics.fit_seconds"] > 0).all())
+        parent = runs[runs["tags.mlflow.parentRunId"].isna()].iloc[0]
+        self.assertEqual(float(parent["params.best_C"]), model.C)
+
+    def test_summarize_trials_sums_fit_time_over_folds(self):
+        trials = [{"penalty": "l1", "C": 1, "fold": fold, "fit_seconds": 0.5, "n_iter": 3, "score": score}
+                  for fold, score in enumerate([0.6, 0.8])]
+        (candidate,) = summarize_trials(trials)
+        self.assertAlmostEqual(candidate["score"], 0.7)
+        self.assertEqual((candidate["fit_seconds"], candidate["n_iter"]), (1.0, 6))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from scipy import sparse
+from sklearn.linear_model import LogisticRegression
+from flask_app.inference import SparseLinearScorer, build_predictor, dataframe_predict, unwrap_sklearn_model
+
+
+class SparseInferenceTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(42)
+        cls.features = sparse.csr_matrix(rng.poisson(0.3, size=(200, 50)).astype(np.int64))
+        cls.labels = (cls.features[:, :25].sum(axis=1).A1 > cls.features[:, 25:].sum(axis=1).A1).astype(int)
+        cls.model = LogisticRegression(C=2, solver="liblinear").fit(cls.features, cls.labels)
+
+    def test_scorer_matches_estimator(self):
+        scorer = SparseLinearScorer.from_estimator(self.model)
+        np.testing.assert_array_equal(scorer.predict(self.features), self.model.predict(self.features))
+        np.testing.assert_allclose(scorer.predict_proba(self.features), self.model.predict_proba(self.features)[:, 1])
+
+    def test_sparse_mode_matches_dataframe_mode(self):
+        sparse_labels, sparse_probabilities = build_predictor(self.model, "sparse")(self.features)
+        dense_labels, dense_probabilities = dataframe_predict(self.model, self.features)
+        np.testing.assert_array_equal(sparse_labels, dense_labels)
+        np.testing.assert_allclose(sparse_probabilities, dense_probabilities)
+
+    def test_unwrap_pyfunc_style_model(self):
+        class Wrapper:
+            def __init__(self, model):
+                self._model = model
+
+            def get_raw_model(self):
+                return self._model
+
+            def predict(self, features):
+                return self._model.predict(features)
+
+        self.assertIs(unwrap_sklearn_model(Wrapper(self.model)), self.model)
+
+    def test_unknown_mode_raises(self):
+        with self.assertRaises(ValueError):
+            build_predictor(self.model, "gpu")
+
+if __name__ == '__main__':
+    unittest.main()
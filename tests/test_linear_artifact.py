@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from flask_app.inference import SparseLinearScorer
+from src.model.linear_artifact import ArtifactError, VocabularyVectorizer, export_linear_model, load_linear_model
+
+TRAIN_TEXTS = ["love great movie", "great acting love it", "terrible plot hate", "awful boring hate it",
+               "wonderful story great", "worst film awful", "it was fine", "bad ending terrible"]
+TRAIN_LABELS = [1, 1, 0, 0, 1, 0, 1, 0]
+TEST_TEXTS = ["Great, great movie!", "hate the awful ending", "nothing known here", "", "LOVE it, 10/10"]
+
+
+class LinearArtifactTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "linear_model.bin")
+
+    def fit(self, **vectorizer_params):
+        vectorizer = CountVectorizer(**vectorizer_params)
+        model = LogisticRegression(C=2, solver="liblinear").fit(vectorizer.fit_transform(TRAIN_TEXTS), TRAIN_LABELS)
+        return model, vectorizer
+
+    def test_float64_roundtrip_matches_sklearn(self):
+        model, vectorizer = self.fit()
+        export_linear_model(model, vectorizer, self.path)
+        artifact = load_linear_model(self.path)
+
+        features = artifact.vectorizer.transform(TEST_TEXTS)
+        self.assertEqual((features != vectorizer.transform(TEST_TEXTS)).nnz, 0)
+        self.assertFalse(artifact.weights.flags.writeable)
+
+        scorer = SparseLinearScorer(artifact.weights, artifact.intercept, artifact.classes)
+        np.testing.assert_allclose(scorer.predict_proba(features), model.predict_proba(features)[:, 1], rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(scorer.predict(features), model.predict(features))
+
+    def test_exported_file_is_world_readable(self):
+        import stat
+        model, vectorizer = self.fit()
+        export_linear_model(model, vectorizer, self.path)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+    def test_ngram_and_binary_vectorizers_roundtrip(self):
+        model, vectorizer = self.fit(ngram_range=(1, 2), binary=True)
+        export_linear_model(model, vectorizer, self.path)
+        features = load_linear_model(self.path).vectorizer.transform(TEST_TEXTS + ["great great movie movie"])
+        self.assertEqual((features != vectorizer.transform(TEST_TEXTS + ["great great movie movie"])).nnz, 0)
+
+    def test_hashing_vectorizer_roundtrip(self):
+        vectorizer = HashingVectorizer(n_features=256, alternate_sign=False, norm=None)
+        model = LogisticRegression(C=2, solver="liblinear").fit(vectorizer.transform(TRAIN_TEXTS), TRAIN_LABELS)
+        export_linear_model(model, vectorizer, self.path)
+        artifact = load_linear_model(self.path)
+
+        features = artifact.vectorizer.transform(TEST_TEXTS)
+        self.assertEqual((features != vectorizer.transform(TEST_TEXTS)).nnz, 0)
+        scorer = SparseLinearScorer(artifact.weights, artifact.intercept, artifact.classes)
+        np.testing.assert_allclose(scorer.predict_proba(features), model.predict_proba(features)[:, 1], atol=1e-12)
+
+    def test_quantized_weights_stay_close(self):
+        model, vectorizer = self.fit()
+        features = vectorizer.transform(TEST_TEXTS)
+        expected = model.predict_proba(features)[:, 1]
+        for weight_dtype, tolerance in (("float32", 1e-6), ("float16", 1e-3), ("int8", 2e-2)):
+            export_linear_model(model, vectorizer, self.path, weight_dtype=weight_dtype)
+            artifact = load_linear_model(self.path)
+            scorer = SparseLinearScorer(artifact.weights, artifact.intercept, artifact.classes)
+            np.testing.assert_allclose(scorer.predict_proba(features), expected, atol=tolerance, err_msg=weight_dtype)
+
+    def test_smaller_weight_dtypes_shrink_the_file(self):
+        model, vectorizer = self.fit()
+        sizes = {}
+        for weight_dtype in ("float64", "int8"):
+            export_linear_model(model, vectorizer, self.path, weight_dtype=weight_dtype)
+            sizes[weight_dtype] = os.path.getsize(self.path)
+        self.assertEqual(sizes["float64"] - sizes["int8"], 7 * len(vectorizer.vocabulary_))
+
+    def test_corruption_is_detected(self):
+        model, vectorizer = self.fit()
+        export_linear_model(model, vectorizer, self.path)
+        with open(self.path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last_byte = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last_byte[0] ^ 0xFF]))
+        with self.assertRaises(ArtifactError):
+            load_linear_model(self.path)
+
+    def test_other_files_are_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\x80\x04" + b"\0" * 100)
+        with self.assertRaises(ArtifactError):
+            load_linear_model(self.path)
+
+    def test_preprocessing_settings_are_checked_at_load(self):
+        from src.features.text_normalizer import TextNormalizer
+        model, vectorizer = self.fit()
+        export_linear_model(model, vectorizer, self.path, preprocessing=TextNormalizer(stop_words=["the"]).settings())
+
+        load_linear_model(self.path, preprocessing=TextNormalizer(max_length=100, stop_words=["the"]).settings())
+        with self.assertRaises(ArtifactError):
+            load_linear_model(self.path, preprocessing=TextNormalizer(stop_words=["the", "a"]).settings())
+
+        export_linear_model(model, vectorizer, self.path, preprocessing=TextNormalizer(max_length=50, stop_words=["the"]).settings())
+        with self.assertRaises(ArtifactError):
+            load_linear_model(self.path, preprocessing=TextNormalizer(max_length=100, stop_words=["the"]).settings())
+
+        export_linear_model(model, vectorizer, self.path, preprocessing={"normalizer": "TextNormalizer"})
+        with self.assertRaises(ArtifactError):
+            load_linear_model(self.path, preprocessing=TextNormalizer(stop_words=["the"]).settings())
+        self.assertIsNotNone(load_linear_model(self.path))
+
+    def test_unsupported_vectorizers_are_rejected(self):
+        vectorizer = TfidfVectorizer()
+        model = LogisticRegression().fit(vectorizer.fit_transform(TRAIN_TEXTS), TRAIN_LABELS)
+        with self.assertRaises(ArtifactError):
+            export_linear_model(model, vectorizer, self.path)
+
+    def test_vocabulary_vectorizer_works_with_surface_index(self):
+        from src.features.surface_index import SurfaceIndexVectorizer
+        from src.features.text_normalizer import TextNormalizer
+
+        normalizer = TextNormalizer()
+        vectorizer = VocabularyVectorizer({"love": 0, "movie": 1, "hate": 2})
+        surface_vectorizer = SurfaceIndexVectorizer(normalizer, vectorizer).build_index(["loved", "movies"])
+        texts = ["I loved these movies", "Hate it"]
+        expected = vectorizer.transform([normalizer.normalize(text) for text in texts])
+        self.assertEqual((surface_vectorizer.transform(texts) != expected).nnz, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import unittest
+from prometheus_client import CollectorRegistry
+from flask_app.micro_batching import MicroBatcher, create_asgi_app
+
+
+class RecordingScorer:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [int("good" in text) for text in texts], [0.9 if "good" in text else 0.1 for text in texts]
+
+
+async def call_asgi(app, method, path, payload=None):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": method, "path": path}, receive, send)
+    return sent[0]["status"], sent[1]["body"]
+
+
+class MicroBatcherTests(unittest.TestCase):
+
+    def run_with_batcher(self, scorer, coroutine_factory, **kwargs):
+        async def main():
+            batcher = MicroBatcher(scorer, registry=CollectorRegistry(), **kwargs)
+            await batcher.start()
+            try:
+                return await coroutine_factory(batcher)
+            finally:
+                await batcher.stop()
+        return asyncio.run(main())
+
+    def test_concurrent_requests_share_one_batch(self):
+        scorer = RecordingScorer()
+        texts = ["good movie", "bad movie", "good plot", "bad plot"]
+        results = self.run_with_batcher(
+            scorer, lambda batcher: asyncio.gather(*(batcher.submit(text) for text in texts)),
+            max_batch_size=8, max_wait_seconds=0.05)
+        self.assertEqual(results, [(1, 0.9), (0, 0.1), (1, 0.9), (0, 0.1)])
+        self.assertEqual(scorer.batches, [texts])
+
+    def test_batches_respect_max_size(self):
+        scorer = RecordingScorer()
+        texts = [f"good {i}" for i in range(10)]
+        self.run_with_batcher(scorer, lambda batcher: batcher.submit_many(texts),
+                              max_batch_size=4, max_wait_seconds=0.05)
+        self.assertEqual([len(batch) for batch in scorer.batches], [4, 4, 2])
+
+    def test_scoring_errors_reach_every_caller(self):
+        def failing_scorer(texts):
+            raise RuntimeError("model unavailable")
+
+        async def submit_two(batcher):
+            return await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+
+        results = self.run_with_batcher(failing_scorer, submit_two, max_wait_seconds=0.05)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+
+    def test_batcher_survives_malformed_results(self):
+        calls = []
+
+        def flaky_scorer(texts):
+            calls.append(list(texts))
+            if len(calls) == 1:
+                return [], None
+            return [1] * len(texts), None
+
+        async def submit_twice(batcher):
+            first = await asyncio.gather(batcher.submit("a"), return_exceptions=True)
+            return first, await batcher.submit("b")
+
+        first, second = self.run_with_batcher(flaky_scorer, submit_twice, max_wait_seconds=0.01)
+        self.assertIsInstance(first[0], IndexError)
+        self.assertEqual(second, (1, None))
+
+    def test_asgi_rejects_oversized_body(self):
+        scorer = RecordingScorer()
+        registry = CollectorRegistry()
+        batcher = MicroBatcher(scorer, registry=registry)
+        app = create_asgi_app(batcher, registry, max_batch_size=2, max_body_bytes=32)
+
+        async def main():
+            try:
+                return await call_asgi(app, "POST", "/api/v1/predict", {"text": "good " * 20})
+            finally:
+                await batcher.stop()
+
+        status, body = asyncio.run(main())
+        self.assertEqual(status, 413)
+        self.assertEqual(scorer.batches, [])
+
+    def test_asgi_predict_and_validation(self):
+        scorer = RecordingScorer()
+        registry = CollectorRegistry()
+        batcher = MicroBatcher(scorer, registry=registry)
+        app = create_asgi_app(batcher, registry, max_batch_size=2)
+
+        async def main():
+            try:
+                single = await call_asgi(app, "POST", "/api/v1/predict", {"text": "good product"})
+                batch = await call_asgi(app, "POST", "/api/v1/predict_batch", {"texts": ["good", "bad"]})
+                oversized = await call_asgi(app, "POST", "/api/v1/predict_batch", {"texts": ["a", "b", "c"]})
+                invalid = await call_asgi(app, "POST", "/api/v1/predict", {"text": 3})
+                metrics = await call_asgi(app, "GET", "/metrics")
+                return single, batch, oversized, invalid, metrics
+            finally:
+                await batcher.stop()
+
+        single, batch, oversized, invalid, metrics = asyncio.run(main())
+        self.assertEqual(single[0], 200)
+        self.assertEqual(json.loads(single[1]), {"label": 1, "probability": 0.9})
+        self.assertEqual(json.loads(batch[1]), {"labels": [1, 0], "probabilities": [0.9, 0.1]})
+        self.assertEqual(oversized[0], 413)
+        self.assertEqual(invalid[0], 400)
+        self.assertIn(b"micro_batch_fill_ratio", metrics[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -62,11 +62,14 @@ class TestModelLoading(unittest.TestCase):
         # with open(vectorizer_path, "rb") as f:
         #     cls.vectorizer = pickle.load(f)
 
-        # Load holdout data
-        holdout_data_path = os.path.join("data", "processed", "test_bow.csv")
-        if not os.path.exists(holdout_data_path):
-            raise FileNotFoundError(f"Holdout data file not found at {holdout_data_path}")
-        cls.holdout_data = pd.read_csv(holdout_data_path)
+        # Load holdout data in whatever layout params.yaml made feature_engineering write
+        import yaml
+        from src.data.storage import load_feature_split, load_storage_params
+        params_path = os.path.join(project_root, "params.yaml")
+        with open(params_path) as f:
+            feature_format = yaml.safe_load(f)["feature_engineering"].get("feature_format", "sparse")
+        cls.x_holdout, cls.y_holdout = load_feature_split(os.path.join(project_root, "data", "processed", "test_bow"),
+                                                          feature_format, load_storage_params(params_path))
 
     @staticmethod
     def get_latest_model_version(model_name, stage="Staging"):
@@ -91,10 +94,24 @@ class TestModelLoading(unittest.TestCase):
         self.assertEqual(len(prediction), input_df.shape[0])
         self.assertEqual(len(prediction.shape), 1)
 
+    def test_sparse_prediction_matches_dataframe(self):
+        from flask_app.inference import build_predictor
+        input_data = self.vectorizer.transform(["hi how are you", "this is a terrible product"])
+        input_df = pd.DataFrame(input_data.toarray(), columns=self.vectorizer.get_feature_names_out())
+        sparse_labels, _ = build_predictor(self.new_model, "sparse")(input_data)
+        self.assertEqual(list(sparse_labels), list(self.new_model.predict(input_df)))
+
     def test_model_performance(self):
-        X_holdout = self.holdout_data.iloc[:, :-1]
-        y_holdout = self.holdout_data.iloc[:, -1]
-        y_pred_new = self.new_model.predict(X_holdout)
+        from scipy import sparse
+        from flask_app.inference import build_predictor
+        y_holdout = self.y_holdout
+        if sparse.issparse(self.x_holdout):
+            # Scored as CSR, like the app; densifying the holdout would cost rows x vocabulary floats
+            y_pred_new, _ = build_predictor(self.new_model, "sparse")(self.x_holdout)
+        else:
+            # Same column names as the feature table's CSV header
+            y_pred_new = self.new_model.predict(
+                pd.DataFrame(self.x_holdout, columns=[str(i) for i in range(self.x_holdout.shape[1])]))
         accuracy_new = accuracy_score(y_holdout, y_pred_new)
         precision_new = precision_score(y_holdout, y_pred_new, zero_division=0)
         recall_new = recall_score(y_holdout, y_pred_new, zero_division=0)
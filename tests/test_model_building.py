@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+from flask_app.inference import SparseLinearScorer
+from src.model.linear_artifact import export_linear_model, load_linear_model
+from src.data.storage import save_features
+from src.model.model_building import train_model, train_streaming
+
+TEXTS = ["love great movie", "great acting love it", "terrible plot hate", "awful boring hate it",
+         "wonderful story great", "worst film awful", "loved it great fun", "bad ending terrible"]
+LABELS = np.array([1, 1, 0, 0, 1, 0, 1, 0])
+TRAINING = {"chunk_rows": 16, "epochs": 10, "alpha": 0.0001, "seed": 42}
+
+
+class StreamingTrainingTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.stem = os.path.join(self.tmp_dir.name, "processed", "train_bow")
+        self.vectorizer = CountVectorizer()
+        self.features = self.vectorizer.fit_transform(TEXTS * 10)
+        self.labels = np.tile(LABELS, 10)
+        save_features(self.features, self.labels, self.stem)
+
+    def test_streaming_model_learns_and_is_deterministic(self):
+        model = train_streaming(self.stem, "sparse", {}, TRAINING)
+        np.testing.assert_array_equal(model.predict(self.vectorizer.transform(TEXTS)), LABELS)
+        np.testing.assert_array_equal(model.classes_, [0, 1])
+        self.assertEqual(model.predict_proba(self.features).shape, (80, 2))
+        again = train_streaming(self.stem, "sparse", {}, TRAINING)
+        np.testing.assert_array_equal(model.coef_, again.coef_)
+
+    def test_streaming_model_exports_like_the_batch_model(self):
+        path = os.path.join(self.tmp_dir.name, "linear_model.bin")
+        for model in (train_model(self.features, self.labels), train_streaming(self.stem, "sparse", {}, TRAINING)):
+            export_linear_model(model, self.vectorizer, path)
+            artifact = load_linear_model(path)
+            scorer = SparseLinearScorer(artifact.weights, artifact.intercept, artifact.classes)
+            features = self.vectorizer.transform(TEXTS)
+            np.testing.assert_allclose(scorer.predict_proba(features), model.predict_proba(features)[:, 1], atol=1e-9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from prometheus_client import CollectorRegistry
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.linear_model import LogisticRegression
+from flask_app.inference import build_predictor
+from flask_app.model_reloader import ModelReloader, ServingBundle, read_local_registry
+from src.features.text_normalizer import TextNormalizer
+
+
+def make_bundle(version, positive_words):
+    texts = [f"{word} review" for word in positive_words] + ["awful review", "terrible review"]
+    labels = [1] * len(positive_words) + [0, 0]
+    vectorizer = CountVectorizer().fit(texts)
+    model = LogisticRegression().fit(vectorizer.transform(texts), labels)
+    return ServingBundle(version, model, vectorizer, build_predictor(model), TextNormalizer())
+
+
+class ModelReloaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.active = make_bundle("1", ["great", "good"])
+        self.available_version = "1"
+        self.loaded_versions = []
+
+    def load_bundle(self, version):
+        self.loaded_versions.append(version)
+        return make_bundle(version, ["excellent", "wonderful"])
+
+    def swap(self, bundle):
+        self.active = bundle
+
+    def make_reloader(self, load_bundle=None):
+        return ModelReloader(lambda: self.available_version, load_bundle or self.load_bundle, self.swap,
+                             self.active.version, interval=60, registry=self.registry)
+
+    def test_no_reload_when_version_unchanged(self):
+        reloader = self.make_reloader()
+        self.assertFalse(reloader.check_once())
+        self.assertEqual(self.loaded_versions, [])
+
+    def test_new_version_is_loaded_and_swapped(self):
+        reloader = self.make_reloader()
+        self.available_version = "2"
+        self.assertTrue(reloader.check_once())
+        self.assertEqual(self.active.version, "2")
+        self.assertIn("excellent", self.active.vectorizer.vocabulary_)
+        self.assertEqual(self.registry.get_sample_value("model_active_version"), 2)
+        self.assertEqual(self.registry.get_sample_value("model_reloads_total", {"status": "success"}), 1)
+        self.assertEqual(self.registry.get_sample_value("model_load_duration_seconds_count"), 1)
+
+    def test_failed_load_keeps_current_bundle(self):
+        def failing_load(version):
+            raise IOError("artifact download failed")
+
+        reloader = self.make_reloader(failing_load)
+        self.available_version = "2"
+        self.assertFalse(reloader.check_once())
+        self.assertEqual(self.active.version, "1")
+        self.assertEqual(self.registry.get_sample_value("model_active_version"), 1)
+        self.assertEqual(self.registry.get_sample_value("model_reloads_total", {"status": "failure"}), 1)
+
+    def test_read_local_registry(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            registry_file = os.path.join(tmp_dir, "registry.json")
+            with open(registry_file, "w") as f:
+                json.dump({"version": 4, "path": "/shared/models/4"}, f)
+            self.assertEqual(read_local_registry(registry_file), ("4", "/shared/models/4"))
+            self.assertEqual(read_local_registry(os.path.join(tmp_dir, "missing.json")), (None, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from flask_app.model_store import MANIFEST_NAME, ModelArtifactCache
+
+
+def fake_download(content):
+    calls = []
+
+    def download(target_dir):
+        calls.append(target_dir)
+        with open(os.path.join(target_dir, "MLmodel"), "w") as f:
+            f.write("flavors: {}\n")
+        with open(os.path.join(target_dir, "model.pkl"), "wb") as f:
+            f.write(content)
+    return download, calls
+
+
+class ModelArtifactCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ModelArtifactCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_download_once_then_serve_from_cache(self):
+        download, calls = fake_download(b"weights-v1")
+        first_path, first_hit = self.cache.get_or_download("MLOPS-1", "3", download)
+        second_path, second_hit = self.cache.get_or_download("MLOPS-1", "3", download)
+        self.assertEqual((first_hit, second_hit), (False, True))
+        self.assertEqual(first_path, second_path)
+        self.assertEqual(len(calls), 1)
+        with open(os.path.join(second_path, "model.pkl"), "rb") as f:
+            self.assertEqual(f.read(), b"weights-v1")
+
+    def test_cached_entries_are_readable_by_other_users(self):
+        import stat
+        path, _ = self.cache.get_or_download("MLOPS-1", "3", fake_download(b"weights")[0])
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o755)
+        manifest_path = os.path.join(os.path.dirname(path), MANIFEST_NAME)
+        self.assertEqual(stat.S_IMODE(os.stat(manifest_path).st_mode), 0o644)
+
+    def test_artifacts_are_content_addressed(self):
+        path_a, _ = self.cache.get_or_download("MLOPS-1", "1", fake_download(b"a")[0])
+        path_b, _ = self.cache.get_or_download("MLOPS-1", "2", fake_download(b"b")[0])
+        self.assertNotEqual(os.path.basename(path_a), os.path.basename(path_b))
+
+    def test_corrupted_artifact_is_discarded(self):
+        path, _ = self.cache.get_or_download("MLOPS-1", "3", fake_download(b"weights")[0])
+        with open(os.path.join(path, "model.pkl"), "wb") as f:
+            f.write(b"tampered")
+        self.assertIsNone(self.cache.get("MLOPS-1", "3"))
+        download, calls = fake_download(b"weights")
+        _, hit = self.cache.get_or_download("MLOPS-1", "3", download)
+        self.assertFalse(hit)
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_download_leaves_no_entry(self):
+        def failing_download(target_dir):
+            raise ConnectionError("registry unreachable")
+
+        with self.assertRaises(ConnectionError):
+            self.cache.get_or_download("MLOPS-1", "4", failing_download)
+        self.assertIsNone(self.cache.get("MLOPS-1", "4"))
+        self.assertEqual(os.listdir(os.path.join(self.tmp_dir.name, "MLOPS-1", "4")), [])
+
+    def test_latest_version_is_numeric(self):
+        for version in ("2", "10", "9"):
+            self.cache.get_or_download("MLOPS-1", version, fake_download(version.encode())[0])
+        self.assertEqual(self.cache.latest_version("MLOPS-1"), "10")
+        self.assertIsNone(self.cache.latest_version("unknown"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from prometheus_client import CollectorRegistry
+from flask_app.prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class PredictionCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.clock = FakeClock()
+        self.entry_size = PredictionCache.entry_size("review 0")
+        self.cache = PredictionCache(3 * self.entry_size, ttl_seconds=60, registry=self.registry, clock=self.clock)
+        self.cache.set_model_version("1")
+
+    def sample(self, name, labels=None):
+        return self.registry.get_sample_value(name, labels) or 0.0
+
+    def test_hit_and_miss_counters(self):
+        self.assertIsNone(self.cache.get("great product"))
+        self.cache.put("great product", (1, 0.9))
+        self.assertEqual(self.cache.get("great product"), (1, 0.9))
+        self.assertEqual(self.sample("prediction_cache_hits_total"), 1)
+        self.assertEqual(self.sample("prediction_cache_misses_total"), 1)
+
+    def test_byte_budget_evicts_least_recently_used(self):
+        for i in range(3):
+            self.cache.put(f"review {i}", (i % 2, 0.5))
+        self.cache.get("review 0")
+        self.cache.put("review 3", (1, 0.5))
+        self.assertIsNone(self.cache.get("review 1"))
+        self.assertIsNotNone(self.cache.get("review 0"))
+        self.assertLessEqual(self.cache.current_bytes, self.cache.max_bytes)
+        self.assertEqual(self.sample("prediction_cache_evictions_total", {"reason": "capacity"}), 1)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.put("terrible", (0, 0.1))
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get("terrible"))
+        self.assertEqual(self.sample("prediction_cache_evictions_total", {"reason": "expired"}), 1)
+
+    def test_model_change_clears_cache(self):
+        self.cache.put("terrible", (0, 0.1))
+        self.cache.set_model_version("1")
+        self.assertEqual(len(self.cache), 1)
+        self.cache.set_model_version("2")
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.current_bytes, 0)
+        self.assertEqual(self.sample("prediction_cache_evictions_total", {"reason": "model_change"}), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.data import data_preprocessing
+from src.data.data_preprocessing import preprocess_dataframe, preprocess_dataframes
+from src.data.preprocessing_cache import PreprocessingCache
+
+REVIEWS = ["I LOVED this movie!!! 10/10", "Terrible... the actors were running around",
+           "The batteries died after 3 days", "Geese and mice were the leaves' best friends"]
+
+
+def frame(texts):
+    return pd.DataFrame({"review": texts, "sentiment": [i % 2 for i in range(len(texts))]})
+
+
+class PreprocessingCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, "cache", "preprocessing.sqlite")
+
+    def open_cache(self, version="1", max_bytes=1024 * 1024):
+        cache = PreprocessingCache(self.path, version, max_bytes=max_bytes)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_rerun_reads_everything_from_the_cache(self):
+        texts = [f"{review} #{i}" for i, review in enumerate(REVIEWS * 5)]
+        expected = preprocess_dataframe(frame(texts), "review")
+        (first,) = preprocess_dataframes([frame(texts)], "review", cache=self.open_cache())
+        cache = self.open_cache()
+        with self.assertLogs(level="INFO") as logs:
+            (second,) = preprocess_dataframes([frame(texts)], "review", cache=cache)
+        pd.testing.assert_frame_equal(first, expected)
+        pd.testing.assert_frame_equal(second, expected)
+        self.assertEqual((cache.hits, cache.misses), (len(texts), 0))
+        self.assertTrue(any("20 hits, 0 misses" in line for line in logs.output))
+
+    def test_only_new_rows_are_preprocessed(self):
+        preprocess_dataframes([frame(REVIEWS)], "review", cache=self.open_cache())
+        processed = []
+        original = data_preprocessing.preprocess_texts
+
+        def recording(texts, mode="row"):
+            processed.extend(texts)
+            return original(texts, mode)
+        data_preprocessing.preprocess_texts = recording
+        self.addCleanup(setattr, data_preprocessing, "preprocess_texts", original)
+
+        cache = self.open_cache()
+        texts = REVIEWS + ["A brand new review", "A brand new review"]
+        train, test = preprocess_dataframes([frame(texts[:3]), frame(texts[3:])], "review", cache=cache)
+        self.assertEqual(processed, ["A brand new review"])
+        self.assertEqual((cache.hits, cache.misses), (4, 2))
+        expected = preprocess_dataframe(frame(texts), "review")["review"].tolist()
+        self.assertEqual(train["review"].tolist() + test["review"].tolist(), expected)
+
+    def test_version_change_misses(self):
+        cache = self.open_cache(version="1")
+        cache.put_many(zip(cache.keys(["same text"]), ["old output"]))
+        new_cache = self.open_cache(version="2")
+        self.assertEqual(new_cache.get_many(new_cache.keys(["same text"])), {})
+
+    def test_size_cap_evicts_least_recently_used(self):
+        cache = self.open_cache(max_bytes=1000)
+        for i in range(5):
+            cache.put_many(zip(cache.keys([f"text {i}"]), ["x" * 200]))
+        self.assertLessEqual(cache.size_bytes(), 1000)
+        self.assertGreater(cache.evictions, 0)
+        self.assertEqual(cache.get_many(cache.keys(["text 0"])), {})
+        self.assertEqual(len(cache.get_many(cache.keys(["text 4"]))), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from flask_app.profiling import SamplingProfiler, collapse_stack
+
+
+def busy_wait(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(1000))
+
+
+class SamplingProfilerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_collapse_stack_is_root_first(self):
+        import sys
+        stack = collapse_stack(sys._getframe())
+        self.assertTrue(stack.endswith("test_profiling.py:test_collapse_stack_is_root_first"))
+        self.assertNotIn(" ", stack)
+
+    def test_sample_rate_selects_requests(self):
+        profiler = SamplingProfiler(self.tmp_dir.name, sample_rate=0.5, rng=iter([0.1, 0.9]).__next__)
+        self.assertTrue(profiler.should_profile())
+        self.assertFalse(profiler.should_profile())
+        self.assertFalse(SamplingProfiler(self.tmp_dir.name).should_profile())
+
+    def test_only_registered_threads_are_sampled(self):
+        profiler = SamplingProfiler(self.tmp_dir.name)
+        profiler.sample_once()
+        self.assertEqual(sum(profiler.stacks.values()), 0)
+
+        profiler._active.add(threading.get_ident())
+        profiler.sample_once()
+        (stack, count), = profiler.stacks.items()
+        self.assertEqual(count, 1)
+        self.assertIn("test_only_registered_threads_are_sampled", stack)
+
+    def test_window_writes_collapsed_stacks(self):
+        profiler = SamplingProfiler(self.tmp_dir.name, interval=0.001)
+        output_path = profiler.start_window(0.2)
+        profiler.begin(threading.get_ident())
+        busy_wait(0.3)
+        profiler.end(threading.get_ident())
+
+        deadline = time.monotonic() + 5
+        while not os.path.exists(output_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with open(output_path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any("busy_wait" in line for line in lines))
+        self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in lines))
+        self.assertIsNone(profiler.window_end)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import boto3
+import numpy as np
+import pandas as pd
+from moto import mock_aws
+
+from src.connections import s3_connection
+from src.connections.s3_connection import S3ObjectReader, s3_operations
+
+BUCKET = "test-bucket"
+FRAME = pd.DataFrame({"review": [f"review number {i}, with a comma" for i in range(3000)],
+                      "sentiment": np.where(np.arange(3000) % 3, "positive", "negative")})
+
+
+class S3ReadTests(unittest.TestCase):
+
+    def setUp(self):
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        self.s3 = s3_operations(BUCKET, "testing", "testing")
+        self.csv_bytes = FRAME.to_csv(index=False).encode("utf-8")
+
+    def put(self, key, body):
+        self.s3.s3_client.put_object(Bucket=BUCKET, Key=key, Body=body)
+
+    def test_fetch_file_from_s3_reads_csv(self):
+        self.put("data.csv", self.csv_bytes)
+        pd.testing.assert_frame_equal(self.s3.fetch_file_from_s3("data.csv"), FRAME)
+
+    def test_missing_key_returns_none(self):
+        self.assertIsNone(self.s3.fetch_file_from_s3("missing.csv"))
+
+    def test_gzip_csv_is_decompressed(self):
+        self.put("data.csv.gz", gzip.compress(self.csv_bytes))
+        pd.testing.assert_frame_equal(self.s3.read_dataframe("data.csv.gz"), FRAME)
+
+    def test_parquet_is_read_through_ranged_gets(self):
+        buffer = io.BytesIO()
+        FRAME.to_parquet(buffer, index=False)
+        self.put("data.parquet", buffer.getvalue())
+        pd.testing.assert_frame_equal(self.s3.read_dataframe("data.parquet"), FRAME)
+
+    def test_chunked_csv_yields_all_rows(self):
+        self.put("data.csv", self.csv_bytes)
+        chunks = list(self.s3.read_dataframe("data.csv", chunksize=1000))
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 1000])
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), FRAME)
+
+    def test_chunked_csv_releases_the_body(self):
+        self.put("data.csv", self.csv_bytes)
+        bodies = []
+        open_object = self.s3.open_object
+
+        def tracking_open(*args, **kwargs):
+            body = open_object(*args, **kwargs)
+            body.close = mock.Mock(wraps=body.close)
+            bodies.append(body)
+            return body
+
+        self.s3.open_object = tracking_open
+        chunks = self.s3.read_dataframe("data.csv", chunksize=1000)
+        self.assertEqual(len(next(chunks)), 1000)
+        chunks.close()
+        list(self.s3.read_dataframe("data.csv", chunksize=1000))
+        self.assertTrue(all(body.close.called for body in bodies))
+        self.assertEqual(len(bodies), 2)
+
+    def test_large_objects_use_parallel_ranged_reads(self):
+        self.put("data.csv", self.csv_bytes)
+        original = s3_connection.RANGED_READ_THRESHOLD
+        s3_connection.RANGED_READ_THRESHOLD = 1
+        self.addCleanup(setattr, s3_connection, "RANGED_READ_THRESHOLD", original)
+        with self.s3.open_object("data.csv", part_size=4096, max_workers=3) as body:
+            self.assertIsInstance(body.raw, S3ObjectReader)
+            self.assertEqual(body.read(), self.csv_bytes)
+
+    def test_reader_seeks_and_reads_across_parts(self):
+        self.put("data.csv", self.csv_bytes)
+        size = len(self.csv_bytes)
+        for max_workers in (1, 4):
+            reader = S3ObjectReader(self.s3.s3_client, BUCKET, "data.csv", size, part_size=1000, max_workers=max_workers)
+            with io.BufferedReader(reader, buffer_size=300) as body:
+                body.seek(-50, io.SEEK_END)
+                self.assertEqual(body.read(), self.csv_bytes[-50:])
+                body.seek(995)
+                self.assertEqual(body.read(10), self.csv_bytes[995:1005])
+                body.seek(0)
+                self.assertEqual(body.read(), self.csv_bytes)
+
+
+class S3ManyTests(unittest.TestCase):
+
+    def setUp(self):
+        mock = mock_aws()
+        mock.start()
+        self.addCleanup(mock.stop)
+        boto3.client("s3", region_name="us-east-1").create_bucket(Bucket=BUCKET)
+        self.s3 = s3_operations(BUCKET, "testing", "testing", max_workers=4)
+
+    def put_partitions(self, prefix, n_parts):
+        parts = [FRAME.iloc[i::n_parts].reset_index(drop=True) for i in range(n_parts)]
+        for i, part in enumerate(parts):
+            self.s3.s3_client.put_object(Bucket=BUCKET, Key=f"{prefix}part-{i:03d}.csv", Body=part.to_csv(index=False).encode())
+        return parts
+
+    def test_list_keys_filters_by_prefix_and_suffix(self):
+        self.s3.s3_client.put_object(Bucket=BUCKET, Key="data/parts/_SUCCESS", Body=b"")
+        self.put_partitions("data/parts/", 3)
+        self.s3.s3_client.put_object(Bucket=BUCKET, Key="other/x.csv", Body=b"a\n1\n")
+        self.assertEqual(self.s3.list_keys("data/parts/", suffixes=(".csv",)),
+                         [f"data/parts/part-{i:03d}.csv" for i in range(3)])
+        self.assertEqual(len(self.s3.list_keys("data/")), 4)
+
+    def test_fetch_many_keeps_key_order(self):
+        parts = self.put_partitions("data/parts/", 12)
+        frames = self.s3.fetch_many(self.s3.list_keys("data/parts/"))
+        self.assertEqual(list(frames), [f"data/parts/part-{i:03d}.csv" for i in range(12)])
+        for part, frame in zip(parts, frames.values()):
+            pd.testing.assert_frame_equal(frame, part)
+
+    def test_fetch_prefix_concatenates_parts(self):
+        parts = self.put_partitions("data/parts/", 5)
+        pd.testing.assert_frame_equal(self.s3.fetch_prefix("data/parts/"), pd.concat(parts, ignore_index=True))
+        with self.assertRaises(FileNotFoundError):
+            self.s3.fetch_prefix("missing/")
+
+    def test_fetch_many_reports_missing_keys(self):
+        self.put_partitions("data/parts/", 2)
+        with self.assertRaises(RuntimeError):
+            self.s3.fetch_many(["data/parts/part-000.csv", "data/parts/missing.csv"])
+
+    def test_upload_many_mirrors_directory_layout(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            models = os.path.join(tmp_dir, "models")
+            os.makedirs(os.path.join(models, "nested"))
+            for name, body in (("model.pkl", b"model"), ("nested/vectorizer.pkl", b"vectorizer")):
+                with open(os.path.join(models, name), "wb") as f:
+                    f.write(body)
+            metrics = os.path.join(tmp_dir, "metrics.json")
+            with open(metrics, "wb") as f:
+                f.write(b"{}")
+            keys = self.s3.upload_many([models, metrics], prefix="artifacts/")
+        self.assertEqual(sorted(keys), ["artifacts/metrics.json", "artifacts/models/model.pkl",
+                                        "artifacts/models/nested/vectorizer.pkl"])
+        body = self.s3.s3_client.get_object(Bucket=BUCKET, Key="artifacts/models/nested/vectorizer.pkl")["Body"].read()
+        self.assertEqual(body, b"vectorizer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from prometheus_client import CollectorRegistry, Histogram
+
+from flask_app.stage_timing import StageTimer
+
+
+class StageTimerTests(unittest.TestCase):
+
+    def test_repeated_stages_accumulate(self):
+        timer = StageTimer()
+        with timer.stage("normalize"):
+            pass
+        first = timer.durations["normalize"]
+        with timer.stage("normalize"):
+            pass
+        self.assertGreaterEqual(timer.durations["normalize"], first)
+        self.assertEqual(list(timer.durations), ["normalize"])
+
+    def test_stage_is_recorded_when_it_raises(self):
+        timer = StageTimer()
+        with self.assertRaises(ValueError):
+            with timer.stage("predict"):
+                raise ValueError("boom")
+        self.assertIn("predict", timer.durations)
+
+    def test_server_timing_header(self):
+        timer = StageTimer()
+        timer.durations = {"normalize": 0.0015, "predict": 0.25}
+        self.assertEqual(timer.server_timing_header(), "normalize;dur=1.500, predict;dur=250.000")
+
+    def test_observe_labels_endpoint_and_stage(self):
+        registry = CollectorRegistry()
+        histogram = Histogram("stage_latency", "Stage latency", ["endpoint", "stage"], registry=registry)
+        timer = StageTimer()
+        timer.durations = {"vectorize": 0.002}
+        timer.observe(histogram, "/predict")
+        count = registry.get_sample_value("stage_latency_count", {"endpoint": "/predict", "stage": "vectorize"})
+        self.assertEqual(count, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.data.storage import (compact_dtypes, feature_split_info, frame_path, iter_feature_chunks, load_feature_split,
+                              load_features, load_frame, load_storage_params, save_features, save_frame)
+
+RAW = pd.DataFrame({"review": ["loved it", "", "awful, would not buy"], "sentiment": [1, 0, 0],
+                    "extra": ["a", "b", "c"]})
+
+
+class StorageTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.stem = os.path.join(self.tmp_dir.name, "raw", "train")
+
+    def test_parquet_roundtrip_with_pruned_columns(self):
+        storage = {"format": "parquet", "compression": "zstd"}
+        path = save_frame(RAW, self.stem, storage)
+        self.assertTrue(path.endswith("train.parquet"))
+        df = load_frame(self.stem, storage, columns=["review", "sentiment"])
+        self.assertEqual(list(df.columns), ["review", "sentiment"])
+        self.assertEqual(df["sentiment"].dtype, np.int8)
+        self.assertEqual(str(df["review"].dtype), "string")
+        self.assertEqual(df["review"].tolist(), RAW["review"].tolist())
+
+    def test_csv_is_unchanged(self):
+        storage = {"format": "csv", "compression": "zstd"}
+        save_frame(RAW, self.stem, storage)
+        with open(frame_path(self.stem, storage)) as f:
+            self.assertEqual(f.read(), RAW.to_csv(index=False))
+        self.assertEqual(list(load_frame(self.stem, storage, columns=["sentiment"]).columns), ["sentiment"])
+
+    def test_feature_frames_keep_their_values(self):
+        features = pd.DataFrame(np.array([[0, 3, 1], [250, 0, 2]]))
+        features["label"] = [1, 0]
+        storage = {"format": "parquet", "compression": "none"}
+        save_frame(features, self.stem, storage)
+        df = load_frame(self.stem, storage)
+        np.testing.assert_array_equal(df.iloc[:, :-1].values, features.iloc[:, :-1].values)
+        np.testing.assert_array_equal(df.iloc[:, -1].values, [1, 0])
+        self.assertEqual(compact_dtypes(features)["0"].dtype, np.int16)
+
+    def test_sparse_features_roundtrip(self):
+        features = sparse.random(50, 100000, density=0.001, format="csr", random_state=0, dtype=np.float64)
+        features.data = np.rint(features.data * 10) + 1
+        labels = np.arange(50) % 2
+        path = save_features(features, labels, self.stem)
+        self.assertTrue(path.endswith("train.npz"))
+        loaded, loaded_labels = load_feature_split(self.stem, "sparse", {"format": "csv"})
+        self.assertTrue(sparse.isspmatrix_csr(loaded))
+        self.assertEqual(loaded.shape, (50, 100000))
+        self.assertEqual(loaded.dtype, np.float32)
+        self.assertEqual((loaded != features).nnz, 0)
+        np.testing.assert_array_equal(loaded_labels, labels)
+        with self.assertRaises(ValueError):
+            save_features(features, labels, self.stem, dtype="float16")
+
+    def test_dense_feature_split(self):
+        features = pd.DataFrame(np.array([[0, 3, 1], [250, 0, 2]]))
+        features["label"] = [1, 0]
+        storage = {"format": "csv", "compression": None}
+        save_frame(features, self.stem, storage)
+        x, y = load_feature_split(self.stem, "dense", storage)
+        np.testing.assert_array_equal(x, features.iloc[:, :-1].values)
+        np.testing.assert_array_equal(y, [1, 0])
+        save_features(features.iloc[:, :-1].values, y, self.stem, dtype="int32")
+        x_sparse, _ = load_features(self.stem)
+        np.testing.assert_array_equal(x_sparse.toarray(), x)
+
+    def test_feature_chunks_cover_every_row(self):
+        features = sparse.random(1003, 40, density=0.1, format="csr", random_state=1, dtype=np.float32)
+        labels = np.arange(1003) % 3
+        save_features(features, labels, self.stem)
+        self.assertEqual(feature_split_info(self.stem, "sparse", {}, chunk_rows=100)[0], 1003)
+        np.testing.assert_array_equal(feature_split_info(self.stem, "sparse", {}, chunk_rows=100)[1], [0, 1, 2])
+        chunks = list(iter_feature_chunks(self.stem, "sparse", {}, 100))
+        self.assertEqual([x.shape[0] for x, _ in chunks], [100] * 10 + [3])
+        self.assertEqual((sparse.vstack([x for x, _ in chunks]) != features).nnz, 0)
+        np.testing.assert_array_equal(np.concatenate([y for _, y in chunks]), labels)
+
+        shuffled = list(iter_feature_chunks(self.stem, "sparse", {}, 100, rng=np.random.default_rng(0)))
+        self.assertNotEqual([y[0] for _, y in shuffled], [y[0] for _, y in chunks])
+        self.assertEqual(sorted(np.concatenate([y for _, y in shuffled]).tolist()), sorted(labels.tolist()))
+
+        save_features(features, labels, self.stem, compressed=True)
+        with self.assertRaises(ValueError):
+            next(iter_feature_chunks(self.stem, "sparse", {}, 100))
+
+    def test_dense_feature_chunks(self):
+        features = pd.DataFrame(np.arange(30).reshape(10, 3))
+        features["label"] = np.arange(10) % 2
+        for storage in ({"format": "csv", "compression": None}, {"format": "parquet", "compression": "zstd"}):
+            save_frame(features, self.stem, storage)
+            chunks = list(iter_feature_chunks(self.stem, "dense", storage, 4))
+            self.assertEqual([len(y) for _, y in chunks], [4, 4, 2])
+            np.testing.assert_array_equal(np.vstack([x for x, _ in chunks]), features.iloc[:, :-1].values)
+            self.assertEqual(feature_split_info(self.stem, "dense", storage)[0], 10)
+
+    def test_storage_params_default_to_csv(self):
+        self.assertEqual(load_storage_params(os.path.join(self.tmp_dir.name, "missing.yaml"))["format"], "csv")
+        params_path = os.path.join(self.tmp_dir.name, "params.yaml")
+        with open(params_path, "w") as f:
+            f.write("storage:\n  format: feather\n")
+        with self.assertRaises(ValueError):
+            load_storage_params(params_path)
+
+
+if __name__ == "__main__":
+    unittest.main()
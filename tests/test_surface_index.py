@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from src.features.text_normalizer import TextNormalizer
+from src.features.surface_index import SurfaceIndexVectorizer
+
+
+TRAIN_TEXTS = [
+    "great movie loved acting",
+    "terrible movie boring plot",
+    "wonderful story great cast",
+    "awful film waste time",
+    "good product would buy again",
+    "bad product broke day",
+]
+
+REQUEST_TEXTS = [
+    "I LOVED these movies!!! Great stories, great casts.",
+    "Terrible, boring plots... a waste of 2 hours: https://example.com/review",
+    "The products were good; I'd buy them again",
+    "geese mice leaves and children",
+    "",
+]
+
+
+class SurfaceIndexTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.normalizer = TextNormalizer()
+        cls.vectorizer = CountVectorizer(max_features=12).fit(TRAIN_TEXTS)
+        candidates = ["movies", "stories", "great", "the", "i", "boring"]
+        cls.surface_vectorizer = SurfaceIndexVectorizer(cls.normalizer, cls.vectorizer).build_index(candidates)
+
+    def expected(self, texts):
+        return self.vectorizer.transform([self.normalizer.normalize(text) for text in texts])
+
+    def test_transform_matches_normalizer_and_vectorizer(self):
+        features = self.surface_vectorizer.transform(REQUEST_TEXTS)
+        self.assertEqual(features.shape, (len(REQUEST_TEXTS), len(self.vectorizer.vocabulary_)))
+        self.assertEqual((features != self.expected(REQUEST_TEXTS)).nnz, 0)
+
+    def test_indexed_tokens_skip_lemmatizer(self):
+        self.assertEqual(self.surface_vectorizer.index["movies"], (self.vectorizer.vocabulary_["movie"],))
+
+    def test_forms_without_features_are_not_indexed(self):
+        self.assertNotIn("the", self.surface_vectorizer.index)
+        self.assertNotIn("i", self.surface_vectorizer.index)
+        self.assertTrue(all(self.surface_vectorizer.index.values()))
+        self.assertEqual((self.surface_vectorizer.transform(["the i the"]) != self.expected(["the i the"])).nnz, 0)
+
+    def test_missing_tokens_are_cached(self):
+        surface_vectorizer = SurfaceIndexVectorizer(self.normalizer, self.vectorizer)
+        surface_vectorizer.transform(["plots plots plots"])
+        cache_info = surface_vectorizer.cached_token_features.cache_info()
+        self.assertEqual((cache_info.misses, cache_info.hits), (1, 2))
+
+    def test_save_and_load_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "surface_index.json")
+            self.surface_vectorizer.save(path)
+            loaded = SurfaceIndexVectorizer.load(path, self.normalizer, self.vectorizer)
+            self.assertEqual(loaded.index, self.surface_vectorizer.index)
+
+            other_vectorizer = CountVectorizer(max_features=5).fit(TRAIN_TEXTS)
+            with self.assertRaises(ValueError):
+                SurfaceIndexVectorizer.load(path, self.normalizer, other_vectorizer)
+
+    def test_hashing_vectorizer_index(self):
+        vectorizer = HashingVectorizer(n_features=64, alternate_sign=False, norm=None)
+        surface_vectorizer = SurfaceIndexVectorizer(self.normalizer, vectorizer).build_index(["movies", "geese", "the"])
+        expected = vectorizer.transform([self.normalizer.normalize(text) for text in REQUEST_TEXTS])
+        features = surface_vectorizer.transform(REQUEST_TEXTS)
+        self.assertEqual(features.shape, (len(REQUEST_TEXTS), 64))
+        self.assertEqual((features != expected).nnz, 0)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "surface_index.json")
+            surface_vectorizer.save(path)
+            self.assertEqual(SurfaceIndexVectorizer.load(path, self.normalizer, vectorizer).index, surface_vectorizer.index)
+            with self.assertRaises(ValueError):
+                SurfaceIndexVectorizer.load(path, self.normalizer, HashingVectorizer(n_features=32, alternate_sign=False, norm=None))
+
+    def test_signed_hashing_is_rejected(self):
+        with self.assertRaises(ValueError):
+            SurfaceIndexVectorizer(self.normalizer, HashingVectorizer(n_features=64))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import random
+import re
+import string
+import unittest
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from src.features.text_normalizer import TextNormalizer
+
+
+# Reference implementation: the six-step chain the Flask app used before TextNormalizer
+def lemmatization(text):
+    lemmatizer = WordNetLemmatizer()
+    text = text.split()
+    text = [lemmatizer.lemmatize(word) for word in text]
+    return " ".join(text)
+
+def remove_stop_words(text):
+    stop_words = set(stopwords.words("english"))
+    text = [word for word in str(text).split() if word not in stop_words]
+    return " ".join(text)
+
+def removing_numbers(text):
+    text = ''.join([char for char in text if not char.isdigit()])
+    return text
+
+def lower_case(text):
+    text = text.split()
+    text = [word.lower() for word in text]
+    return " ".join(text)
+
+def removing_punctuations(text):
+    text = re.sub('[%s]' % re.escape(string.punctuation), ' ', text)
+    text = text.replace('؛', "")
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text
+
+def removing_urls(text):
+    url_pattern = re.compile(r'https?://\S+|www\.\S+')
+    return url_pattern.sub(r'', text)
+
+def legacy_normalize_text(text):
+    text = lower_case(text)
+    text = remove_stop_words(text)
+    text = removing_numbers(text)
+    text = removing_punctuations(text)
+    text = removing_urls(text)
+    text = lemmatization(text)
+    return text
+
+
+def build_corpus(size=2000, seed=7):
+    corpus = [
+        "",
+        "   ",
+        "I love this!",
+        "This is the WORST movie I have ever seen...",
+        "Visit https://example.com/reviews?id=10 or www.example.org for more",
+        "The cats were running; the geese flew 2 miles.",
+        "don't won't shouldn't it's you're",
+        "١٢٣ arabic digits and ² superscripts",
+        "semicolon؛between words and tabs\tand\nnewlines",
+        "ALL CAPS REVIEW WITH NUMBERS 100% GREAT!!!",
+        "İstanbul ÇAĞLAR straße",
+    ]
+    rng = random.Random(seed)
+    pieces = (stopwords.words("english") + ["movies", "Geese", "RUNNING", "leaves", "was", "better",
+              "http://a.b/c", "www.site.com", "10/10", "a+b", "£5", "؛", "…", "x2", "I", "--", " "])
+    separators = [" ", "  ", "\t", "\n", "", ".", ","]
+    for _ in range(size):
+        corpus.append("".join(rng.choice(pieces) + rng.choice(separators) for _ in range(rng.randint(1, 30))))
+    return corpus
+
+
+class TextNormalizerTests(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.normalizer = TextNormalizer()
+
+    def test_parity_with_legacy_pipeline(self):
+        for text in build_corpus():
+            self.assertEqual(self.normalizer.normalize(text), legacy_normalize_text(text), repr(text))
+
+    def test_max_length_truncates_input(self):
+        normalizer = TextNormalizer(max_length=10)
+        self.assertEqual(normalizer.normalize("great movie " * 100_000), legacy_normalize_text("great movie"[:10]))
+
+if __name__ == '__main__':
+    unittest.main()